@@ -0,0 +1,82 @@
+const { spawn } = require("child_process");
+const readline = require("readline");
+
+// One long-lived `icd_search.py --serve` process shared by all routes.
+// Requests are written as JSON lines and matched to responses by id.
+// A request that gets no answer within ICD_WORKER_TIMEOUT_MS is rejected.
+const REQUEST_TIMEOUT_MS = Number(process.env.ICD_WORKER_TIMEOUT_MS || 30000);
+
+let worker = null;
+let nextId = 0;
+const pending = new Map();
+
+function settle(id) {
+  const entry = pending.get(id);
+  if (!entry) return null;
+  pending.delete(id);
+  clearTimeout(entry.timer);
+  return entry;
+}
+
+// Rejects every pending request; the next search spawns a fresh worker.
+function failAll(proc, err) {
+  if (worker === proc) worker = null;
+  for (const id of [...pending.keys()]) {
+    settle(id).reject(err);
+  }
+}
+
+function startWorker() {
+  const proc = spawn("python", ["../src/api/icd_search.py", "--serve"]);
+
+  readline.createInterface({ input: proc.stdout }).on("line", (line) => {
+    let message;
+    try {
+      message = JSON.parse(line);
+    } catch (err) {
+      console.error("ICD worker sent invalid JSON:", line);
+      return;
+    }
+    const entry = settle(message.id);
+    if (!entry) return;
+    if (message.success) entry.resolve(message.data);
+    else entry.reject(new Error(message.error || "ICD search failed"));
+  });
+
+  proc.stderr.on("data", (data) => {
+    console.error("ICD worker:", data.toString());
+  });
+
+  // Spawn failures (e.g. python not found) emit "error", possibly without "close"
+  proc.on("error", (err) => {
+    console.error("ICD worker failed:", err.message);
+    failAll(proc, new Error(`ICD worker failed: ${err.message}`));
+  });
+
+  // Writes to a dead worker fail with EPIPE here instead of crashing the server
+  proc.stdin.on("error", (err) => {
+    failAll(proc, new Error(`ICD worker unavailable: ${err.message}`));
+  });
+
+  proc.on("close", (code) => {
+    console.error(`ICD worker exited with code ${code}`);
+    failAll(proc, new Error("ICD worker exited"));
+  });
+
+  return proc;
+}
+
+// Resolves with the array of { icd_code, title, uri } matches for a query.
+function searchICD(query) {
+  if (!worker) worker = startWorker();
+  const id = nextId++;
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => {
+      if (settle(id)) reject(new Error(`ICD search timed out after ${REQUEST_TIMEOUT_MS} ms`));
+    }, REQUEST_TIMEOUT_MS);
+    pending.set(id, { resolve, reject, timer });
+    worker.stdin.write(JSON.stringify({ id, query }) + "\n");
+  });
+}
+
+module.exports = { searchICD };
@@ -1,5 +1,5 @@
 const express = require("express");
-const { spawn } = require("child_process");
+const { searchICD } = require("../icdWorker");
 const db = require("../db"); // your SQLite/Postgres connection
 
 const router = express.Router();
@@ -34,31 +34,9 @@ router.post("/", (req, res) => {
 
     const description = row.Description;
 
-    // Call Python ICD script
-    // Note: Assuming '../src/api/icd_search.py' is the correct path relative to where this Node process runs.
-    const pyProcess = spawn("python", ["../src/api/icd_search.py", description]);
-
-    let output = "";
-    let errorOutput = "";
-
-    pyProcess.stdout.on("data", (data) => {
-      output += data.toString();
-    });
-
-    pyProcess.stderr.on("data", (data) => {
-      errorOutput += data.toString();
-    });
-
-    pyProcess.on("close", (code) => {
-      if (code !== 0) {
-        console.error("Python error:", errorOutput);
-        // Return descriptive error from Python script
-        return res.status(500).json({ success: false, error: errorOutput.trim() || "Python script execution failed" });
-      }
-
-      try {
-        const parsed = JSON.parse(output); // Python JSON output (expected to be an array)
-
+    // Map through the shared long-lived Python ICD worker
+    searchICD(description)
+      .then((parsed) => {
         if (!Array.isArray(parsed)) {
             console.error("Python output is not an array:", parsed);
             return res.status(500).json({ success: false, error: "Invalid format from Python script" });
@@ -85,13 +63,11 @@ router.post("/", (req, res) => {
           description,
           icd_mappings,
         });
-      } catch (err) {
-        console.error("JSON Parse Error:", err);
-        res
-          .status(500)
-          .json({ success: false, error: "Failed to parse Python output" });
-      }
-    });
+      })
+      .catch((err) => {
+        console.error("Python error:", err.message);
+        res.status(500).json({ success: false, error: err.message || "Python script execution failed" });
+      });
   });
 });
 
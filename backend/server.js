@@ -1,6 +1,6 @@
 const express = require("express");
 const cors = require("cors");
-const { spawn } = require("child_process");
+const { searchICD } = require("./icdWorker");
 const searchRouter = require("./routes/search");
 const codeMappingRouter = require("./routes/codeMapping");
 
@@ -32,26 +32,15 @@ app.post("/api/map-to-icd", (req, res) => {
       .json({ success: false, message: "Description is required" });
   }
 
-  // Call your Python script
-  const process = spawn("python", ["../src/api/icd_search.py", description]);
-
-  let output = "";
-  let errorOutput = "";
-
-  process.stdout.on("data", (data) => {
-    output += data.toString();
-  });
-
-  process.stderr.on("data", (data) => {
-    errorOutput += data.toString();
-  });
-
-  process.on("close", (code) => {
-    if (code !== 0) {
-      return res.status(500).json({ success: false, error: errorOutput });
-    }
-    res.json({ success: true, data: output.trim() });
-  });
+  // Map through the shared long-lived Python worker
+  searchICD(description)
+    .then((matches) => {
+      // Keep the stringified array the frontend already parses
+      res.json({ success: true, data: JSON.stringify(matches) });
+    })
+    .catch((err) => {
+      res.status(500).json({ success: false, error: err.message });
+    });
 });
 
 // Start server
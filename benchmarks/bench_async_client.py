@@ -0,0 +1,58 @@
+"""
+Serial search_icd() loop versus AsyncICDClient.search_many() against the
+local mock ICD server with artificial latency (and optional injected 429/503s).
+
+    python -m benchmarks.bench_async_client --queries 200 --latency 0.05 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.mock_icd_server import MockICDServer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="mock server latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rate", type=float, default=0.0, help="async searches per second (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of searches failing with 429/503")
+    args = parser.parse_args()
+
+    with MockICDServer(latency=args.latency, error_rate=args.error_rate) as server:
+        os.environ.update(server.env())
+        from src.api import icd_search
+
+        queries = [f"disorder of pitta {i}" for i in range(args.queries)]
+        token = icd_search.get_token()
+
+        start = time.perf_counter()
+        serial = []
+        for q in queries:
+            try:
+                serial.append(icd_search.search_icd(token, q))
+            except RuntimeError:
+                serial.append(None)  # the serial path has no retries
+        serial_time = time.perf_counter() - start
+        serial_failed = serial.count(None)
+
+        async def run():
+            async with icd_search.AsyncICDClient(concurrency=args.concurrency, rate=args.rate) as client:
+                results = await client.search_many(queries)
+                return results, client.retries
+
+        start = time.perf_counter()
+        results, retries = asyncio.run(run())
+        async_time = time.perf_counter() - start
+
+    in_order = all(q in r["destinationEntities"][0]["title"] for q, r in zip(queries, results))
+    print(f"serial loop  : {serial_time:7.2f}s  {args.queries / serial_time:8.1f} q/s  ({serial_failed} failed)")
+    print(f"search_many  : {async_time:7.2f}s  {args.queries / async_time:8.1f} q/s  ({retries} retries)")
+    print(f"speedup      : {serial_time / async_time:7.1f}x  (results in input order: {in_order})")
+
+
+if __name__ == "__main__":
+    main()
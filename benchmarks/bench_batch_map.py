@@ -0,0 +1,99 @@
+"""
+Throughput of BatchMapper (src/api/batch_map.py) versus one DB lookup plus
+one ICD search per code (the /api/code-mapping route, called with the same
+concurrency), mapping 10k NAMASTE codes against the local mock ICD server.
+
+    python -m benchmarks.bench_batch_map --codes 10000 --distinct 6000 --latency 0.02
+
+The corpus repeats descriptions the way NAMASTE sheets do (`--distinct`
+descriptions over `--codes` codes) and a few requested codes are unknown.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.mock_icd_server import MockICDServer
+
+
+def build_db(path: str, codes: int, distinct: int) -> list:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE namaste_terms (NAMC_CODE TEXT PRIMARY KEY, NAMC_term TEXT, Description TEXT)")
+    rows = [
+        (f"NAM-{i:06d}", f"term {i}", f"disorder of vata affecting channel {random.randrange(distinct)}")
+        for i in range(codes)
+    ]
+    conn.executemany("INSERT INTO namaste_terms VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return [code for code, _, _ in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--codes", type=int, default=10000)
+    parser.add_argument("--distinct", type=int, default=6000, help="distinct descriptions")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock server latency in seconds")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, MockICDServer(latency=args.latency) as server:
+        os.environ.update(server.env())
+        from src.api import icd_search
+        from src.api.batch_map import BatchMapper
+        from src.database import get_sqlite_connection
+
+        db_path = str(Path(tmp) / "master.db")
+        codes = build_db(db_path, args.codes, args.distinct)
+        requested = codes + [f"NAM-MISSING-{i}" for i in range(args.codes // 100)]
+        random.shuffle(requested)
+
+        def per_code(code: str) -> None:
+            conn = get_sqlite_connection(db_path)
+            try:
+                row = conn.execute("SELECT Description FROM namaste_terms WHERE NAMC_CODE = ?", (code,)).fetchone()
+            finally:
+                conn.close()
+            if row and row[0]:
+                icd_search.shape_results(icd_search.cached_search_icd(row[0]))
+
+        def run_per_code() -> tuple:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                list(pool.map(per_code, requested))
+            return time.perf_counter() - start, f"{len(requested)} DB queries"
+
+        def run_batch() -> tuple:
+            mapper = BatchMapper(db_path, workers=args.workers)
+            start = time.perf_counter()
+            first = None
+            for _ in mapper.map_codes(requested):
+                if first is None:
+                    first = time.perf_counter() - start
+            seconds = time.perf_counter() - start
+            return seconds, f"{mapper.stats['queries']} DB queries, first result after {first * 1000:.0f} ms"
+
+        report = []
+        for label, run in [("per-code lookups", run_per_code), ("BatchMapper", run_batch)]:
+            icd_search._search_cache = None
+            icd_search.get_search_cache().size = 2 * args.codes  # every description fits, so the warm pass is all hits
+            for cache in ("cold", "warm"):
+                calls = server.search_calls
+                seconds, detail = run()
+                report.append((label, cache, seconds, f"{server.search_calls - calls} ICD searches, {detail}"))
+
+    print(
+        f"{len(requested)} codes, {args.distinct} distinct descriptions, "
+        f"{args.latency * 1000:.0f} ms ICD latency, {args.workers} workers"
+    )
+    for label, cache, seconds, detail in report:
+        print(f"{label:17s} {cache} cache: {len(requested) / seconds:9.0f} codes/s  ({detail})")
+
+
+if __name__ == "__main__":
+    main()
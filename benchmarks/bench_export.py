@@ -0,0 +1,119 @@
+"""
+Wall time and peak memory of the streaming exporter
+(src/utils/export_terminology.py) on a synthetic 1M-row namaste_icd_map,
+per format, plain and gzip, against a fetchall() + json.dumps() export.
+
+    python -m benchmarks.bench_export --codes 200000 --top-k 5
+
+Each export runs in its own process so peak RSS (ru_maxrss) is per export.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.schema.table_schema import TableSchemas
+
+SYSTEMS = ("ayurveda", "siddha", "unani")
+
+
+def build_db(path: str, codes: int, top_k: int) -> int:
+    conn = sqlite3.connect(path)
+    for sql in TableSchemas.ICD_MAPPING_SCHEMAS.values():
+        conn.execute(sql)
+    rows = 0
+    for system in SYSTEMS:
+        conn.execute(f"CREATE TABLE namaste_{system} (code TEXT PRIMARY KEY, english_term TEXT, description TEXT)")
+        system_codes = [f"{system[0].upper()}{i:07d}" for i in range(codes // len(SYSTEMS))]
+        conn.executemany(
+            f"INSERT INTO namaste_{system} VALUES (?, ?, ?)",
+            ((code, f"{system} disorder {code}", f"A disorder of {system} channel {code}") for code in system_codes),
+        )
+
+        def mappings():
+            for code in system_codes:
+                for rank in range(1, top_k + 1):
+                    confidence = random.random()
+                    yield (
+                        system, code, "2024-01", rank, f"SK{random.randrange(100):02d}.{rank}",
+                        f"ICD title for {code} rank {rank}", f"http://id.who.int/icd/entity/{random.randrange(10**9)}",
+                        round(confidence + 0.1, 4), round(confidence, 4), "relatedto", "tfidf",
+                    )
+
+        cur = conn.executemany("INSERT INTO namaste_icd_map VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", mappings())
+        rows += cur.rowcount
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def child(db_path: str, fmt: str, out_path: str) -> None:
+    from src.utils import export_terminology as export
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    if fmt == "fetchall":
+        rows = conn.execute(
+            "SELECT * FROM namaste_icd_map ORDER BY system, icd_release, namaste_code, rank"
+        ).fetchall()
+        columns = [d[0] for d in conn.execute("SELECT * FROM namaste_icd_map LIMIT 0").description]
+        with open(out_path, "w", encoding="utf-8") as out:
+            out.write(json.dumps([dict(zip(columns, row)) for row in rows]))
+    else:
+        with export.open_output(out_path) as out:
+            export.export_mappings(conn, out, fmt)
+    conn.close()
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": time.perf_counter() - start, "peak_mib": peak_kib / 1024}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--codes", type=int, default=200000)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "namaste_master.db")
+        start = time.perf_counter()
+        rows = build_db(db_path, args.codes, args.top_k)
+        print(f"{rows} mapping rows built in {time.perf_counter() - start:.1f}s")
+
+        runs = [
+            ("fetchall+dumps", "fetchall", "all.json"),
+            ("ndjson", "ndjson", "map.ndjson"),
+            ("ndjson.gz", "ndjson", "map.ndjson.gz"),
+            ("csv", "csv", "map.csv"),
+            ("csv.gz", "csv", "map.csv.gz"),
+            ("fhir ConceptMap", "fhir", "map.json"),
+            ("fhir ConceptMap.gz", "fhir", "map.json.gz"),
+        ]
+        for label, fmt, name in runs:
+            out_path = str(Path(tmp) / name)
+            result = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_export", "--child", db_path, fmt, out_path],
+                check=True, capture_output=True, text=True,
+            )
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            size = os.path.getsize(out_path) / 2**20
+            print(
+                f"{label:20s} {stats['seconds']:6.1f}s  {rows / stats['seconds']:9.0f} rows/s  "
+                f"peak RSS {stats['peak_mib']:7.1f} MiB  output {size:7.1f} MiB"
+            )
+            os.remove(out_path)
+
+
+if __name__ == "__main__":
+    main()
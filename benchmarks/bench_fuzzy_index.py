@@ -0,0 +1,99 @@
+"""
+Build time, memory and query latency of the in-memory fuzzy term index
+(src/services/fuzzy_index.py) over the full NAMASTE corpus: the ayurveda,
+siddha and unani code sheets plus the namaste_terms table of master.db.
+
+Queries are corpus terms with `--typos` random edits (substitution,
+deletion, insertion or transposition); recall@k counts queries whose
+original code is among the top-k results.
+
+    python -m benchmarks.bench_fuzzy_index --queries 1000 --typos 1
+"""
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.services.fuzzy_index import FuzzyTermIndex
+from src.utils import build_namaste_master_db as namaste_builder
+
+MASTER_DB = Path(__file__).resolve().parents[1] / "src" / "database" / "data" / "master.db"
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def misspell(term: str, typos: int) -> str:
+    chars = list(term)
+    for _ in range(typos):
+        if len(chars) < 3:
+            break
+        i = random.randrange(len(chars) - 1)
+        edit = random.choice(("sub", "del", "ins", "swap"))
+        if edit == "sub":
+            chars[i] = random.choice(LETTERS)
+        elif edit == "del":
+            del chars[i]
+        elif edit == "ins":
+            chars.insert(i, random.choice(LETTERS))
+        else:
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--typos", type=int, default=1)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        namaste_builder.DB_PATH = str(Path(tmp) / "namaste_master.db")
+        namaste_builder.build_namaste_master_db()
+        master_copy = Path(tmp) / "master.db"
+        shutil.copy(MASTER_DB, master_copy)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        index = FuzzyTermIndex.from_db([namaste_builder.DB_PATH, master_copy])
+        build_seconds = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    stats = index.stats()
+    print(
+        f"Indexed {stats['entries']} terms ({stats['keys']} keys, {stats['trigrams']} trigrams, "
+        f"{stats['postings']} postings) in {build_seconds:.2f}s; "
+        f"memory {current / 2**20:.1f} MiB (peak {peak / 2**20:.1f} MiB during build)"
+    )
+
+    terms = [
+        (source, code, term)
+        for entries in index.entries for source, code, term in entries
+        if term and len(term) >= 5
+    ]
+    sample = [random.choice(terms) for _ in range(args.queries)]
+    latencies, hits = [], 0
+    for source, code, term in sample:
+        query = misspell(term, args.typos)
+        t = time.perf_counter()
+        results = index.search(query, k=args.k)
+        latencies.append(time.perf_counter() - t)
+        hits += any(r["source"] == source and r["code"] == code for r in results)
+
+    latencies.sort()
+    print(
+        f"{args.queries} queries with {args.typos} typo(s): recall@{args.k} {100 * hits / args.queries:.1f}%, "
+        f"p50 {1000 * statistics.median(latencies):.3f} ms, "
+        f"p99 {1000 * latencies[int(0.99 * len(latencies)) - 1]:.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
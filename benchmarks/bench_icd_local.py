@@ -0,0 +1,91 @@
+"""
+Per-query latency of the offline ICD-11 index (src/api/icd_local.py) versus
+a remote search_icd() round trip to the local mock ICD server.
+
+The local index is built from data/icd11/mms_fixture.jsonl padded with
+synthetic entities up to `--entities` (the 2024-01 MMS has ~35k categories).
+
+    python -m benchmarks.bench_icd_local --entities 35000 --queries 300 --latency 0.15
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from pathlib import Path
+
+from benchmarks.mock_icd_server import MockICDServer
+from src.api.icd_local import LocalICDIndex, load_snapshot
+
+FIXTURE = Path(__file__).resolve().parents[1] / "data" / "icd11" / "mms_fixture.jsonl"
+
+
+def synthetic_entities(base: list, count: int, vocabulary: int = 15000) -> list:
+    """
+    `base` plus random titles, `count` entities in total. Title words follow a
+    Zipf distribution over the fixture's words plus `vocabulary` pseudo-words,
+    roughly the size of the MMS title vocabulary.
+    """
+    words = sorted({w for e in base for text in (e["title"], *e["synonyms"]) for w in text.split()})
+    words += [
+        "".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=random.randint(4, 11)))
+        for _ in range(vocabulary)
+    ]
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    entities = list(base)
+    for i in range(len(base), count):
+        code = f"X{i:05d}"
+        entities.append({
+            "code": code,
+            "title": " ".join(random.choices(words, weights, k=random.randint(2, 6))),
+            "uri": f"http://id.who.int/icd/release/11/2024-01/mms/synthetic/{code}",
+            "synonyms": [" ".join(random.choices(words, weights, k=random.randint(1, 4)))],
+        })
+    return entities
+
+
+def summarize(name: str, samples: list) -> None:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+    print(f"{name:7s}: p50 {1000 * statistics.median(samples):8.3f} ms   p99 {1000 * p99:8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entities", type=int, default=35000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.15, help="mock server latency in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    base = load_snapshot(FIXTURE)
+    index = LocalICDIndex(synthetic_entities(base, args.entities))
+    print(f"Local index: {index.stats()}")
+
+    queries = [random.choice([e["title"], *e["synonyms"]]) for e in random.choices(base, k=args.queries)]
+    local = []
+    for q in queries:
+        t = time.perf_counter()
+        index.search(q)
+        local.append(time.perf_counter() - t)
+
+    with MockICDServer(latency=args.latency) as server:
+        os.environ.update(server.env())
+        from src.api import icd_search
+
+        token = icd_search.get_token()
+        remote = []
+        for q in queries[: max(1, args.queries // 10)]:
+            t = time.perf_counter()
+            icd_search.search_icd(token, q)
+            remote.append(time.perf_counter() - t)
+
+    summarize("local", local)
+    summarize("remote", remote)
+    print(f"speedup: {statistics.median(remote) / statistics.median(local):.0f}x (p50)")
+
+
+if __name__ == "__main__":
+    main()
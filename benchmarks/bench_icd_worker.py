@@ -0,0 +1,79 @@
+"""
+Requests/sec of the spawn-per-call ICD mapping path versus the long-lived
+`icd_search.py --serve` worker, both against the local mock ICD server.
+
+    python -m benchmarks.bench_icd_worker --requests 200 --latency 0.02
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.mock_icd_server import MockICDServer
+
+ICD_SEARCH = Path(__file__).resolve().parents[1] / "src" / "api" / "icd_search.py"
+
+
+def bench_spawn(env, queries, concurrency: int) -> float:
+    """One `python icd_search.py <query>` process per mapping, like the Node routes did."""
+    def run(chunk):
+        for q in chunk:
+            subprocess.run([sys.executable, str(ICD_SEARCH), q], env=env, check=True, capture_output=True)
+
+    chunks = [queries[i::concurrency] for i in range(concurrency)]
+    threads = [threading.Thread(target=run, args=(c,)) for c in chunks]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def bench_serve(env, queries) -> float:
+    """All mappings pipelined through one `--serve` worker."""
+    proc = subprocess.Popen(
+        [sys.executable, str(ICD_SEARCH), "--serve"],
+        env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    start = time.perf_counter()
+    for i, q in enumerate(queries):
+        proc.stdin.write(json.dumps({"id": i, "query": q}) + "\n")
+    proc.stdin.flush()
+    for _ in queries:
+        response = json.loads(proc.stdout.readline())
+        if not response["success"]:
+            raise RuntimeError(response["error"])
+    elapsed = time.perf_counter() - start
+    proc.stdin.close()
+    proc.wait()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel spawns for the baseline")
+    parser.add_argument("--latency", type=float, default=0.01, help="mock server latency in seconds")
+    args = parser.parse_args()
+
+    queries = [f"disorder of vata {i}" for i in range(args.requests)]
+    with MockICDServer(latency=args.latency) as server:
+        env = {**os.environ, **server.env()}
+        spawn = bench_spawn(env, queries, args.concurrency)
+        spawn_tokens = server.token_calls
+        serve = bench_serve(env, queries)
+        serve_tokens = server.token_calls - spawn_tokens
+
+    print(f"spawn-per-call : {args.requests / spawn:8.1f} req/s  ({spawn_tokens} token calls)")
+    print(f"--serve worker : {args.requests / serve:8.1f} req/s  ({serve_tokens} token calls)")
+    print(f"speedup        : {spawn / serve:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Rows/sec of src/database/load_csv.py versus the old row-by-row loader
+(csv.DictReader + one cursor.execute per row, index maintained during the
+load) on IAST_Sanskrit_Matching.csv replicated to `--rows` rows.
+
+    python -m benchmarks.bench_load_csv --rows 1000000
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from src.database.load_csv import CSV_COLUMNS, load_namaste_terms
+from src.schema.table_schema import TableSchemas
+
+CSV_PATH = Path(__file__).resolve().parents[1] / "data" / "namaste_codes" / "IAST_Sanskrit_Matching.csv"
+
+
+def replicate_csv(dst: Path, rows: int) -> int:
+    """Writes the shipped CSV's records repeatedly, NAMC_CODE suffixed per copy, until `rows` rows. Returns copies."""
+    with CSV_PATH.open(newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        records = list(reader)
+    code = header.index("NAMC_CODE")
+    copies = 0
+    written = 0
+    with dst.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        while written < rows:
+            for record in records[: rows - written]:
+                writer.writerow([*record[:code], f"{record[code].strip()}#{copies}", *record[code + 1:]])
+            written += min(len(records), rows - written)
+            copies += 1
+    return copies
+
+
+def row_by_row(conn: sqlite3.Connection, csv_path: Path) -> int:
+    """The original load_csv.py: DictReader, one INSERT per row, indexes already in place."""
+    conn.execute(TableSchemas.NAMASTE_TERMS_SCHEMA)
+    conn.execute("CREATE INDEX idx_namc_code ON namaste_terms (NAMC_CODE)")
+    conn.execute("CREATE INDEX idx_term_id ON namaste_terms (Term_ID)")
+    cursor = conn.cursor()
+    rows = 0
+    with csv_path.open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            cursor.execute(
+                f"INSERT INTO namaste_terms ({', '.join(CSV_COLUMNS.values())}) "
+                f"VALUES ({', '.join('?' * len(CSV_COLUMNS))})",
+                tuple(row[c] for c in CSV_COLUMNS),
+            )
+            rows += 1
+    conn.commit()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "namaste_terms.csv"
+        copies = replicate_csv(csv_path, args.rows)
+        print(f"{args.rows} rows ({copies} copies, {os.path.getsize(csv_path) / 2**20:.0f} MiB)")
+
+        conn = sqlite3.connect(Path(tmp) / "row_by_row.db")
+        start = time.perf_counter()
+        rows = row_by_row(conn, csv_path)
+        seconds = time.perf_counter() - start
+        conn.close()
+        print(f"row by row      : {seconds:6.1f}s  {rows / seconds:9.0f} rows/s  ({rows} rows, no dedup)")
+
+        conn = sqlite3.connect(Path(tmp) / "load_csv.db")
+        start = time.perf_counter()
+        result = load_namaste_terms(conn, csv_path)
+        conn.commit()
+        seconds = time.perf_counter() - start
+        conn.close()
+        print(
+            f"load_csv        : {seconds:6.1f}s  {result['rows_read'] / seconds:9.0f} rows/s  "
+            f"({result['rows_inserted']} rows, {result['duplicates']} duplicates dropped, "
+            f"indexes {result['index_seconds']:.1f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Load time of the WHO terminology master DB per storage backend, over a
+generated Ayurveda file (default 200,000 records):
+    sqlite-build   TerminologyMasterDB.build_from_folder (manifest, FTS, search keys)
+    sqlite         TerminologyMasterDB.load_into(SQLiteBackend)
+    postgres       TerminologyMasterDB.load_into(PostgresBackend): COPY + pg_trgm GIN indexes
+
+The postgres run uses the PG* environment variables (or --dsn) and is
+skipped if the server cannot be reached. Its tables are dropped afterwards.
+
+    PGHOST=localhost PGDATABASE=ayushsetu python -m benchmarks.bench_master_db_backends --records 200000
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_terminology_import import generate
+from src.database.backends import PostgresBackend, SQLiteBackend
+from src.utils.build_terminology_master_db import TerminologyMasterDB
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--dsn", help="PostgreSQL DSN (default: PG* environment variables)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    quiet = logging.getLogger("bench")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "json"
+        folder.mkdir()
+        generate(folder / "ayurveda_terms.json", args.records)
+        results = {}
+
+        builder = TerminologyMasterDB(db_path=Path(tmp) / "build.db", json_folder=folder, logger=quiet)
+        start = time.perf_counter()
+        builder.build_from_folder()
+        results["sqlite-build"] = time.perf_counter() - start
+
+        backend = SQLiteBackend(str(Path(tmp) / "backend.db"))
+        start = time.perf_counter()
+        builder.load_into(backend)
+        results["sqlite"] = time.perf_counter() - start
+
+        try:
+            pg = PostgresBackend(args.dsn)
+        except Exception as e:
+            print(f"postgres: skipped ({e.__class__.__name__}: {str(e).strip().splitlines()[0]})")
+        else:
+            try:
+                start = time.perf_counter()
+                builder.load_into(pg)
+                results["postgres"] = time.perf_counter() - start
+            finally:
+                with pg.connection() as conn, conn.cursor() as cur:
+                    for schema in TerminologyMasterDB.TABLE_SCHEMAS.values():
+                        cur.execute(f"DROP TABLE IF EXISTS {schema['table']}")
+                pg.close()
+
+    for name, seconds in results.items():
+        print(f"{name:13s}: {seconds:7.2f}s  {args.records / seconds:9.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
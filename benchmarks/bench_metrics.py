@@ -0,0 +1,110 @@
+"""
+Per-operation overhead of src/utils/metrics.py: spans (context manager and
+decorator), histogram observations and counter increments, single-threaded
+and with concurrent threads, against the same loop without instrumentation.
+
+    python -m benchmarks.bench_metrics --ops 1000000 --threads 8
+"""
+
+import argparse
+import threading
+import time
+from typing import Callable
+
+from src.utils import metrics
+
+BUDGET_US = 3.0  # per span, the acceptance bound for instrumenting hot paths
+
+
+def per_op(body: Callable[[int], None], ops: int) -> float:
+    """Seconds per iteration of `body(ops)` (which loops `ops` times), best of 3."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        body(ops)
+        best = min(best, time.perf_counter() - start)
+    return best / ops
+
+
+def threaded(body: Callable[[int], None], ops: int, threads: int) -> float:
+    """Wall seconds per operation with `threads` threads each running `ops // threads` iterations."""
+    workers = [threading.Thread(target=body, args=(ops // threads,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return (time.perf_counter() - start) / ops
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    hist = metrics.histogram("bench_span_seconds", "benchmark", ("stage",))
+    series = hist.labels("x")
+    count = metrics.counter("bench_total", "benchmark", ("kind",)).labels("x")
+
+    def noop() -> None:
+        pass
+
+    traced = metrics.span(series)(noop)
+
+    def bare(n: int) -> None:
+        for _ in range(n):
+            noop()
+
+    def with_span(n: int) -> None:
+        for _ in range(n):
+            with metrics.span(series):
+                noop()
+
+    def decorated(n: int) -> None:
+        for _ in range(n):
+            traced()
+
+    def by_name(n: int) -> None:
+        for _ in range(n):
+            with metrics.span("bench_span_seconds", stage="x"):
+                noop()
+
+    def observe(n: int) -> None:
+        for _ in range(n):
+            series.observe(0.001)
+
+    def inc(n: int) -> None:
+        for _ in range(n):
+            count.inc()
+
+    baseline = per_op(bare, args.ops)
+    print(f"{'uninstrumented call':44s} {baseline * 1e6:6.3f} us/op")
+    results = {}
+    for name, body in (
+        ("with span(series)", with_span),
+        ("@span(series) decorated call", decorated),
+        ("with span(name, **labels)", by_name),
+        ("histogram series observe()", observe),
+        ("counter series inc()", inc),
+    ):
+        overhead = per_op(body, args.ops) - baseline
+        results[name] = overhead
+        print(f"{name:44s} {overhead * 1e6:6.3f} us/op overhead")
+
+    base_mt = threaded(bare, args.ops, args.threads)
+    for name, body in (("with span(series)", with_span), ("@span(series) decorated call", decorated)):
+        overhead = threaded(body, args.ops, args.threads) - base_mt
+        results[f"{name}, {args.threads} threads"] = overhead
+        print(f"{name + f', {args.threads} threads':44s} {overhead * 1e6:6.3f} us/op overhead")
+
+    spans = {k: v for k, v in results.items() if "span" in k}
+    worst = max(spans, key=spans.get)
+    verdict = "within" if spans[worst] * 1e6 <= BUDGET_US else "OVER"
+    print(f"\nworst span: {worst} {spans[worst] * 1e6:.3f} us, {verdict} the {BUDGET_US:.0f} us budget")
+    recorded = series.count
+    print(f"(recorded {recorded} observations; render() of {len(metrics.render())} bytes)")
+
+
+if __name__ == "__main__":
+    main()
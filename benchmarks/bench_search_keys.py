@@ -0,0 +1,99 @@
+"""
+Spelling-variant resolution and latency of the folded search keys
+(src/database/search_keys.py) versus matching the three raw NAMC_term
+columns with LIKE, on IAST_Sanskrit_Matching.csv replicated `--scale` times.
+
+The test set comes from the CSV itself: for every term, its ITRANS
+(NAMC_term), IAST (NAMC_term_diacritical), Devanagari (NAMC_term_DEVANAGARI)
+and plain-ASCII spellings must all resolve to the term's NAMC_CODE.
+
+    python -m benchmarks.bench_search_keys --scale 100 --queries 500
+"""
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+
+from benchmarks.bench_term_search import build, percentiles
+from src.database.search_keys import rebuild_search_keys
+from src.services.term_search import find_by_search_key
+
+
+def plain_ascii(text: str) -> str:
+    """What a clinician types without an IAST keyboard: vikāraḥ -> vikarah."""
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def variant_set(rows: list) -> list:
+    """(variant kind, spelling, expected NAMC_CODE) for every term in the CSV."""
+    cases = []
+    for r in rows:
+        code, itrans, iast, devanagari = r[1], r[2], r[3], r[4]
+        if not code:
+            continue
+        for kind, text in (
+            ("itrans", itrans),
+            ("iast", iast),
+            ("devanagari", devanagari),
+            ("plain", plain_ascii(iast or "")),
+        ):
+            if text and text.strip():
+                cases.append((kind, text.strip(), code))
+    return cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        start = time.perf_counter()
+        rows = build(db_path, args.scale)
+        conn = sqlite3.connect(db_path)
+        stored = rebuild_search_keys(conn, ["namaste_terms"])
+        conn.commit()
+        print(
+            f"{len(rows) * args.scale} rows, {stored['namaste_terms']} search keys "
+            f"built in {time.perf_counter() - start:.1f}s"
+        )
+
+        cases = variant_set(rows)
+        by_kind = {}
+        for kind, text, code in cases:
+            codes = {m["code"].split("#")[0] for m in find_by_search_key(conn, text, limit=args.scale * 4)}
+            hit, total = by_kind.get(kind, (0, 0))
+            by_kind[kind] = (hit + (code in codes), total + 1)
+        for kind, (hit, total) in by_kind.items():
+            print(f"{kind:10s}: {hit}/{total} variants resolved ({100 * hit / total:.1f}%)")
+
+        sample = random.sample(cases, min(args.queries, len(cases)))
+        like, keyed = [], []
+        for _, text, _ in sample:
+            t = time.perf_counter()
+            conn.execute(
+                "SELECT NAMC_CODE FROM namaste_terms WHERE NAMC_term LIKE ? "
+                "OR NAMC_term_diacritical LIKE ? OR NAMC_term_DEVANAGARI LIKE ? LIMIT 50",
+                (text, text, text),
+            ).fetchall()
+            like.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            find_by_search_key(conn, text, limit=50)
+            keyed.append(time.perf_counter() - t)
+        conn.close()
+
+    for name, samples in (("3x LIKE", like), ("search key", keyed)):
+        p50, p99 = percentiles(samples)
+        print(f"{name:10s}: p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Wall time and peak memory of ICDSimilarityScorer (src/utils/score_icd_mapping.py)
+scoring every NAMASTE code (ayurveda, siddha and unani sheets) against
+`--entities` ICD entities: the fixture snapshot padded with synthetic titles.
+
+    python -m benchmarks.bench_similarity_scoring --entities 35000 --chunk-size 512
+"""
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.bench_icd_local import FIXTURE, synthetic_entities
+from src.api.icd_local import load_snapshot
+from src.utils import build_namaste_master_db as namaste_builder
+from src.utils.score_icd_mapping import ICDSimilarityScorer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entities", type=int, default=35000)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    entities = synthetic_entities(load_snapshot(FIXTURE), args.entities)
+    with tempfile.TemporaryDirectory() as tmp:
+        namaste_builder.DB_PATH = str(Path(tmp) / "namaste_master.db")
+        namaste_builder.build_namaste_master_db()
+
+        scorer = ICDSimilarityScorer(db_path=namaste_builder.DB_PATH, top_k=args.top_k, chunk_size=args.chunk_size)
+        tracemalloc.start()
+        start = time.perf_counter()
+        report = scorer.build(entities=entities)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        conn = sqlite3.connect(namaste_builder.DB_PATH)
+        classes = Counter(e for (e,) in conn.execute("SELECT equivalence FROM namaste_icd_map WHERE rank = 1"))
+        conn.close()
+
+    pairs = report["terms"] * report["entities"]
+    print(
+        f"{report['terms']} terms × {report['entities']} entities = {pairs / 1e6:.0f}M pairs in {elapsed:.2f}s "
+        f"(vectorize {report['vectorize_seconds']:.2f}s, score {report['score_seconds']:.2f}s, "
+        f"write {report['write_seconds']:.2f}s); {pairs / report['score_seconds'] / 1e6:.0f}M pairs/s, "
+        f"peak traced memory {peak / 2**20:.0f} MiB"
+    )
+    print(f"Top-1 equivalence classes: {dict(classes)}")
+
+
+if __name__ == "__main__":
+    main()
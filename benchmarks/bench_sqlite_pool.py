@@ -0,0 +1,89 @@
+"""
+Point-lookup throughput with N threads: SQLitePool readers
+(src/database/pool.py) versus get_sqlite_connection() per query, on the
+NAMASTE master DB built from the three code sheets.
+
+    python -m benchmarks.bench_sqlite_pool --threads 1 4 16 --seconds 2
+"""
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from src.database import SQLitePool, get_sqlite_connection
+from src.utils import build_namaste_master_db as namaste_builder
+
+QUERY = "SELECT code, english_term, description FROM namaste_ayurveda WHERE code = ?"
+
+
+def run(threads: int, seconds: float, lookup) -> float:
+    """Queries per second with `threads` threads calling `lookup()` for `seconds`."""
+    counts = [0] * threads
+    stop = threading.Event()
+
+    def worker(i: int) -> None:
+        while not stop.is_set():
+            lookup()
+            counts[i] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in pool:
+        t.join()
+    return sum(counts) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--pool-size", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "namaste_master.db")
+        namaste_builder.DB_PATH = db_path
+        namaste_builder.build_namaste_master_db()
+        conn = sqlite3.connect(db_path)
+        codes = [c for (c,) in conn.execute("SELECT code FROM namaste_ayurveda")]
+        conn.close()
+
+        def fresh() -> None:
+            conn = get_sqlite_connection(db_path)
+            try:
+                conn.execute(QUERY, (random.choice(codes),)).fetchall()
+            finally:
+                conn.close()
+
+        pool = SQLitePool(db_path, size=args.pool_size)
+
+        def pooled() -> None:
+            with pool.reader() as conn:
+                conn.execute(QUERY, (random.choice(codes),)).fetchall()
+
+        for threads in args.threads:
+            fresh_qps = run(threads, args.seconds, fresh)
+            pooled_qps = run(threads, args.seconds, pooled)
+            print(
+                f"{threads:3d} threads: fresh connection {fresh_qps:9.0f} q/s   "
+                f"pool {pooled_qps:9.0f} q/s   ({pooled_qps / fresh_qps:.1f}x)"
+            )
+        stats = pool.stats()
+        pool.close()
+
+    print(
+        f"pool: {stats['reader_checkouts']} checkouts, {stats['readers_open']} readers, "
+        f"{stats['reader_waits']} waited (mean {stats['mean_reader_wait_ms']:.3f} ms, "
+        f"max {stats['max_reader_wait_ms']:.3f} ms), {stats['reader_timeouts']} timeouts"
+    )
+
+
+if __name__ == "__main__":
+    main()
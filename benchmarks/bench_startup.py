@@ -0,0 +1,178 @@
+"""
+Startup cost of each entry point: `python -X importtime` of its module (with
+the heaviest third-party packages it pulls in), then time-to-first-answer of
+a fresh process against a synthetic NAMASTE master DB and the mock ICD
+server, and finally the preload phase run sequentially versus in parallel.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import http.client
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import urlencode
+
+from benchmarks.bench_export import build_db
+from benchmarks.bench_translate import free_port
+from benchmarks.mock_icd_server import MockICDServer
+from src.services.translate import namaste_system_uri
+
+ENTRY_POINTS = [
+    "src.api.icd_search",
+    "src.api.batch_map",
+    "src.services.translate",
+    "src.services.startup",
+    "src.services.initialize",
+    "src.utils.build_terminology_master_db",
+    "src.utils.build_namaste_master_db",
+    "src.utils.build_icd_mapping_db",
+]
+HEAVY = ("aiohttp", "requests", "urllib3", "redis", "psycopg2", "pandas", "numpy", "scipy", "dotenv", "asyncio")
+IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def importtime(module: str) -> Tuple[float, Dict[str, float]]:
+    """(cumulative ms of `module`, {heavy top-level package: cumulative ms}) from one fresh interpreter."""
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    total = 0.0
+    heavy: Dict[str, float] = {}
+    for line in err.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, name = int(match.group(1)) / 1000, match.group(3)
+        if name == module:
+            total = cumulative
+        if name in HEAVY:
+            heavy[name] = max(heavy.get(name, 0.0), cumulative)
+    return total, heavy
+
+
+def first_answer(argv: List[str], env: Dict[str, str], ask: Callable[[subprocess.Popen], None]) -> float:
+    """Seconds from spawning `argv` until `ask(proc)` got its first answer."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        argv, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        ask(proc)
+        return time.perf_counter() - start
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def ask_stdout(proc: subprocess.Popen) -> None:
+    if not proc.stdout.readline():
+        raise RuntimeError(f"{proc.args} exited without output")
+
+
+def ask_serve(proc: subprocess.Popen) -> None:
+    proc.stdin.write(json.dumps({"id": 1, "query": "fever"}) + "\n")
+    proc.stdin.flush()
+    response = json.loads(proc.stdout.readline())
+    if not response["success"]:
+        raise RuntimeError(response["error"])
+
+
+def ask_http(port: int, path: str) -> Callable[[subprocess.Popen], None]:
+    def ask(proc: subprocess.Popen) -> None:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{proc.args} exited with {proc.returncode}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+                conn.request("GET", path)
+                status = conn.getresponse().status
+                conn.close()
+                if status == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.005)
+    return ask
+
+
+def median_ms(samples: List[float]) -> str:
+    return f"{statistics.median(samples) * 1000:8.1f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--codes", type=int, default=30000, help="NAMASTE codes in the synthetic master DB")
+    args = parser.parse_args()
+
+    print("python -X importtime (median of runs, cumulative):")
+    for module in ENTRY_POINTS:
+        runs = [importtime(module) for _ in range(args.runs)]
+        heavy = {name: statistics.median(r[1].get(name, 0.0) for r in runs) for name in runs[0][1]}
+        pulled = ", ".join(f"{name} {ms:.0f}" for name, ms in sorted(heavy.items(), key=lambda x: -x[1]) if ms >= 1)
+        print(f"  {module:40s} {statistics.median(r[0] for r in runs):7.1f} ms   {pulled or '-'}")
+
+    with tempfile.TemporaryDirectory() as tmp, MockICDServer() as icd:
+        db_path = str(Path(tmp) / "namaste_master.db")
+        build_db(db_path, args.codes, 5)
+        codes = Path(tmp) / "codes.csv"
+        codes.write_text("code\nA0000001\n", encoding="utf-8")
+        env = {
+            **os.environ, **icd.env(), "PYTHONUNBUFFERED": "1",
+            "NAMASTE_MASTER_DB": db_path, "WHO_TERMINOLOGIES_MASTER_DB": db_path,
+        }
+
+        print("\ntime to first answer (fresh process, median of runs):")
+        cases = {
+            "icd_search <query>": lambda: first_answer(
+                [sys.executable, "-m", "src.api.icd_search", "fever"], env, ask_stdout),
+            "icd_search --serve, first query": lambda: first_answer(
+                [sys.executable, "-m", "src.api.icd_search", "--serve"], env, ask_serve),
+            "batch_map, first result": lambda: first_answer(
+                [sys.executable, "-m", "src.api.batch_map", str(codes), "--db", db_path, "--source", "namaste_ayurveda"],
+                env, ask_stdout),
+        }
+        for name, case in cases.items():
+            print(f"  {name:34s} {median_ms([case() for _ in range(args.runs)])}")
+        samples = []
+        for _ in range(args.runs):
+            port = free_port()
+            samples.append(first_answer(
+                [sys.executable, "-m", "src.services.translate", "--db", db_path, "--release", "2024-01",
+                 "--port", str(port)],
+                env, ask_http(port, "/ConceptMap/$translate?" + urlencode(
+                    {"system": namaste_system_uri("ayurveda"), "code": "A0000001"})),
+            ))
+        print(f"  {'translate server, first $translate':34s} {median_ms(samples)}")
+
+        print("\npreload phase in process (term_store + search_cache + token + translate):")
+        code = (
+            "import json, sys; from src.services.startup import ServiceStartup, preloaders; "
+            "s = ServiceStartup(preloaders('term_store,search_cache,token,translate'), workers=int(sys.argv[1])).run(); "
+            "print(json.dumps(s.status()))"
+        )
+        for label, workers in (("sequential", 1), ("parallel", 0)):
+            runs = [
+                json.loads(subprocess.run(
+                    [sys.executable, "-c", code, str(workers)], env=env, capture_output=True, text=True, check=True,
+                ).stdout)
+                for _ in range(args.runs)
+            ]
+            if not runs[0]["ready"]:
+                raise RuntimeError(runs[0]["errors"])
+            phases = {phase: statistics.median(r["timings_ms"][phase] for r in runs) for phase in runs[0]["timings_ms"]}
+            print(f"  {label:10s} " + "  ".join(f"{phase} {ms:.1f}" for phase, ms in phases.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+p50/p99 latency of the backend's `NAMC_term LIKE '%q%'` scan versus the
+FTS5 BM25 search in src/services/term_search.py, on IAST_Sanskrit_Matching.csv
+replicated `--scale` times (default 100x) and loaded with src/database/load_csv.py.
+
+    python -m benchmarks.bench_term_search --scale 100 --queries 200
+"""
+
+import argparse
+import csv
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_load_csv import CSV_PATH, replicate_csv
+from src.database.fts import rebuild_fts
+from src.database.load_csv import iter_csv_rows, load_namaste_terms
+from src.services.term_search import search_terms
+
+
+def build(db_path: Path, scale: int) -> tuple:
+    """namaste_terms from the shipped CSV replicated `scale` times, via load_csv; returns (source rows, rows loaded)."""
+    csv_path = db_path.with_suffix(".csv")
+    with CSV_PATH.open(newline="", encoding="utf-8") as f:
+        records = sum(1 for _ in csv.reader(f)) - 1
+    replicate_csv(csv_path, scale * records)
+    conn = sqlite3.connect(db_path)
+    loaded = load_namaste_terms(conn, csv_path)["rows_inserted"]
+    rebuild_fts(conn)
+    conn.commit()
+    conn.close()
+    return list(iter_csv_rows(CSV_PATH)), loaded
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return (
+        1000 * statistics.median(samples),
+        1000 * samples[min(len(samples) - 1, int(0.99 * len(samples)))],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        start = time.perf_counter()
+        rows, loaded = build(db_path, args.scale)
+        print(f"{loaded} rows built and indexed in {time.perf_counter() - start:.1f}s")
+
+        words = [w for r in rows for w in (r[2] or "").split() if len(w) > 3]
+        queries = [random.choice(words)[: random.randint(4, 8)] for _ in range(args.queries)]
+
+        conn = sqlite3.connect(db_path)
+        like, fts = [], []
+        for q in queries:
+            t = time.perf_counter()
+            conn.execute("SELECT * FROM namaste_terms WHERE NAMC_term LIKE ? LIMIT 50", (f"%{q}%",)).fetchall()
+            like.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            search_terms(conn, q, limit=50, sources=["namaste_terms"])
+            fts.append(time.perf_counter() - t)
+        conn.close()
+
+    for name, samples in (("LIKE '%q%'", like), ("FTS5 bm25", fts)):
+        p50, p99 = percentiles(samples)
+        print(f"{name:11s}: p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Code lookups from the in-memory TerminologyStore (src/services/term_store.py)
+versus a SQLite query per request, plus per-process memory of each approach,
+on the NAMASTE master DB built from the three code sheets.
+
+    python -m benchmarks.bench_term_store --lookups 50000 --workers 4
+
+Memory is measured in separate worker processes (RSS and private/shared
+bytes from /proc/self/smaps_rollup) after every code has been looked up once:
+"snapshot" workers map one shared file, "in-memory" workers each build
+their own store, "dict" workers hold the rows as plain Python dicts.
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.database.fts import existing_sources
+from src.schema.table_schema import TableSchemas
+from src.services.term_store import FIELDS, TerminologyStore, _db_rows
+from src.utils import build_namaste_master_db as namaste_builder
+
+
+def memory() -> dict:
+    """KiB figures for this process (Linux only)."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def child(mode: str, db_path: str, snapshot: str, hold: float) -> None:
+    """Loads the store one way, touches every code, prints its memory delta as JSON."""
+    before = memory()
+    if mode == "snapshot":
+        store = TerminologyStore.open(snapshot)
+        lookup = store.lookup
+        codes = [record["code"] for record in store.records()]
+    elif mode == "in-memory":
+        store = TerminologyStore.from_db([db_path])
+        lookup = store.lookup
+        codes = [record["code"] for record in store.records()]
+    else:
+        table = {}
+        for row in _db_rows([db_path]):
+            table.setdefault(row[1], dict(zip(FIELDS, row)))
+        lookup = table.get
+        codes = list(table)
+    for code in codes:
+        lookup(code)
+    del codes
+    after = memory()
+    print(json.dumps({k: after[k] - before[k] for k in after}), flush=True)
+    # Keep the mapping alive while sibling workers measure, so shared pages are counted as shared
+    time.sleep(hold)
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[int(0.99 * (len(samples) - 1))]
+    return f"p50 {p50 * 1e6:7.1f} us   p99 {p99 * 1e6:7.1f} us"
+
+
+def time_lookups(codes: list, lookup) -> list:
+    samples = []
+    for code in codes:
+        start = time.perf_counter()
+        lookup(code)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--child", choices=["snapshot", "in-memory", "dict"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--snapshot", help=argparse.SUPPRESS)
+    parser.add_argument("--hold", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.db, args.snapshot, args.hold)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "namaste_master.db")
+        snapshot = str(Path(tmp) / "term_store.bin")
+        namaste_builder.DB_PATH = db_path
+        namaste_builder.build_namaste_master_db()
+
+        start = time.perf_counter()
+        store = TerminologyStore.from_db([db_path])
+        build = time.perf_counter() - start
+        store.save(snapshot)
+        start = time.perf_counter()
+        mapped = TerminologyStore.open(snapshot)
+        open_seconds = time.perf_counter() - start
+        stats = store.stats()
+        print(
+            f"store: {stats['records']} records, {stats['strings']} distinct strings, "
+            f"{stats['bytes'] / 1024:.0f} KiB; built in {build * 1000:.0f} ms, "
+            f"snapshot mapped in {open_seconds * 1e6:.0f} us"
+        )
+
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        sources = existing_sources(conn)
+        queries = [
+            "SELECT ?, {code}, {term}, {english_term}, {description} FROM {table} WHERE {code} = ?".format(
+                table=table, **TableSchemas.FTS_SOURCES[table]
+            )
+            for table in sources
+        ]
+        all_codes = [row[1] for row in _db_rows([db_path])]
+        codes = [random.choice(all_codes) for _ in range(args.lookups)]
+        misses = [f"ZZZ{i}" for i in range(args.lookups // 10)]
+
+        def sqlite_lookup(conn: sqlite3.Connection, code: str):
+            for table, sql in zip(sources, queries):
+                row = conn.execute(sql, (table, code)).fetchone()
+                if row:
+                    return dict(zip(FIELDS, row))
+            return None
+
+        def sqlite_fresh(code: str):
+            fresh = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                return sqlite_lookup(fresh, code)
+            finally:
+                fresh.close()
+
+        assert all(mapped.lookup(c)["code"] == c for c in codes[:1000])
+        for label, lookup, sample in [
+            ("sqlite, new connection", sqlite_fresh, codes[: args.lookups // 10]),
+            ("sqlite, open connection", lambda code: sqlite_lookup(conn, code), codes),
+            ("store, in-memory", store.lookup, codes),
+            ("store, mapped snapshot", mapped.lookup, codes),
+            ("store, mapped, misses", mapped.lookup, misses),
+        ]:
+            print(f"{label:26s} {percentiles(time_lookups(sample, lookup))}")
+        conn.close()
+
+        print(f"\nper-process memory delta, {args.workers} workers each (KiB):")
+        for mode in ("dict", "in-memory", "snapshot"):
+            procs = [
+                subprocess.Popen(
+                    [sys.executable, "-m", "benchmarks.bench_term_store", "--child", mode,
+                     "--db", db_path, "--snapshot", snapshot, "--hold", "2"],
+                    stdout=subprocess.PIPE, text=True,
+                )
+                for _ in range(args.workers)
+            ]
+            results = [json.loads(p.stdout.readline()) for p in procs]
+            for p in procs:
+                p.wait()
+            mean = {k: statistics.mean(r[k] for r in results) for k in results[0]}
+            print(
+                f"  {mode:10s} rss {mean['rss']:8.0f}   private {mean['private']:8.0f}   "
+                f"shared {mean['shared']:8.0f}   pss {mean['pss']:8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
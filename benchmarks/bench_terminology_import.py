@@ -0,0 +1,91 @@
+"""
+Wall time and peak RSS of TerminologyMasterDB imports over a generated
+WHO Ayurveda terminology file (default 1,000,000 records).
+
+Each mode runs in its own child process so peak RSS is measured in isolation:
+    legacy   one INSERT per record, json.load
+    batched  executemany per column set, json.load
+    stream   executemany per column set, incremental JSON parsing
+
+    python -m benchmarks.bench_terminology_import --records 1000000
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MODES = {
+    "legacy": {"batch_size": 0},
+    "batched": {"stream_min_bytes": 1 << 62},
+    "stream": {"stream_min_bytes": 0},
+}
+
+
+def generate(path: Path, records: int) -> None:
+    """Writes a WHO-style JSON array without building it in memory."""
+    with path.open("w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(records):
+            record = {
+                "term_id": f"ITA-{i // 1000}.{i % 1000}",
+                "english_term": f"Disorder of vata {i}",
+                "description": "A disorder characterized by impaired movements of vata " * 2,
+                "sanskrit_IAST": f"vātavikāraḥ-{i}",
+                "sanskrit_devanagari": "वातविकारः",
+            }
+            if i % 10 == 0:
+                del record["sanskrit_devanagari"]  # a second column set
+            f.write(("," if i else "") + json.dumps(record, ensure_ascii=False) + "\n")
+        f.write("]\n")
+
+
+def child(mode: str, folder: str, db: str) -> None:
+    import logging
+    from src.utils.build_terminology_master_db import TerminologyMasterDB
+
+    logging.disable(logging.INFO)
+    start = time.perf_counter()
+    TerminologyMasterDB(db_path=db, json_folder=folder, **MODES[mode]).build_from_folder()
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "seconds": elapsed, "peak_rss_mib": peak_kib / 1024}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "FOLDER", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "json"
+        folder.mkdir()
+        source = folder / "WHO_ayurveda_terminologies.json"
+        generate(source, args.records)
+        size_mib = source.stat().st_size / 2**20
+        print(f"{args.records} records, {size_mib:.1f} MiB")
+        for mode in args.modes:
+            db = Path(tmp) / f"{mode}.db"
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_terminology_import", "--child", mode, str(folder), str(db)],
+                check=True, capture_output=True, text=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{mode:8s}: {result['seconds']:7.2f}s  {args.records / result['seconds']:10.0f} rows/s  "
+                f"peak RSS {result['peak_rss_mib']:7.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Counts token endpoint calls triggered by a burst of concurrent ICD searches.
+
+A fresh ICDTokenManager faces 1,000 concurrent queries against the local
+mock server; single-flight refresh should reduce this to one token call.
+The baseline re-fetches a token per query, as get_token() used to.
+`--expires-in` sets the token lifetime the mock hands out; short (below the
+60s refresh margin) or zero lifetimes must still cost one token call.
+
+    python -m benchmarks.bench_token_burst --queries 1000 --threads 64 [--expires-in 30]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_icd_server import MockICDServer
+
+
+def run_burst(search, queries, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(search, queries))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.005, help="mock server latency in seconds")
+    parser.add_argument("--expires-in", type=int, default=3600, help="token lifetime returned by the mock")
+    args = parser.parse_args()
+
+    with MockICDServer(latency=args.latency, expires_in=args.expires_in) as server:
+        os.environ.update(server.env())
+        from src.api import icd_search
+        from src.api.token_manager import ICDTokenManager
+
+        queries = [f"query {i}" for i in range(args.queries)]
+
+        baseline = run_burst(
+            lambda q: icd_search.search_icd(icd_search.request_token()["access_token"], q),
+            queries, args.threads,
+        )
+        baseline_calls = server.token_calls
+
+        manager = ICDTokenManager(icd_search.request_token, background=False)
+        managed = run_burst(lambda q: icd_search.search_icd(manager.get(), q), queries, args.threads)
+        managed_calls = server.token_calls - baseline_calls
+
+    print(f"token per query : {baseline_calls:5d} token calls, {args.queries / baseline:8.1f} queries/s")
+    print(f"ICDTokenManager : {managed_calls:5d} token calls, {args.queries / managed:8.1f} queries/s")
+    if managed_calls != 1:
+        raise SystemExit(f"expected 1 token call for the burst, got {managed_calls}")
+
+
+if __name__ == "__main__":
+    main()
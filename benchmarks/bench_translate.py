@@ -0,0 +1,162 @@
+"""
+ConceptMap/$translate (src/services/translate.py) on a synthetic mapping set:
+in-process latency against a SQLite lookup per request, then an HTTP load
+test with concurrent keep-alive clients against the server in its own process.
+
+    python -m benchmarks.bench_translate --codes 30000 --clients 1 8 32 --seconds 3
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks.bench_export import build_db
+from src.services.translate import MappingIndex, TranslateService, namaste_system_uri
+from src.utils.build_icd_mapping_db import lookup_mapping
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    return (
+        f"p50 {statistics.median(samples) * 1e6:7.1f} us   "
+        f"p99 {samples[int(0.99 * (len(samples) - 1))] * 1e6:7.1f} us"
+    )
+
+
+def timed(calls: list) -> list:
+    samples = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def load(port: int, paths: list, clients: int, seconds: float, etags: dict = None) -> tuple:
+    """(requests/s, latencies) with `clients` threads on keep-alive connections; `etags` sends If-None-Match."""
+    latencies = [[] for _ in range(clients)]
+    stop = threading.Event()
+
+    def client(i: int) -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        rng = random.Random(i)
+        while not stop.is_set():
+            path = rng.choice(paths)
+            headers = {"If-None-Match": etags[path]} if etags else {}
+            start = time.perf_counter()
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            latencies[i].append(time.perf_counter() - start)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    merged = [x for per_client in latencies for x in per_client]
+    return len(merged) / seconds, merged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--codes", type=int, default=30000)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "namaste_master.db")
+        rows = build_db(db_path, args.codes, args.top_k)
+
+        start = time.perf_counter()
+        service = TranslateService(MappingIndex.from_db(db_path, "2024-01"))
+        print(f"{rows} mappings, index built in {time.perf_counter() - start:.2f}s: {service.index.stats()}")
+
+        keys = list(service.index.forward)
+        icd_codes = list(service.index.reverse)
+        forward = [
+            {"system": namaste_system_uri(system), "code": code}
+            for system, code in (random.choice(keys) for _ in range(args.lookups))
+        ]
+        reverse = [{"code": random.choice(icd_codes), "reverse": "true"} for _ in range(args.lookups // 10)]
+
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+        def sqlite_translate(params):
+            system = params["system"].rsplit("namaste-", 1)[1]
+            return json.dumps(lookup_mapping(conn, system, params["code"], "2024-01")).encode("utf-8")
+
+        print(f"{'sqlite + json per request':28s} {percentiles(timed([lambda p=p: sqlite_translate(p) for p in forward]))}")
+        conn.close()
+        print(f"{'translate, first call':28s} {percentiles(timed([lambda p=p: service.translate(p) for p in forward]))}")
+        print(f"{'translate, cached':28s} {percentiles(timed([lambda p=p: service.translate(p) for p in forward]))}")
+        etags = {id(p): service.translate(p)[1]["ETag"] for p in forward}
+        print(f"{'translate, If-None-Match':28s} "
+              f"{percentiles(timed([lambda p=p: service.translate(p, etags[id(p)]) for p in forward]))}")
+        print(f"{'reverse translate':28s} {percentiles(timed([lambda p=p: service.translate(p) for p in reverse]))}")
+        bundle = {
+            "resourceType": "Bundle", "type": "batch",
+            "entry": [{"request": {"method": "GET", "url": "ConceptMap/$translate?" + urlencode(p)}} for p in forward[:100]],
+        }
+        print(f"{'batch Bundle, 100 entries':28s} {percentiles(timed([lambda: service.bundle(bundle)] * 200))}")
+
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "src.services.translate", "--db", db_path, "--release", "2024-01", "--port", str(port)],
+            stdout=subprocess.PIPE, text=True, env={**os.environ, "PYTHONUNBUFFERED": "1"},
+        )
+        try:
+            server.stdout.readline()  # stats line: index loaded, server about to listen
+            for _ in range(100):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            paths = ["/ConceptMap/$translate?" + urlencode(p) for p in forward[:5000]]
+            print("\nHTTP, keep-alive clients against the server process:")
+            for clients in args.clients:
+                rps, latencies = load(port, paths, clients, args.seconds)
+                print(f"  {clients:3d} clients   200: {rps:7.0f} req/s  {percentiles(latencies)}")
+            http_etags = {}
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            for path in paths:
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                resp.read()
+                http_etags[path] = resp.getheader("ETag")
+            conn.close()
+            for clients in args.clients:
+                rps, latencies = load(port, paths, clients, args.seconds, http_etags)
+                print(f"  {clients:3d} clients   304: {rps:7.0f} req/s  {percentiles(latencies)}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
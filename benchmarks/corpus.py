@@ -0,0 +1,238 @@
+"""
+Synthetic terminology corpora for the benchmark suite, at any scale:
+
+    who/WHO_<system>_terminologies.json   TerminologyMasterDB.build_from_folder input
+    namaste/<system>.xls                  build_namaste_master_db input (NAMC_*/NUMC_* headers)
+    IAST_Sanskrit_Matching.csv            namaste_terms input (src/database/load_csv.py)
+
+Terms are drawn from a fixed vocabulary with a seeded RNG, so the same
+scale always produces the same files, and every term carries its index so
+ICD searches built from them never hit the search cache.
+
+The sheets are written as minimal BIFF8 workbooks (one worksheet, text and
+number cells, no formatting) because no Excel writer is a dependency of
+this repo; pandas reads them back through xlrd like the shipped sheets.
+
+    python -m benchmarks.corpus OUT_DIR --who-records 100000 --namaste-codes 20000 --terms-rows 100000
+"""
+
+import argparse
+import json
+import random
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from benchmarks.bench_load_csv import replicate_csv
+
+SYSTEMS = ("ayurveda", "siddha", "unani")
+
+DOSHAS = ("vata", "pitta", "kapha", "rakta", "ama", "ojas", "agni", "mala")
+CONDITIONS = (
+    "jvara", "kasa", "shvasa", "atisara", "grahani", "pandu", "kamala", "prameha", "amlapitta", "shotha",
+    "arsha", "kushtha", "unmada", "apasmara", "shiroroga", "karnanada", "badhirya", "hikka", "trishna", "murccha",
+)
+ENGLISH = (
+    "fever", "cough", "dyspnoea", "diarrhoea", "malabsorption", "anaemia", "jaundice", "diabetes", "hyperacidity",
+    "oedema", "haemorrhoids", "dermatosis", "insanity", "epilepsy", "headache", "tinnitus", "deafness",
+    "hiccup", "thirst", "syncope",
+)
+QUALIFIERS = ("disorder of", "aggravation of", "depletion of", "obstruction of", "vitiation of", "imbalance of")
+
+# Headers of the shipped NAMASTE sheets (data/namaste_codes/*.xls)
+NAMASTE_HEADERS = {
+    "ayurveda": ["Sr No.", "NAMC_ID", "NAMC_CODE", "NAMC_term", "NAMC_term_diacritical", "NAMC_term_DEVANAGARI",
+                 "Short_definition", "Long_definition", "Ontology_branches"],
+    "siddha": ["Sr No.", "NAMC_ID", "NAMC_CODE", "NAMC_TERM", "Tamil_term", "Short_definition", "Long_definition",
+               "Reference"],
+    "unani": ["Sr No.", "NUMC_ID", "NUMC_CODE", "Arabic_term", "NUMC_TERM", "Short_definition", "Long_definition"],
+}
+NAMASTE_PREFIX = {"ayurveda": "AY", "siddha": "SI", "unani": "UN"}
+NATIVE = {"ayurveda": "वातविकारः", "siddha": "வாதநோய்", "unani": "مرض بارد"}
+
+XLS_MAX_ROWS = 65536  # BIFF8 worksheet limit, header row included
+
+
+def term(rng: random.Random, i: int) -> Dict[str, str]:
+    """One synthetic term: a condition of a dosha, in transliteration and English."""
+    k = rng.randrange(len(CONDITIONS))
+    dosha = rng.choice(DOSHAS)
+    return {
+        "translit": f"{dosha}-{CONDITIONS[k]}-{i}",
+        "english": f"{rng.choice(QUALIFIERS).capitalize()} {dosha} with {ENGLISH[k]} {i}",
+        "definition": f"A condition of {dosha} presenting as {ENGLISH[k]} {i}, "
+                      f"characterised by {ENGLISH[rng.randrange(len(ENGLISH))]}",
+    }
+
+
+def query_words() -> Sequence[str]:
+    """Words that occur in the generated terms, for search benchmarks."""
+    return DOSHAS + CONDITIONS + ENGLISH
+
+
+# ---------------------------------------------------------------- WHO JSON
+
+def write_who_json(path: Path, system: str, records: int, seed: int = 7) -> None:
+    """WHO-style JSON array for `system`, streamed to disk (columns of TableSchemas.WHO_TERMINOLOGY_SCHEMAS)."""
+    rng = random.Random(f"{seed}-who-{system}")
+    with path.open("w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(records):
+            t = term(rng, i)
+            record = {
+                "term_id": f"IT{system[0].upper()}-{i // 1000}.{i % 1000}",
+                "english_term": t["english"],
+                "description": t["definition"],
+            }
+            if system == "ayurveda":
+                record.update(sanskrit_IAST=t["translit"], sanskrit_devanagari=NATIVE[system])
+            else:
+                record.update(transliteration=t["translit"], native_term=NATIVE[system])
+            if i % 10 == 0:
+                record.popitem()  # a second column set, as in the WHO files
+            f.write(("," if i else "") + json.dumps(record, ensure_ascii=False) + "\n")
+        f.write("]\n")
+
+
+# ---------------------------------------------------------------- NAMASTE XLS
+
+def namaste_rows(system: str, codes: int, seed: int = 7) -> Iterable[list]:
+    """Rows under NAMASTE_HEADERS[system]; definitions are sparse, as in the shipped sheets."""
+    rng = random.Random(f"{seed}-namaste-{system}")
+    for i in range(codes):
+        t = term(rng, i)
+        code = f"{NAMASTE_PREFIX[system]}-{i}"
+        short = t["english"] if i % 2 == 0 else None
+        long = t["definition"] if i % 3 == 0 else None
+        if system == "ayurveda":
+            yield [i + 1, i + 1, code, t["translit"], t["translit"], NATIVE[system], short, long, None]
+        elif system == "siddha":
+            yield [i + 1, i + 1, code, t["english"], NATIVE[system], short, long, None]
+        else:
+            yield [i + 1, i, code, NATIVE[system], t["english"], short, long]
+
+
+def _record(rtype: int, data: bytes) -> bytes:
+    return struct.pack("<HH", rtype, len(data)) + data
+
+
+def _bof(kind: int) -> bytes:
+    return _record(0x0809, struct.pack("<HHHHII", 0x0600, kind, 0x0DBB, 0x07CC, 0, 0x06))
+
+
+def _cell(row: int, col: int, value: Any) -> bytes:
+    if isinstance(value, (int, float)):
+        return _record(0x0203, struct.pack("<HHHd", row, col, 0, float(value)))  # NUMBER
+    text = str(value)[:4000].encode("utf-16-le")  # keeps the record under the 8224-byte BIFF8 limit
+    return _record(0x0204, struct.pack("<HHHHB", row, col, 0, len(text) // 2, 1) + text)  # LABEL
+
+
+def _worksheet(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    cells = bytearray()
+    nrows = 0
+    for r, values in enumerate([header, *rows]):
+        if r >= XLS_MAX_ROWS:
+            raise ValueError(f"an .xls worksheet holds at most {XLS_MAX_ROWS - 1} data rows")
+        for c, value in enumerate(values):
+            if value is not None:
+                cells += _cell(r, c, value)
+        nrows = r + 1
+    dimensions = _record(0x0200, struct.pack("<IIHHH", 0, nrows, 0, len(header), 0))
+    return _bof(0x0010) + dimensions + bytes(cells) + _record(0x000A, b"")
+
+
+def _compound_file(stream: bytes, name: str = "Workbook") -> bytes:
+    """An OLE2 compound file (512-byte sectors) holding one stream."""
+    sector, ids = 512, 128
+    end, free, fat_mark, difat_mark, nostream = 0xFFFFFFFE, 0xFFFFFFFF, 0xFFFFFFFD, 0xFFFFFFFC, 0xFFFFFFFF
+    stream = stream.ljust(max(len(stream), 4096), b"\0")  # smaller streams would belong in the mini stream
+    data = -(-len(stream) // sector)
+    fat, difat = 1, 0
+    while fat * ids < data + 1 + fat + difat:
+        fat += 1
+        difat = max(0, -(-(fat - 109) // (ids - 1)))
+    first_fat = data + 1
+    first_difat = first_fat + fat
+
+    table = [i + 1 for i in range(data - 1)] + [end, end] + [fat_mark] * fat + [difat_mark] * difat
+    table += [free] * (fat * ids - len(table))
+    fat_ids = list(range(first_fat, first_fat + fat))
+
+    header = struct.pack(
+        "<8s16sHHHHH6sIIIIIIIII",
+        bytes.fromhex("D0CF11E0A1B11AE1"), b"", 0x3E, 3, 0xFFFE, 9, 6, b"",
+        0, fat, data, 0, 4096, end, 0, first_difat if difat else end, difat,
+    )
+    header += struct.pack("<109I", *(fat_ids[:109] + [free] * (109 - len(fat_ids[:109]))))
+
+    def entry(label: str, kind: int, child: int, start: int, size: int) -> bytes:
+        encoded = (label + "\0").encode("utf-16-le") if label else b""
+        return struct.pack(
+            "<64sHBBIII16sIQQIQ", encoded, len(encoded), kind, 1, nostream, nostream, child, b"", 0, 0, 0, start, size,
+        )
+
+    directory = entry("Root Entry", 5, 1, end, 0) + entry(name, 2, nostream, 0, len(stream))
+    directory += entry("", 0, nostream, 0, 0) * 2
+
+    difat_sectors = b""
+    rest = fat_ids[109:]
+    for k in range(difat):
+        chunk = rest[k * (ids - 1):(k + 1) * (ids - 1)]
+        nxt = first_difat + k + 1 if k + 1 < difat else end
+        difat_sectors += struct.pack(f"<{ids}I", *(chunk + [free] * (ids - 1 - len(chunk)) + [nxt]))
+
+    return (
+        header + stream.ljust(data * sector, b"\0") + directory
+        + struct.pack(f"<{len(table)}I", *table) + difat_sectors
+    )
+
+
+def write_xls(path: Path, header: Sequence[str], rows: Iterable[Sequence[Any]], sheet: str = "Sheet1") -> None:
+    """Single-sheet .xls with `header` and `rows` (str and number cells; None leaves a cell empty)."""
+    name = sheet.encode("utf-16-le")
+    boundsheet_size = 4 + 8 + len(name)
+    globals_ = _bof(0x0005) + _record(0x0042, struct.pack("<H", 1200))  # CODEPAGE: UTF-16
+    offset = len(globals_) + boundsheet_size + 4  # + EOF
+    boundsheet = _record(0x0085, struct.pack("<IBBBB", offset, 0, 0, len(sheet), 1) + name)
+    workbook = globals_ + boundsheet + _record(0x000A, b"") + _worksheet(header, rows)
+    path.write_bytes(_compound_file(workbook))
+
+
+def write_namaste_xls(path: Path, system: str, codes: int, seed: int = 7) -> None:
+    write_xls(path, NAMASTE_HEADERS[system], namaste_rows(system, codes, seed))
+
+
+# ---------------------------------------------------------------- corpus
+
+def generate_corpus(
+    out: Path, who_records: int, namaste_codes: int, terms_rows: int, seed: int = 7,
+    systems: Sequence[str] = SYSTEMS,
+) -> Dict[str, Any]:
+    """Writes the three corpora under `out`; returns their paths (NAMASTE sheets per system)."""
+    who = out / "who"
+    namaste = out / "namaste"
+    who.mkdir(parents=True, exist_ok=True)
+    namaste.mkdir(parents=True, exist_ok=True)
+    sheets: Dict[str, str] = {}
+    for system in systems:
+        write_who_json(who / f"WHO_{system}_terminologies.json", system, who_records, seed)
+        sheets[system] = str(namaste / f"{system}.xls")
+        write_namaste_xls(Path(sheets[system]), system, namaste_codes, seed)
+    terms_csv = out / "IAST_Sanskrit_Matching.csv"
+    replicate_csv(terms_csv, terms_rows)
+    return {"who_json": str(who), "namaste_sheets": sheets, "terms_csv": str(terms_csv)}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out", type=Path)
+    parser.add_argument("--who-records", type=int, default=10000, help="WHO records per system")
+    parser.add_argument("--namaste-codes", type=int, default=5000, help="NAMASTE codes per system")
+    parser.add_argument("--terms-rows", type=int, default=10000, help="rows of the NAMASTE terms CSV")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    print(json.dumps(generate_corpus(args.out, args.who_records, args.namaste_codes, args.terms_rows, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
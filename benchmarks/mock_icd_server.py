@@ -0,0 +1,170 @@
+"""
+Local stand-in for the WHO ICD-11 API used by the benchmarks.
+
+Serves the two endpoints src/api/icd_search.py talks to:
+    POST /connect/token                        -> OAuth2 client_credentials token
+    GET  /icd/release/11/2024-01/mms/search    -> flat search results
+
+Point the client at it with ICD_TOKEN_URL / ICD_API_BASE_URL (see `env()`).
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+TOKEN_PATH = "/connect/token"
+SEARCH_PATH = "/icd/release/11/2024-01/mms/search"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class MockICDServer:
+    """
+    Threaded HTTP server with call counters, a configurable per-request
+    latency (plus up to `jitter` seconds, uniformly distributed) and a
+    fraction of searches (`error_rate`) answered with 429 (Retry-After: 0)
+    or 503.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        expires_in: int = 3600,
+        error_rate: float = 0.0,
+        jitter: float = 0.0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.expires_in = expires_in
+        self.error_rate = error_rate
+        self.token_calls = 0
+        self.search_calls = 0
+        self.errors_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that redirect icd_search.py to this server."""
+        return {
+            "ICD_TOKEN_URL": self.url + TOKEN_PATH,
+            "ICD_API_BASE_URL": self.url + SEARCH_PATH,
+        }
+
+    def start(self) -> "MockICDServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockICDServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, attr: str) -> int:
+        with self._lock:
+            value = getattr(self, attr) + 1
+            setattr(self, attr, value)
+            return value
+
+    def _delay(self) -> None:
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment; avoids 40ms delayed-ACK stalls
+            wbufsize = 64 * 1024
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):  # keep benchmark output clean
+                pass
+
+            def _send_json(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                if urlparse(self.path).path != TOKEN_PATH:
+                    return self._send_json(404, {"error": "not found"})
+                n = server._count("token_calls")
+                server._delay()
+                self._send_json(200, {
+                    "access_token": f"mock-token-{n}",
+                    "expires_in": server.expires_in,
+                    "token_type": "Bearer",
+                })
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != SEARCH_PATH:
+                    return self._send_json(404, {"error": "not found"})
+                server._count("search_calls")
+                server._delay()
+                if server.error_rate and random.random() < server.error_rate:
+                    server._count("errors_sent")
+                    if random.random() < 0.5:
+                        return self._send_json(429, {"error": "rate limited"}, {"Retry-After": "0"})
+                    return self._send_json(503, {"error": "unavailable"})
+                query = parse_qs(url.query).get("q", [""])[0]
+                self._send_json(200, {
+                    "error": False,
+                    "destinationEntities": [
+                        {
+                            "id": f"http://id.who.int/icd/entity/{abs(hash(query)) % 10**9}",
+                            "theCode": "ME00",
+                            "title": f"<em class='found'>{query}</em>",
+                            "score": 1.0,
+                        }
+                    ],
+                })
+
+        return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local mock of the WHO ICD-11 API.")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, uniformly random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of searches failing with 429/503")
+    args = parser.parse_args()
+    srv = MockICDServer(port=args.port, latency=args.latency, error_rate=args.error_rate, jitter=args.jitter).start()
+    print(json.dumps(srv.env()))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.stop()
@@ -0,0 +1,389 @@
+"""
+Benchmark suite: master DB builds, term search and end-to-end ICD mapping
+over synthetic corpora (benchmarks/corpus.py) and the local mock ICD server,
+with machine-readable results that can be compared across commits.
+
+Scenarios, each run `--repeat` times in a fresh child process (median kept):
+    who_build      TerminologyMasterDB.build_from_folder: WHO JSON + NAMASTE terms CSV, then a no-op rebuild
+    namaste_build  build_namaste_master_db over the generated .xls sheets
+    term_search    FTS5 search_terms and prefix find_by_search_key on the WHO master DB (p50/p95/p99)
+    icd_mapping    ICDMappingBuilder -> icd_search.cached_search_icd -> mock ICD API (codes/s, p50/p95/p99)
+
+    python -m benchmarks.suite --scale small --latency 0.02 --error-rate 0.01
+    python -m benchmarks.suite --compare bench-results/BASE.json bench-results/HEAD.json
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from benchmarks.corpus import SYSTEMS, generate_corpus, query_words
+from benchmarks.mock_icd_server import MockICDServer
+
+RESULTS_FORMAT = 1
+ROOT = Path(__file__).resolve().parents[1]
+
+SCALES = {
+    "small": {"who_records": 2000, "namaste_codes": 1000, "terms_rows": 5000, "queries": 300, "mapping_codes": 300},
+    "medium": {"who_records": 50000, "namaste_codes": 10000, "terms_rows": 100000, "queries": 1000,
+               "mapping_codes": 2000},
+    "large": {"who_records": 500000, "namaste_codes": 65535, "terms_rows": 1000000, "queries": 2000,
+              "mapping_codes": 10000},
+}
+
+
+def latency_summary(prefix: str, samples: List[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p95/p99 (ms) and throughput of sequential `samples` (seconds each)."""
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        return 1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    return {
+        f"{prefix}_p50_ms": rank(0.50),
+        f"{prefix}_p95_ms": rank(0.95),
+        f"{prefix}_p99_ms": rank(0.99),
+        f"{prefix}_queries_per_second": len(ordered) / sum(ordered) if sum(ordered) else 0.0,
+    }
+
+
+def peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# ---------------------------------------------------------------- scenarios (child process)
+
+def _who_db(ctx: Dict[str, Any], fresh: bool = False) -> Path:
+    from src.utils.build_terminology_master_db import TerminologyMasterDB
+
+    db = Path(ctx["work"]) / "who_master.db"
+    if fresh or not db.exists():
+        db.unlink(missing_ok=True)
+        TerminologyMasterDB(
+            db_path=db, json_folder=ctx["corpus"]["who_json"], terms_csv=ctx["corpus"]["terms_csv"],
+            logger=logging.getLogger("benchmarks.suite"),
+        ).build_from_folder()
+    return db
+
+
+def _namaste_db(ctx: Dict[str, Any], fresh: bool = False) -> Dict[str, Dict[str, float]]:
+    import src.utils.build_namaste_master_db as namaste
+
+    db = Path(ctx["work"]) / "namaste_master.db"
+    namaste.DB_PATH = str(db)
+    namaste.NAMASTE_CODES.clear()
+    namaste.NAMASTE_CODES.update(ctx["corpus"]["namaste_sheets"])
+    if fresh or not db.exists():
+        db.unlink(missing_ok=True)
+        with contextlib.redirect_stdout(sys.stderr):  # the builder prints its progress
+            return namaste.build_namaste_master_db(force=True)
+    return {}
+
+
+def who_build(ctx: Dict[str, Any]) -> Dict[str, float]:
+    from src.utils.build_terminology_master_db import TerminologyMasterDB
+
+    params = ctx["params"]
+    start = time.perf_counter()
+    db = _who_db(ctx, fresh=True)
+    seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    TerminologyMasterDB(
+        db_path=db, json_folder=ctx["corpus"]["who_json"], terms_csv=ctx["corpus"]["terms_csv"],
+        logger=logging.getLogger("benchmarks.suite"),
+    ).build_from_folder()
+    noop = time.perf_counter() - start
+    rows = params["who_records"] * len(SYSTEMS) + params["terms_rows"]
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds,
+        "noop_rebuild_seconds": noop,
+        "db_mib": db.stat().st_size / 2**20,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def namaste_build(ctx: Dict[str, Any]) -> Dict[str, float]:
+    start = time.perf_counter()
+    report = _namaste_db(ctx, fresh=True)
+    seconds = time.perf_counter() - start
+    rows = sum(r["rows_read"] for r in report.values())
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds,
+        "read_seconds": sum(r["read_seconds"] for r in report.values()),
+        "insert_seconds": sum(r["insert_seconds"] for r in report.values()),
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def term_search(ctx: Dict[str, Any]) -> Dict[str, float]:
+    from src.services.term_search import find_by_search_key, search_terms
+
+    db = _who_db(ctx)
+    rng = random.Random(ctx["params"]["seed"])
+    words = query_words()
+    queries = [rng.choice(words) for _ in range(ctx["params"]["queries"])]
+    conn = sqlite3.connect(db)
+    try:
+        fts, keys = [], []
+        for q in queries:
+            t = time.perf_counter()
+            search_terms(conn, q, limit=50)
+            fts.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            find_by_search_key(conn, q[: rng.randint(3, len(q))], prefix=True, limit=50)
+            keys.append(time.perf_counter() - t)
+    finally:
+        conn.close()
+    return {"queries": len(queries), **latency_summary("fts", fts), **latency_summary("search_key", keys)}
+
+
+def icd_mapping(ctx: Dict[str, Any]) -> Dict[str, float]:
+    from src.utils.build_icd_mapping_db import ICDMappingBuilder
+
+    params = ctx["params"]
+    _namaste_db(ctx)
+    db = Path(ctx["work"]) / "icd_mapping.db"
+    shutil.copyfile(Path(ctx["work"]) / "namaste_master.db", db)  # no mapping progress from earlier runs
+
+    latencies: List[float] = []
+    failures: List[str] = []
+
+    class TimedBuilder(ICDMappingBuilder):
+        def pending_codes(self, conn, systems):
+            return super().pending_codes(conn, systems)[: params["mapping_codes"]]
+
+        def _search(self, query):
+            t = time.perf_counter()
+            try:
+                return super()._search(query)
+            except Exception as e:
+                failures.append(type(e).__name__)
+                raise
+            finally:
+                latencies.append(time.perf_counter() - t)
+
+    builder = TimedBuilder(
+        db_path=db, concurrency=params["concurrency"], rate=0,
+        report_every=10**9, logger=logging.getLogger("benchmarks.suite"),
+    )
+    start = time.perf_counter()
+    builder.build()
+    seconds = time.perf_counter() - start
+    summary = latency_summary("search", latencies)
+    del summary["search_queries_per_second"]  # concurrent searches; codes_per_second is the throughput
+    return {
+        "codes": len(latencies),
+        "failed": len(failures),
+        "seconds": seconds,
+        "codes_per_second": len(latencies) / seconds,
+        **summary,
+    }
+
+
+SCENARIOS: Dict[str, Callable[[Dict[str, Any]], Dict[str, float]]] = {
+    "who_build": who_build,
+    "namaste_build": namaste_build,
+    "term_search": term_search,
+    "icd_mapping": icd_mapping,
+}
+
+
+def child(scenario: str, work: str) -> None:
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s [%(name)s]: %(message)s")
+    ctx = json.loads((Path(work) / "suite.json").read_text(encoding="utf-8"))
+    print(json.dumps(SCENARIOS[scenario](ctx)))
+
+
+# ---------------------------------------------------------------- parent
+
+def git_info() -> Dict[str, Any]:
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(status) if status is not None else None,
+    }
+
+
+def run_scenario(scenario: str, work: Path, env: Dict[str, str], repeat: int, verbose: bool) -> Dict[str, Any]:
+    """Median of each metric over `repeat` child runs, or {"error": ...} if a run failed."""
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--child", scenario, str(work)],
+            cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=None if verbose else subprocess.PIPE, text=True,
+        )
+        if proc.returncode != 0:
+            tail = (proc.stderr or "").strip().splitlines()[-1:] or [f"exit status {proc.returncode}"]
+            return {"error": tail[0]}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    params = {**SCALES[args.scale]}
+    for name in params:
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    params.update(
+        scale=args.scale, seed=args.seed, repeat=args.repeat, concurrency=args.concurrency,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+    )
+    results: Dict[str, Any] = {
+        "format": RESULTS_FORMAT,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_info(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "params": params,
+        "scenarios": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="ayushsetu-bench-") as tmp:
+        work = Path(tmp)
+        start = time.perf_counter()
+        corpus = generate_corpus(
+            work / "corpus", params["who_records"], params["namaste_codes"], params["terms_rows"], params["seed"],
+        )
+        print(f"corpus generated in {time.perf_counter() - start:.1f}s "
+              f"({params['who_records']} WHO records and {params['namaste_codes']} NAMASTE codes per system, "
+              f"{params['terms_rows']} terms rows)")
+        (work / "suite.json").write_text(json.dumps({"work": tmp, "corpus": corpus, "params": params}), encoding="utf-8")
+
+        with MockICDServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate) as icd:
+            env = {**os.environ, **icd.env(), "PYTHONHASHSEED": "0"}
+            for scenario in args.scenarios:
+                before = (icd.token_calls, icd.search_calls, icd.errors_sent)
+                metrics = run_scenario(scenario, work, env, args.repeat, args.verbose)
+                if scenario == "icd_mapping" and "error" not in metrics:
+                    calls = [now - then for now, then in zip((icd.token_calls, icd.search_calls, icd.errors_sent), before)]
+                    metrics.update(zip(("mock_token_calls", "mock_search_calls", "mock_errors_sent"), calls))
+                results["scenarios"][scenario] = metrics
+                print_scenario(scenario, metrics)
+    return results
+
+
+def print_scenario(scenario: str, metrics: Dict[str, Any]) -> None:
+    print(f"\n{scenario}")
+    for metric, value in metrics.items():
+        shown = f"{value:.4g}" if isinstance(value, float) else str(value)
+        print(f"  {metric:28s} {shown:>12s}")
+
+
+# ---------------------------------------------------------------- compare
+
+def direction(metric: str) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 for counts that only describe the run."""
+    if metric.endswith("_per_second"):
+        return 1
+    if metric.endswith(("_seconds", "_ms", "_mib")) or metric == "seconds":
+        return -1
+    return 0
+
+
+def compare(base_path: Path, head_path: Path, threshold: float) -> int:
+    """Prints per-metric changes from base to head; returns the number of regressions beyond `threshold`."""
+    base, head = (json.loads(p.read_text(encoding="utf-8")) for p in (base_path, head_path))
+    label = lambda r: ((r["git"].get("commit") or "?")[:10] + ("+dirty" if r["git"].get("dirty") else ""))
+    print(f"base {label(base)}  ->  head {label(head)}   (regression threshold {threshold:.0%})")
+    differing = {k for k in set(base["params"]) | set(head["params"]) if base["params"].get(k) != head["params"].get(k)}
+    if differing:
+        print(f"warning: params differ ({', '.join(sorted(differing))}); results are not directly comparable")
+
+    regressions = 0
+    for scenario, head_metrics in head["scenarios"].items():
+        base_metrics = base["scenarios"].get(scenario)
+        if not base_metrics or "error" in base_metrics or "error" in head_metrics:
+            print(f"\n{scenario}: not comparable ({(head_metrics.get('error') or 'missing in base')})")
+            continue
+        print(f"\n{scenario}")
+        for metric, new in head_metrics.items():
+            old = base_metrics.get(metric)
+            if old is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            sign = direction(metric)
+            verdict = ""
+            if sign and abs(change) > threshold:
+                worse = change * sign < 0
+                regressions += worse
+                verdict = "REGRESSION" if worse else "improved"
+            print(f"  {metric:28s} {old:12.4g} {new:12.4g} {change:+8.1%}  {verdict}")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--who-records", type=int, help="WHO records per system (overrides --scale)")
+    parser.add_argument("--namaste-codes", type=int, help="NAMASTE codes per system, at most 65535 (.xls limit)")
+    parser.add_argument("--terms-rows", type=int, help="rows of the NAMASTE terms CSV")
+    parser.add_argument("--queries", type=int, help="term search queries")
+    parser.add_argument("--mapping-codes", type=int, help="NAMASTE codes mapped through the ICD search")
+    parser.add_argument("--concurrency", type=int, default=8, help="ICD mapping search threads")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock ICD server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="extra mock latency, uniform in [0, jitter]")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of searches failing with 429/503")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=1, help="child runs per scenario; the median is kept")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="results file (default: bench-results/<commit>-<scale>.json)")
+    parser.add_argument("--verbose", action="store_true", help="show the builders' output")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BASE", "HEAD"),
+                        help="compare two results files; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    parser.add_argument("--child", nargs=2, metavar=("SCENARIO", "WORK"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(*args.child)
+        return
+    if args.compare:
+        regressions = compare(*args.compare, args.threshold)
+        print(f"\n{regressions} regression(s)")
+        sys.exit(1 if regressions else 0)
+
+    results = run_suite(args)
+    commit = (results["git"]["commit"] or "nogit")[:12]
+    output = args.output or ROOT / "bench-results" / f"{commit}-{args.scale}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print(f"\nresults written to {output}")
+    if any("error" in metrics for metrics in results["scenarios"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Batch NAMASTE → ICD-11 mapping.
+
+- Reads NAMASTE codes from a CSV (`namaste_code`/`NAMC_CODE`/`code`
+  column, or the first column) or NDJSON (`{"namaste_code": ...}` per line) stream.
+- Resolves descriptions for a whole batch with one query against the
+  master DB (the codes are passed as a single JSON array, so any batch size
+  fits in one statement).
+- Searches ICD-11 once per distinct description, concurrently, through
+  cached_search_icd() (search cache, or the local snapshot if configured).
+- Yields one result per distinct code as soon as its search finishes, so
+  callers can stream NDJSON instead of buffering the whole response.
+
+    python -m src.api.batch_map codes.csv > mappings.ndjson
+    cat codes.ndjson | python -m src.api.batch_map --format ndjson
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+
+from src.api import icd_search
+from src.database import get_sqlite_pool
+from src.schema.table_schema import TableSchemas
+from src.utils import metrics
+
+BATCH_SIZE = int(os.getenv("ICD_BATCH_SIZE", 5000))
+BATCH_WORKERS = int(os.getenv("ICD_BATCH_WORKERS", icd_search.SERVE_WORKERS))
+DEFAULT_SOURCE = "namaste_terms"
+CODE_COLUMNS = ("namaste_code", "namc_code", "code")  # accepted CSV header names, in order of preference
+_RESOLVE_QUERY = metrics.DB_QUERY_SECONDS.labels("resolve_descriptions")
+
+
+def read_codes(stream: IO[str], fmt: str = "auto") -> Iterator[str]:
+    """NAMASTE codes from a CSV or NDJSON text stream; `fmt="auto"` sniffs the first non-blank line."""
+    lines = (line for line in stream if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return
+    if fmt == "auto":
+        fmt = "ndjson" if first.lstrip().startswith("{") else "csv"
+
+    if fmt == "ndjson":
+        for line in _chain(first, lines):
+            code = json.loads(line).get("namaste_code")
+            if code:
+                yield str(code).strip()
+        return
+
+    rows = csv.reader(_chain(first, lines))
+    header = next(rows)
+    names = [h.strip().lower() for h in header]
+    code_columns = [n for n in CODE_COLUMNS if n in names]
+    if code_columns:
+        column = names.index(code_columns[0])
+    else:
+        column = 0
+        if header and header[0].strip():
+            yield header[0].strip()  # no header row; the first line is already a code
+    for row in rows:
+        if len(row) > column and row[column].strip():
+            yield row[column].strip()
+
+
+def _chain(first: str, rest: Iterable[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+def _batches(codes: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Distinct codes in input order, `size` at a time; repeats of an already emitted code are dropped."""
+    seen = set()
+    batch: List[str] = []
+    for code in codes:
+        if code in seen:
+            continue
+        seen.add(code)
+        batch.append(code)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def resolve_descriptions(
+    conn: Any, codes: List[str], source: str = DEFAULT_SOURCE
+) -> Dict[str, Optional[str]]:
+    """code → description for every code found in `source`, in a single query."""
+    mapping = TableSchemas.FTS_SOURCES[source]
+    with metrics.span(_RESOLVE_QUERY):
+        rows = conn.execute(
+            f"""
+            SELECT {mapping["code"]}, {mapping["description"]} FROM {source}
+            WHERE {mapping["code"]} IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(codes),),
+        )
+        return {str(code): description for code, description in rows}
+
+
+class BatchMapper:
+    """
+    Maps many NAMASTE codes to ICD-11 matches in one call.
+
+    - Codes are deduplicated and processed `batch_size` at a time; each batch
+      costs one DB query.
+    - Codes sharing a description share one ICD search; up to `workers`
+      searches run concurrently, each going through cached_search_icd().
+    - `map_codes()` is a generator: results are yielded in completion order.
+    - `stats` counts codes, DB queries, searches and failures.
+
+    Each result mirrors the `--serve` worker responses:
+        {"namaste_code": ..., "description": ..., "success": true, "data": [...]}
+        {"namaste_code": ..., "success": false, "error": "..."}
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        source: str = DEFAULT_SOURCE,
+        batch_size: int = BATCH_SIZE,
+        workers: int = BATCH_WORKERS,
+    ) -> None:
+        if source not in TableSchemas.FTS_SOURCES:
+            raise ValueError(f"Unknown source table {source!r}; expected one of {sorted(TableSchemas.FTS_SOURCES)}")
+        self.pool = get_sqlite_pool(db_path)
+        self.source = source
+        self.batch_size = batch_size
+        self.workers = workers
+        self.stats = {"codes": 0, "not_found": 0, "queries": 0, "searches": 0, "failed": 0}
+
+    def map_codes(self, codes: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for batch in _batches(codes, self.batch_size):
+                yield from self._map_batch(executor, batch)
+
+    def _map_batch(self, executor: ThreadPoolExecutor, batch: List[str]) -> Iterator[Dict[str, Any]]:
+        with self.pool.reader() as conn:
+            descriptions = resolve_descriptions(conn, batch, self.source)
+        self.stats["queries"] += 1
+        self.stats["codes"] += len(batch)
+
+        by_description: Dict[str, List[str]] = {}
+        for code in batch:
+            description = (descriptions.get(code) or "").strip()
+            if not description:
+                self.stats["not_found"] += 1
+                reason = "not found" if code not in descriptions else "found, but description is missing"
+                yield {"namaste_code": code, "success": False, "error": f"NAMASTE code {code} {reason}."}
+                continue
+            by_description.setdefault(description, []).append(code)
+
+        futures = {
+            executor.submit(icd_search.cached_search_icd, description): description
+            for description in by_description
+        }
+        self.stats["searches"] += len(futures)
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                description = futures.pop(future)
+                yield from self._results(description, by_description[description], future)
+
+    def _results(self, description: str, codes: List[str], future) -> Iterator[Dict[str, Any]]:
+        try:
+            data = icd_search.shape_results(future.result())
+        except Exception as e:
+            self.stats["failed"] += len(codes)
+            for code in codes:
+                yield {"namaste_code": code, "description": description, "success": False, "error": str(e)}
+            return
+        for code in codes:
+            yield {"namaste_code": code, "description": description, "success": True, "data": data}
+
+
+def write_ndjson(results: Iterable[Dict[str, Any]], out: IO[str], flush_every: int = 100) -> int:
+    """Writes one JSON object per line, flushing every `flush_every` lines; returns the line count."""
+    count = 0
+    for count, result in enumerate(results, start=1):
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        if count % flush_every == 0:
+            out.flush()
+    out.flush()
+    return count
+
+
+def map_codes(codes: Iterable[str], **options: Any) -> Iterator[Dict[str, Any]]:
+    """Shorthand for BatchMapper(**options).map_codes(codes)."""
+    return BatchMapper(**options).map_codes(codes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Map NAMASTE codes to ICD-11 in bulk, streaming NDJSON.")
+    parser.add_argument("input", nargs="?", help="CSV or NDJSON file of codes (default: stdin)")
+    parser.add_argument("--format", choices=["auto", "csv", "ndjson"], default="auto")
+    parser.add_argument("--db", default=os.getenv("WHO_TERMINOLOGIES_MASTER_DB"), help="master DB path")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, choices=sorted(TableSchemas.FTS_SOURCES))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    args = parser.parse_args()
+
+    stream = open(args.input, encoding="utf-8", newline="") if args.input else io.TextIOWrapper(
+        sys.stdin.buffer, encoding="utf-8", newline=""
+    )
+    mapper = BatchMapper(args.db, source=args.source, batch_size=args.batch_size, workers=args.workers)
+    with stream:
+        write_ndjson(mapper.map_codes(read_codes(stream, args.format)), sys.stdout)
+    print(json.dumps(mapper.stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
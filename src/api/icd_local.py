@@ -0,0 +1,140 @@
+"""
+Offline ICD-11 search over a local MMS linearization snapshot.
+
+Loads codes, titles and synonyms from a snapshot file into a BM25-weighted
+sparse term matrix and answers searches in-process, returning the same
+response shape as the WHO search endpoint (`destinationEntities` with
+`theCode`, `title`, `id`, `score`), so `icd_search.shape_results()` and the
+result cache work unchanged.
+"""
+
+import csv
+import json
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import scipy.sparse as sp
+
+_WORD_RE = re.compile(r"[^\W_]+")
+STOPWORDS = frozenset({
+    "a", "an", "and", "as", "at", "by", "due", "for", "from", "in", "is", "of",
+    "on", "or", "the", "to", "with", "without",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Case- and diacritic-insensitive word tokens, stopwords removed."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return [t for t in _WORD_RE.findall(folded) if t not in STOPWORDS]
+
+
+def load_snapshot(path: str | Path) -> List[Dict[str, Any]]:
+    """
+    Reads ICD-11 entities ({code, title, uri, synonyms}) from a snapshot:
+    - `.jsonl` / `.json`: one entity object per line, or a JSON array of them
+    - `.txt` / `.tsv`: WHO's SimpleTabulation export (only rows with a code;
+      leading "- " depth markers are stripped from titles)
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".txt", ".tsv"):
+        with path.open(newline="", encoding="utf-8-sig") as f:
+            rows = csv.DictReader(f, delimiter="\t")
+            return [
+                {
+                    "code": row["Code"].strip(),
+                    "title": row["Title"].lstrip("- ").strip(),
+                    "uri": (row.get("Linearization (release) URI") or row.get("Foundation URI") or "").strip(),
+                    "synonyms": [],
+                }
+                for row in rows if (row.get("Code") or "").strip()
+            ]
+
+    with path.open(encoding="utf-8") as f:
+        if path.suffix.lower() == ".json":
+            entities = json.load(f)
+        else:
+            entities = [json.loads(line) for line in f if line.strip()]
+    for entity in entities:
+        entity.setdefault("synonyms", [])
+    return entities
+
+
+class LocalICDIndex:
+    """
+    BM25 index over ICD-11 entity titles and synonyms.
+
+    - Every entity is one document (title + synonyms); the BM25 weight of
+      each (entity, term) pair is precomputed into a CSC sparse matrix, so a
+      query is a sum of a few columns plus a top-k partition.
+    - Scores are divided by the best score the query could reach (all its
+      terms at saturation), giving a 0..1 value comparable across queries.
+    """
+
+    def __init__(self, entities: Iterable[Dict[str, Any]], k1: float = 1.2, b: float = 0.75) -> None:
+        start = time.perf_counter()
+        self.entities = list(entities)
+        self.k1 = k1
+        self.vocabulary: Dict[str, int] = {}
+
+        rows: List[int] = []
+        cols: List[int] = []
+        for doc_id, entity in enumerate(self.entities):
+            text = " ".join([entity.get("title") or "", *entity.get("synonyms", [])])
+            for token in tokenize(text):
+                rows.append(doc_id)
+                cols.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+
+        shape = (len(self.entities), len(self.vocabulary))
+        tf = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape)
+        tf.sum_duplicates()
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if len(doc_len) else 0.0
+        df = np.bincount(tf.indices, minlength=shape[1])
+        self.idf = np.log1p((shape[0] - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        norm = k1 * (1 - b + b * doc_len / avg_len) if avg_len else np.full(shape[0], k1)
+        row_of = np.repeat(np.arange(shape[0]), np.diff(tf.indptr))
+        tf.data = self.idf[tf.indices] * tf.data * (k1 + 1) / (tf.data + norm[row_of])
+        self.weights = tf.tocsc()
+        self.build_seconds = time.perf_counter() - start
+
+    @classmethod
+    def from_snapshot(cls, path: str | Path, **options: Any) -> "LocalICDIndex":
+        return cls(load_snapshot(path), **options)
+
+    def search(self, query: str, limit: int = 10) -> Dict[str, Any]:
+        """Best `limit` entities for `query`, shaped like the WHO search response."""
+        term_ids = sorted({self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary})
+        if not term_ids or not self.entities:
+            return {"destinationEntities": []}
+        scores = np.asarray(self.weights[:, term_ids].sum(axis=1)).ravel()
+        ceiling = float(self.idf[term_ids].sum() * (self.k1 + 1))
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return {
+            "destinationEntities": [
+                {
+                    "theCode": self.entities[i]["code"],
+                    "title": self.entities[i]["title"],
+                    "id": self.entities[i]["uri"],
+                    "score": round(float(scores[i]) / ceiling, 4),
+                }
+                for i in hits
+            ]
+        }
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entities": len(self.entities),
+            "terms": len(self.vocabulary),
+            "nonzeros": int(self.weights.nnz),
+            "build_seconds": self.build_seconds,
+        }
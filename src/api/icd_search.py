@@ -5,30 +5,95 @@ ICD-11 MMS search example.
 - Reads CLIENT_ID and CLIENT_SECRET from environment variables.
 - Gets an OAuth2 token and searches the ICD-11 MMS 2024-01 release.
 - Prints all matches with rank, code, title, URI, and score.
+- With ICD_LOCAL_SNAPSHOT set, searches a local MMS snapshot offline
+  (see icd_local.py) instead of calling the API.
+- requests/urllib3, aiohttp and asyncio are imported on first use, so
+  importing this module (e.g. for ICD_RELEASE) stays cheap.
+- With --serve, runs as a long-lived mapping worker that reads one JSON
+  request per line on stdin and writes one JSON response per line on stdout.
 """
 
 import os
 import sys
-import requests
-import urllib3
-from typing import Dict, Any, List
+import threading
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 import json
+from pathlib import Path
+
+if TYPE_CHECKING:
+    import asyncio
+    import requests
+
+if __package__ in (None, ""):
+    # Allow `python src/api/icd_search.py` as spawned by the Node backend
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.api.rate_limit import TokenBucket
+from src.api.token_manager import ICDTokenManager
+from src.cache.search_cache import ICDSearchCache
+from src.utils import metrics
 
 # --- CONFIGURATION ---
 CLIENT_ID = os.getenv("ICD_API_CLIENT_ID", "5ac34ca1-0ef8-4f5f-b385-60e6f448f0a8_6be01352-1ce8-48fd-8d52-54506cddca91")
 CLIENT_SECRET = os.getenv("ICD_API_CLIENT_SECRET", "wZ8A5GuuqZGaYBBODJuQg/kQTMSbV2Ag/PW42lK0Tqc=")
 
-TOKEN_URL = "https://icdaccessmanagement.who.int/connect/token"
-API_BASE_URL = "https://id.who.int/icd/release/11/2024-01/mms/search"
+ICD_RELEASE = os.getenv("ICD_RELEASE", "2024-01")
+ACCEPT_LANGUAGE = os.getenv("ICD_ACCEPT_LANGUAGE", "en")
+TOKEN_URL = os.getenv("ICD_TOKEN_URL", "https://icdaccessmanagement.who.int/connect/token")
+API_BASE_URL = os.getenv("ICD_API_BASE_URL", f"https://id.who.int/icd/release/11/{ICD_RELEASE}/mms/search")
 DEFAULT_SEARCH_TERM = "A disorder characterized by deafness/hearing impairment"
 
+# --- WORKER MODE ---
+SERVE_WORKERS = int(os.getenv("ICD_SERVE_WORKERS", 16))
+TOKEN_REFRESH_MARGIN = int(os.getenv("ICD_TOKEN_REFRESH_MARGIN", 60))  # seconds before expires_in
+ASYNC_CONCURRENCY = int(os.getenv("ICD_ASYNC_CONCURRENCY", 16))
+ASYNC_RATE = float(os.getenv("ICD_ASYNC_RATE", 0))  # searches per second, 0 = unlimited
+ASYNC_MAX_RETRIES = int(os.getenv("ICD_ASYNC_MAX_RETRIES", 4))
+TOKEN_CACHE_REDIS = os.getenv("ICD_TOKEN_CACHE_REDIS", "false").lower() in ("1", "true", "yes")
+SEARCH_CACHE_REDIS = os.getenv("ICD_SEARCH_CACHE_REDIS", "false").lower() in ("1", "true", "yes")
+LOCAL_SNAPSHOT = os.getenv("ICD_LOCAL_SNAPSHOT")  # search this MMS snapshot offline instead of the WHO API
+
 # --- SSL WARNINGS (for testing only) ---
 VERIFY_SSL = False
-if not VERIFY_SSL:
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def get_token() -> str:
-    """Obtains an OAuth2 access token from the WHO ICD API."""
+# --- METRICS (see src/utils/metrics.py) ---
+TOKEN_SECONDS = metrics.histogram("icd_token_seconds", "Time to obtain a WHO API access token, cached or fetched")
+SEARCH_STAGE_SECONDS = metrics.histogram("icd_search_stage_seconds", "ICD search time per stage", ("stage",))
+SEARCH_RESPONSES = metrics.counter("icd_search_responses_total", "ICD search API responses by HTTP status", ("status",))
+_LOOKUP_STAGE = SEARCH_STAGE_SECONDS.labels("lookup")  # cache + token + http + parse
+_HTTP_STAGE = SEARCH_STAGE_SECONDS.labels("http")
+_PARSE_STAGE = SEARCH_STAGE_SECONDS.labels("parse")
+_SHAPE_STAGE = SEARCH_STAGE_SECONDS.labels("shape")
+_LOCAL_STAGE = SEARCH_STAGE_SECONDS.labels("local")
+
+_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+
+def get_session() -> "requests.Session":
+    """Returns the process-wide HTTP session, sized for SERVE_WORKERS concurrent requests."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            import urllib3
+            from requests.adapters import HTTPAdapter
+            if not VERIFY_SSL:
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=SERVE_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.verify = VERIFY_SSL
+            _session = session
+    return _session
+
+def request_token() -> Dict[str, Any]:
+    """Obtains an OAuth2 token response (access_token, expires_in, ...) from the WHO ICD API."""
+    import requests
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     data = {
         "client_id": CLIENT_ID,
@@ -38,7 +103,7 @@ def get_token() -> str:
     }
     
     try:
-        resp = requests.post(TOKEN_URL, headers=headers, data=data, verify=VERIFY_SSL, timeout=30)
+        resp = get_session().post(TOKEN_URL, headers=headers, data=data, timeout=30)
         resp.raise_for_status()
     except requests.RequestException as e:
         raise RuntimeError(f"Token request error: {e}")
@@ -47,29 +112,228 @@ def get_token() -> str:
     if "access_token" not in token_json:
         raise RuntimeError(f"No 'access_token' in token response: {token_json}")
     
-    return token_json["access_token"]
+    return token_json
 
-def search_icd(token: str, query: str) -> Dict[str, Any]:
-    """Searches the ICD-11 MMS API with a given query."""
-    headers = {
+def _optional_redis(purpose: str) -> Any:
+    """Redis client for a shared cache, or None (in-process only) if redis-py is missing."""
+    try:
+        from src.cache import get_redis_connection
+        return get_redis_connection()
+    except ImportError as e:
+        print(f"{purpose} falling back to in-process only: {e}", file=sys.stderr)
+        return None
+
+_token_manager: Optional[ICDTokenManager] = None
+_token_manager_lock = threading.Lock()
+
+def get_token_manager() -> ICDTokenManager:
+    """Returns the process-wide token manager (shared via Redis if ICD_TOKEN_CACHE_REDIS is set)."""
+    global _token_manager
+    with _token_manager_lock:
+        if _token_manager is None:
+            _token_manager = ICDTokenManager(
+                request_token,
+                refresh_margin=TOKEN_REFRESH_MARGIN,
+                redis_client=_optional_redis("Token cache") if TOKEN_CACHE_REDIS else None,
+            )
+    return _token_manager
+
+@metrics.span(TOKEN_SECONDS)
+def get_token() -> str:
+    """Obtains an OAuth2 access token from the WHO ICD API, reusing it until shortly before expiry."""
+    return get_token_manager().get()
+
+def _search_headers(token: str) -> Dict[str, str]:
+    return {
         "Authorization": f"Bearer {token}",
         "API-Version": "v2",
         "Accept": "application/json",
-        "Accept-Language": "en", 
+        "Accept-Language": ACCEPT_LANGUAGE,
     }
-    params = {
+
+def _search_params(query: str) -> Dict[str, str]:
+    return {
         "q": query,
         "flatResults": "true",
         "useFlexisearch":"true",
     }
+
+def search_icd(token: str, query: str) -> Dict[str, Any]:
+    """Searches the ICD-11 MMS API with a given query."""
+    import requests
+    headers = _search_headers(token)
+    params = _search_params(query)
     
     try:
-        resp = requests.get(API_BASE_URL, headers=headers, params=params, verify=VERIFY_SSL, timeout=30)
+        with metrics.span(_HTTP_STAGE):
+            resp = get_session().get(API_BASE_URL, headers=headers, params=params, timeout=30)
+        SEARCH_RESPONSES.labels(resp.status_code).inc()
         resp.raise_for_status()
     except requests.RequestException as e:
         raise RuntimeError(f"Search request error: {e}")
-        
-    return resp.json()
+
+    with metrics.span(_PARSE_STAGE):
+        return resp.json()
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class AsyncICDClient:
+    """
+    asyncio ICD-11 search client sharing one aiohttp connection pool.
+
+    - At most `concurrency` searches are in flight; `rate` (searches/second,
+      0 = unlimited) is enforced with a token bucket.
+    - 429 and 5xx responses and connection errors are retried up to
+      `max_retries` times with full-jitter exponential backoff, waiting at
+      least as long as any Retry-After header asks.
+    - A 401 invalidates the shared token once and retries.
+
+    Usage:
+        async with AsyncICDClient() as client:
+            results = await client.search_many(queries)
+    """
+
+    def __init__(
+        self,
+        concurrency: int = ASYNC_CONCURRENCY,
+        rate: float = ASYNC_RATE,
+        max_retries: int = ASYNC_MAX_RETRIES,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 30.0,
+    ) -> None:
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError("aiohttp is not installed. Please install it to use AsyncICDClient.")
+        self.concurrency = concurrency
+        self.limiter = TokenBucket(rate, burst=concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.retries = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional["asyncio.Semaphore"] = None
+
+    async def __aenter__(self) -> "AsyncICDClient":
+        import asyncio
+        import aiohttp
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=VERIFY_SSL)
+        self._session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._session.close()
+
+    def _delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    async def search(self, query: str) -> Dict[str, Any]:
+        """Searches the ICD-11 MMS API with a given query, retrying transient failures."""
+        import asyncio
+        import aiohttp
+        async with self._semaphore:
+            refreshed = False
+            attempt = 0
+            while True:
+                await self.limiter.acquire_async()
+                token = await asyncio.to_thread(get_token)
+                try:
+                    async with self._session.get(
+                        API_BASE_URL, headers=_search_headers(token), params=_search_params(query)
+                    ) as resp:
+                        SEARCH_RESPONSES.labels(resp.status).inc()
+                        if resp.status == 401 and not refreshed:
+                            refreshed = True
+                            get_token_manager().invalidate()
+                            continue
+                        if resp.status in RETRYABLE_STATUS and attempt < self.max_retries:
+                            delay = self._delay(attempt, _retry_after(resp.headers.get("Retry-After")))
+                        else:
+                            resp.raise_for_status()
+                            return await resp.json(content_type=None)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt >= self.max_retries:
+                        raise RuntimeError(f"Search request error: {e}")
+                    delay = self._delay(attempt)
+                except aiohttp.ClientResponseError as e:
+                    raise RuntimeError(f"Search request error: {e}")
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+    async def search_many(
+        self, queries: List[str], return_exceptions: bool = False
+    ) -> List[Any]:
+        """Runs all searches concurrently and returns their responses in input order."""
+        import asyncio
+        return await asyncio.gather(
+            *(self.search(q) for q in queries), return_exceptions=return_exceptions
+        )
+
+def search_many(queries: List[str], **client_options: Any) -> List[Dict[str, Any]]:
+    """Blocking wrapper: searches all `queries` concurrently with an AsyncICDClient."""
+    import asyncio
+    async def run() -> List[Dict[str, Any]]:
+        async with AsyncICDClient(**client_options) as client:
+            return await client.search_many(queries)
+    return asyncio.run(run())
+
+_search_cache: Optional[ICDSearchCache] = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache() -> ICDSearchCache:
+    """Returns the process-wide search result cache (backed by Redis if ICD_SEARCH_CACHE_REDIS is set)."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = ICDSearchCache(
+                release=ICD_RELEASE,
+                language=ACCEPT_LANGUAGE,
+                redis_client=_optional_redis("Search cache") if SEARCH_CACHE_REDIS else None,
+            )
+    return _search_cache
+
+_local_index = None
+_local_index_lock = threading.Lock()
+
+def get_local_index(snapshot: Optional[str] = None):
+    """Returns the process-wide offline index over ICD_LOCAL_SNAPSHOT (or `snapshot`)."""
+    global _local_index
+    with _local_index_lock:
+        if _local_index is None:
+            from src.api.icd_local import LocalICDIndex
+            _local_index = LocalICDIndex.from_snapshot(snapshot or LOCAL_SNAPSHOT)
+    return _local_index
+
+def cached_search_icd(query: str) -> Dict[str, Any]:
+    """
+    search_icd() behind the result cache; the token is only fetched on a miss.
+    With ICD_LOCAL_SNAPSHOT set, searches the local snapshot instead (no network, no cache needed).
+    """
+    if LOCAL_SNAPSHOT:
+        with metrics.span(_LOCAL_STAGE):
+            return get_local_index().search(query)
+    with metrics.span(_LOOKUP_STAGE):
+        return get_search_cache().get_or_fetch(query, lambda: search_icd(get_token(), query))
 
 def print_results(entities: List[Dict[str, Any]]):
     """Formats and prints the search results to the console."""
@@ -90,22 +354,93 @@ def print_results(entities: List[Dict[str, Any]]):
         print(f"  URI  : {uri}")
         print(f"  Score: {score}\n")
 
-def main():
-    token = get_token()
-    query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else DEFAULT_SEARCH_TERM
-    results = search_icd(token, query)
-    entities = results.get("destinationEntities", [])
-
+@metrics.span(_SHAPE_STAGE)
+def shape_results(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Reduces a search response to the icd_code/title/uri/score records Node.js consumes."""
     output = []
-    for ent in entities:
+    for ent in results.get("destinationEntities", []):
         output.append({
             "icd_code": ent.get("code") or ent.get("theCode"),
             "title": ent.get("title") or ent.get("label"),
             "uri": ent.get("id") or ent.get("uri"),
+            "score": ent.get("score"),
         })
+    return output
+
+def serve(stdin=None, stdout=None, workers: int = SERVE_WORKERS, startup=None) -> None:
+    """
+    Long-lived mapping worker. Each stdin line is a JSON object
+    {"id": ..., "query": "..."}; each stdout line is
+    {"id": ..., "success": true, "data": [...]} or {"id": ..., "success": false, "error": "..."}.
+    {"id": ..., "op": "stats"} returns the search cache counters as "data",
+    {"id": ..., "op": "ready"} the `startup` (ServiceStartup) status,
+    {"id": ..., "op": "metrics"} the metrics snapshot ("format": "prometheus" for the text format).
+    Requests are served concurrently, so responses may arrive out of order.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    write_lock = threading.Lock()
+
+    def respond(message: Dict[str, Any]) -> None:
+        line = json.dumps(message)
+        with write_lock:
+            stdout.write(line + "\n")
+            stdout.flush()
+
+    def handle(request_id: Any, query: str) -> None:
+        try:
+            data = shape_results(cached_search_icd(query))
+            respond({"id": request_id, "success": True, "data": data})
+        except Exception as e:
+            respond({"id": request_id, "success": False, "error": str(e)})
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+            request = None
+            try:
+                request = json.loads(line)
+                if request.get("op") == "stats":
+                    respond({"id": request.get("id"), "success": True, "data": get_search_cache().stats()})
+                    continue
+                if request.get("op") == "metrics":
+                    data = metrics.render() if request.get("format") == "prometheus" else metrics.snapshot()
+                    respond({"id": request.get("id"), "success": True, "data": data})
+                    continue
+                if request.get("op") == "ready":
+                    status = startup.status() if startup is not None else {"ready": True}
+                    respond({"id": request.get("id"), "success": True, "data": status})
+                    continue
+                query = request["query"]
+                if not isinstance(query, str):
+                    raise TypeError(f"query must be a string, got {type(query).__name__}")
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                # Echo the id whenever the line was an object, so the caller can settle that request
+                request_id = request.get("id") if isinstance(request, dict) else None
+                respond({"id": request_id, "success": False, "error": f"Invalid request: {e}"})
+                continue
+            pool.submit(handle, request.get("id"), query)
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        from src.services.startup import ServiceStartup, preloaders
+        # Warm the cache, HTTP pool and token (or the local snapshot) while the first requests are read
+        startup = ServiceStartup(
+            preloaders("local_index" if LOCAL_SNAPSHOT else "search_cache,token"), databases={}
+        ).start()
+        serve(startup=startup)
+        return
+
+    query = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else DEFAULT_SEARCH_TERM
+    output = shape_results(cached_search_icd(query))
     
     # Print JSON so Node.js can parse it
     print(json.dumps(output))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Run the imported src.api.icd_search, not this __main__ copy: the startup
+    # preloaders and every other caller share that module's cache, session and token
+    from src.api import icd_search
+    icd_search.main()
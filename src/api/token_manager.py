@@ -0,0 +1,207 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class _Flight:
+    """One in-flight token refresh that concurrent callers wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.token: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class ICDTokenManager:
+    """
+    Caches the WHO ICD OAuth2 access token for its `expires_in` lifetime.
+
+    - `get()` returns the cached token without locking while it is fresh.
+    - Concurrent callers that find no valid token share a single refresh
+      (single-flight), so a burst of N searches costs one token request.
+    - Inside the refresh window (`refresh_margin` seconds before expiry, at
+      most half the token's lifetime) the current token is still handed out
+      while a background refresh runs.
+    - With `background=True` a timer refreshes the token before it expires,
+      so steady traffic never waits on the token endpoint.
+    - With a `redis_client`, tokens are shared across processes under
+      `REDIS_KEY`; Redis errors are logged and the in-process cache is used.
+
+    `fetch` must return the token endpoint JSON (access_token, expires_in);
+    a missing or non-positive `expires_in` is taken as DEFAULT_EXPIRES_IN.
+    """
+
+    REDIS_KEY = "ayushsetu:icd:token"
+    RETRY_DELAY = 5.0  # seconds between background refresh attempts after a failure
+    DEFAULT_EXPIRES_IN = 300.0  # conservative lifetime when the endpoint gives none
+
+    def __init__(
+        self,
+        fetch: Callable[[], Dict[str, Any]],
+        refresh_margin: float = 60.0,
+        redis_client: Any = None,
+        background: bool = True,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.redis = redis_client
+        self.background = background
+        self.log = logger or logging.getLogger(self.__class__.__name__)
+
+        self.fetch_count = 0
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._lock = threading.Lock()
+        self._flight: Optional[_Flight] = None
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+
+    def get(self) -> str:
+        """Returns a valid access token, refreshing it at most once per expiry."""
+        token = self._token
+        now = time.time()
+        if token is not None:
+            if now < self._refresh_at:
+                return token
+            if now < self._expires_at:
+                self._refresh_async()
+                return token
+        return self._refresh(wait=True)
+
+    def invalidate(self) -> None:
+        """Drops the cached token, e.g. after the API rejected it with 401."""
+        with self._lock:
+            self._token = None
+            self._expires_at = self._refresh_at = 0.0
+        self._redis_delete()
+
+    def close(self) -> None:
+        """Stops the background refresh timer."""
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    # --- refresh ---
+
+    def _refresh_async(self) -> None:
+        if self._flight is not None:
+            return
+        threading.Thread(target=self._refresh_quietly, daemon=True).start()
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self._refresh(wait=False)
+        except Exception as e:
+            self.log.warning("Background token refresh failed: %s", e)
+            self._schedule(self.RETRY_DELAY)
+
+    def _refresh(self, wait: bool) -> Optional[str]:
+        with self._lock:
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+        if not leader:
+            if not wait:
+                return None
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.token
+
+        try:
+            flight.token = self._load()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
+        return flight.token
+
+    def _load(self) -> str:
+        """Adopts a shared token from Redis if still fresh, otherwise fetches a new one."""
+        shared = self._redis_get()
+        if shared and shared["expires_at"] - self.refresh_margin > time.time():
+            self._store(shared["access_token"], shared["expires_at"])
+            return shared["access_token"]
+
+        token_json = self.fetch()
+        self.fetch_count += 1
+        token = token_json["access_token"]
+        expires_in = self._expires_in(token_json.get("expires_in"))
+        expires_at = time.time() + expires_in
+        self._store(token, expires_at)
+        self._redis_set(token, expires_at, expires_in)
+        return token
+
+    def _expires_in(self, value: Any) -> float:
+        try:
+            expires_in = float(value)
+        except (TypeError, ValueError):
+            expires_in = 0.0
+        if expires_in > 0:
+            return expires_in
+        self.log.warning(
+            "Token response has expires_in=%r; assuming %.0fs", value, self.DEFAULT_EXPIRES_IN
+        )
+        return self.DEFAULT_EXPIRES_IN
+
+    def _store(self, token: str, expires_at: float) -> None:
+        now = time.time()
+        # A margin as long as the lifetime would put every get() in the refresh window
+        margin = min(self.refresh_margin, (expires_at - now) / 2)
+        with self._lock:
+            self._token = token
+            self._expires_at = expires_at
+            self._refresh_at = max(expires_at - margin, now)
+        if self._refresh_at > now:
+            self._schedule(self._refresh_at - now)
+
+    def _schedule(self, delay: float) -> None:
+        if not self.background:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(max(delay, 0.0), self._refresh_quietly)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # --- optional Redis sharing ---
+
+    def _redis_get(self) -> Optional[Dict[str, Any]]:
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(self.REDIS_KEY)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            self.log.warning("Redis token read failed: %s", e)
+            return None
+
+    def _redis_set(self, token: str, expires_at: float, expires_in: float) -> None:
+        if self.redis is None or expires_in <= 0:
+            return
+        try:
+            payload = json.dumps({"access_token": token, "expires_at": expires_at})
+            self.redis.set(self.REDIS_KEY, payload, ex=int(expires_in))
+        except Exception as e:
+            self.log.warning("Redis token write failed: %s", e)
+
+    def _redis_delete(self) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.delete(self.REDIS_KEY)
+        except Exception as e:
+            self.log.warning("Redis token delete failed: %s", e)
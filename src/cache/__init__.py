@@ -1,5 +1,8 @@
 from .connection import get_redis_connection
+from .search_cache import ICDSearchCache, normalize_query
 
 __all__ = [
     "get_redis_connection",
+    "ICDSearchCache",
+    "normalize_query",
 ]
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SEARCH_CACHE_TTL = int(os.getenv("ICD_SEARCH_CACHE_TTL", 7 * 24 * 3600))
+SEARCH_CACHE_NEGATIVE_TTL = int(os.getenv("ICD_SEARCH_CACHE_NEGATIVE_TTL", 3600))
+SEARCH_CACHE_SIZE = int(os.getenv("ICD_SEARCH_CACHE_SIZE", 4096))
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query used for cache keys."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class ICDSearchCache:
+    """
+    Two-level cache for ICD-11 search responses.
+
+    - Keys combine the normalized query, ICD release and Accept-Language.
+    - An in-process LRU (`size` entries) sits in front of an optional Redis
+      client shared by all workers.
+    - Responses without `destinationEntities` are cached for `negative_ttl`
+      seconds instead of `ttl`.
+    - Concurrent misses for the same key are serialized by a per-key lock,
+      so only one of them calls upstream.
+    - `stats()` exposes hit/miss counters and latencies.
+    """
+
+    KEY_PREFIX = "ayushsetu:icd:search"
+
+    def __init__(
+        self,
+        release: str,
+        language: str = "en",
+        ttl: int = SEARCH_CACHE_TTL,
+        negative_ttl: int = SEARCH_CACHE_NEGATIVE_TTL,
+        size: int = SEARCH_CACHE_SIZE,
+        redis_client: Any = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.release = release
+        self.language = language
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.size = size
+        self.redis = redis_client
+        self.log = logger or logging.getLogger(self.__class__.__name__)
+
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._local_lock = threading.Lock()
+        self._key_locks: Dict[str, List[Any]] = {}  # key -> [lock, waiters]
+        self._key_locks_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._counters = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "upstream_errors": 0,
+        }
+        self._latency = {"hit_seconds": 0.0, "miss_seconds": 0.0}
+
+    def key(self, query: str) -> str:
+        digest = hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:{self.release}:{self.language}:{digest}"
+
+    def get_or_fetch(self, query: str, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Returns the cached response for `query`, calling `fetch()` once on a miss."""
+        start = time.perf_counter()
+        key = self.key(query)
+
+        cached = self._lookup(key)
+        if cached is None:
+            with self._locked(key):
+                cached = self._lookup(key)
+                if cached is None:
+                    try:
+                        result = fetch()
+                    except Exception:
+                        self._count("upstream_errors")
+                        raise
+                    self._store(key, result)
+                    self._count("misses", "miss_seconds", time.perf_counter() - start)
+                    return result
+
+        source, result = cached
+        self._count(source, "hit_seconds", time.perf_counter() - start)
+        if not result.get("destinationEntities"):
+            self._count("negative_hits")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of hit/miss counters, hit rate and mean latencies (ms)."""
+        with self._stats_lock:
+            counters = dict(self._counters)
+            latency = dict(self._latency)
+        hits = counters["local_hits"] + counters["redis_hits"]
+        lookups = hits + counters["misses"]
+        with self._local_lock:
+            counters["local_entries"] = len(self._local)
+        counters["hit_rate"] = hits / lookups if lookups else 0.0
+        counters["mean_hit_ms"] = 1000 * latency["hit_seconds"] / hits if hits else 0.0
+        counters["mean_miss_ms"] = 1000 * latency["miss_seconds"] / counters["misses"] if counters["misses"] else 0.0
+        return counters
+
+    def clear(self) -> None:
+        """Empties the in-process LRU (Redis entries expire on their own)."""
+        with self._local_lock:
+            self._local.clear()
+
+    # --- storage ---
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        now = time.time()
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._local.move_to_end(key)
+                    return "local_hits", entry[1]
+                del self._local[key]
+
+        result = self._redis_get(key)
+        if result is not None:
+            self._store_local(key, result, self._ttl_for(result))
+            return "redis_hits", result
+        return None
+
+    def _store(self, key: str, result: Dict[str, Any]) -> None:
+        ttl = self._ttl_for(result)
+        self._store_local(key, result, ttl)
+        self._redis_set(key, result, ttl)
+
+    def _store_local(self, key: str, result: Dict[str, Any], ttl: int) -> None:
+        with self._local_lock:
+            self._local[key] = (time.time() + ttl, result)
+            self._local.move_to_end(key)
+            while len(self._local) > self.size:
+                self._local.popitem(last=False)
+
+    def _ttl_for(self, result: Dict[str, Any]) -> int:
+        return self.ttl if result.get("destinationEntities") else self.negative_ttl
+
+    def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            self.log.warning("Redis search cache read failed: %s", e)
+            return None
+
+    def _redis_set(self, key: str, result: Dict[str, Any], ttl: int) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(key, json.dumps(result), ex=ttl)
+        except Exception as e:
+            self.log.warning("Redis search cache write failed: %s", e)
+
+    # --- bookkeeping ---
+
+    @contextmanager
+    def _locked(self, key: str) -> Iterator[None]:
+        with self._key_locks_lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._key_locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def _count(self, counter: str, latency: Optional[str] = None, seconds: float = 0.0) -> None:
+        with self._stats_lock:
+            self._counters[counter] += 1
+            if latency:
+                self._latency[latency] += seconds
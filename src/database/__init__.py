@@ -1,6 +1,10 @@
 from .connection import get_sqlite_connection, get_postgres_connection
+from .pool import PoolTimeout, SQLitePool, get_sqlite_pool
 
 __all__ = [
     "get_sqlite_connection",
     "get_postgres_connection",
+    "get_sqlite_pool",
+    "SQLitePool",
+    "PoolTimeout",
 ]
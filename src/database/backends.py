@@ -0,0 +1,200 @@
+"""
+Storage backends the master DB builders can load into.
+
+Both expose the same small surface (`connection()`, `create_table()`,
+`load_rows()`, `create_search_indexes()`), so `TerminologyMasterDB.load_into()`
+and `load_namaste_into()` can target SQLite or PostgreSQL unchanged.
+"""
+
+import io
+import logging
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from .connection import get_sqlite_connection
+
+LOAD_BATCH_SIZE = int(os.getenv("MASTER_DB_LOAD_BATCH_SIZE", 50000))
+
+
+def _batches(rows: Iterable[Tuple[Any, ...]], size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class SQLiteBackend:
+    """SQLite file; upserts with INSERT OR REPLACE, search is served by FTS5 (fts.py)."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        self.db_path = db_path
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = get_sqlite_connection(self.db_path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def create_table(self, conn: sqlite3.Connection, ddl: str) -> None:
+        conn.execute(ddl)
+
+    def load_rows(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Tuple[Any, ...]],
+        key: Optional[str] = None,
+        batch_size: int = LOAD_BATCH_SIZE,
+    ) -> int:
+        sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        loaded = 0
+        for batch in _batches(rows, batch_size):
+            conn.executemany(sql, batch)
+            loaded += len(batch)
+        return loaded
+
+    def create_search_indexes(self, conn: sqlite3.Connection, table: str, columns: Sequence[str]) -> None:
+        """No-op: SQLite term search goes through terminology_fts and term_search_keys."""
+
+    def close(self) -> None:
+        pass
+
+
+def translate_ddl(ddl: str) -> str:
+    """Rewrites the SQLite DDL in TableSchemas into PostgreSQL."""
+    ddl = re.sub(r"INTEGER PRIMARY KEY AUTOINCREMENT", "BIGSERIAL PRIMARY KEY", ddl, flags=re.IGNORECASE)
+    ddl = re.sub(r"\)\s*WITHOUT ROWID", ")", ddl, flags=re.IGNORECASE)
+    return ddl
+
+
+def _copy_value(value: Any) -> str:
+    """One CSV field for COPY: NULL stays unquoted-empty, everything else is quoted."""
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class PostgresBackend:
+    """
+    PostgreSQL through a `psycopg2.pool.ThreadedConnectionPool`.
+
+    - `load_rows()` streams rows in batches of `batch_size` with
+      `COPY ... FROM STDIN` into a temporary staging table, then upserts
+      each batch into the target with `INSERT ... ON CONFLICT (key)`.
+    - `create_search_indexes()` adds `pg_trgm` GIN indexes, so
+      `ILIKE '%term%'` and `similarity()` lookups use an index.
+    - Connection settings follow get_postgres_connection (PGHOST, PGPORT,
+      PGUSER, PGPASSWORD, PGDATABASE) unless a `dsn` is given.
+    """
+
+    name = "postgres"
+
+    def __init__(
+        self, dsn: Optional[str] = None, minconn: int = 1, maxconn: int = 8, **connect_kwargs: Any
+    ) -> None:
+        try:
+            import psycopg2.pool
+        except ImportError:
+            raise ImportError("psycopg2 is not installed. Please install it to use PostgreSQL.")
+        if dsn is None:
+            connect_kwargs = {
+                "host": os.getenv("PGHOST", "localhost"),
+                "port": int(os.getenv("PGPORT", 5432)),
+                "user": os.getenv("PGUSER", "postgres"),
+                "password": os.getenv("PGPASSWORD", ""),
+                "dbname": os.getenv("PGDATABASE", "postgres"),
+                **connect_kwargs,
+            }
+        # Terms carry diacritics (e.g. IAST); COPY needs a UTF-8 session even on SQL_ASCII servers
+        connect_kwargs.setdefault("client_encoding", "UTF8")
+        self.pool = psycopg2.pool.ThreadedConnectionPool(minconn, maxconn, dsn, **connect_kwargs)
+        self.log = logging.getLogger(self.__class__.__name__)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        conn = self.pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def create_table(self, conn: Any, ddl: str) -> None:
+        with conn.cursor() as cur:
+            cur.execute(translate_ddl(ddl))
+
+    def load_rows(
+        self,
+        conn: Any,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Tuple[Any, ...]],
+        key: Optional[str] = None,
+        batch_size: int = LOAD_BATCH_SIZE,
+    ) -> int:
+        column_list = ", ".join(columns)
+        staging = f"_load_{table}"
+        if key is not None:
+            updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != key)
+            conflict = f"ON CONFLICT ({key}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+            key_index = list(columns).index(key)
+        else:
+            conflict = ""
+        loaded = 0
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table} INCLUDING DEFAULTS)")
+            for batch in _batches(rows, batch_size):
+                if key is not None:
+                    # One row per key per statement, last occurrence wins as with INSERT OR REPLACE
+                    batch = list({row[key_index]: row for row in batch}.values())
+                buf = io.StringIO()
+                for row in batch:
+                    buf.write(",".join(_copy_value(v) for v in row))
+                    buf.write("\n")
+                buf.seek(0)
+                cur.execute(f"TRUNCATE {staging}")
+                cur.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)", buf)
+                cur.execute(
+                    f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} {conflict}"
+                )
+                loaded += len(batch)
+            cur.execute(f"DROP TABLE IF EXISTS {staging}")
+        return loaded
+
+    def create_search_indexes(self, conn: Any, table: str, columns: Sequence[str]) -> None:
+        with conn.cursor() as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for column in columns:
+                cur.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_{column}_trgm "
+                    f"ON {table} USING gin ({column} gin_trgm_ops)"
+                )
+            cur.execute(f"ANALYZE {table}")
+
+    def close(self) -> None:
+        self.pool.closeall()
+
+
+def get_backend(kind: Optional[str] = None, **options: Any):
+    """Backend named by `kind` or MASTER_DB_BACKEND ("sqlite", the default, or "postgres")."""
+    kind = (kind or os.getenv("MASTER_DB_BACKEND", "sqlite")).lower()
+    backends: Dict[str, Any] = {"sqlite": SQLiteBackend, "postgres": PostgresBackend}
+    if kind not in backends:
+        raise ValueError(f"Unknown master DB backend {kind!r}; expected one of {sorted(backends)}")
+    return backends[kind](**options)
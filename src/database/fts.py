@@ -0,0 +1,49 @@
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+from src.schema.table_schema import TableSchemas
+
+FTS_TABLE = "terminology_fts"
+FTS_FIELDS = ("term", "term_alt", "english_term", "description")
+
+# Default ranking for `ORDER BY rank`; weights follow the column order of terminology_fts:
+# source, code (unindexed), term, term_alt, english_term, description
+FTS_RANK = "bm25(0.0, 0.0, 10.0, 8.0, 5.0, 1.0)"
+
+
+def existing_sources(conn: sqlite3.Connection) -> List[str]:
+    """FTS sources (see TableSchemas.FTS_SOURCES) that exist as tables in this DB."""
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return [t for t in TableSchemas.FTS_SOURCES if t in tables]
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).fetchone() is not None
+
+
+def rebuild_fts(conn: sqlite3.Connection, sources: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Creates `terminology_fts` if needed and repopulates it from the given
+    source tables (default: every known source present in the DB), so the
+    index always reflects the last build. Returns rows indexed per source.
+    """
+    conn.execute(TableSchemas.FTS_SCHEMA)
+    conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', ?)", (FTS_RANK,))
+    indexed: Dict[str, int] = {}
+    for source in sources if sources is not None else existing_sources(conn):
+        mapping = TableSchemas.FTS_SOURCES[source]
+        conn.execute(f"DELETE FROM {FTS_TABLE} WHERE source = ?", (source,))
+        fields = ", ".join(f"COALESCE({mapping[f]}, '')" for f in FTS_FIELDS)
+        cur = conn.execute(
+            f"""
+            INSERT INTO {FTS_TABLE} (source, code, {", ".join(FTS_FIELDS)})
+            SELECT ?, {mapping["code"]}, {fields} FROM {source}
+            """,
+            (source,),
+        )
+        indexed[source] = cur.rowcount
+    # Merge b-tree segments once after a bulk load
+    conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return indexed
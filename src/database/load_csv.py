@@ -1,62 +1,157 @@
-# import csv
-# from pathlib import Path
-# from connection import get_sqlite_connection  
-
-# conn = get_sqlite_connection()
-# cursor = conn.cursor()
-
-# # Create table if it doesn't exist
-# cursor.execute("""
-# CREATE TABLE IF NOT EXISTS namaste_terms (
-#     id INTEGER PRIMARY KEY AUTOINCREMENT,
-#     NAMC_ID TEXT,
-#     NAMC_CODE TEXT,
-#     NAMC_term TEXT,
-#     NAMC_term_diacritical TEXT,
-#     NAMC_term_DEVANAGARI TEXT,
-#     Short_definition TEXT,
-#     Long_definition TEXT,
-#     Ontology_branches TEXT,
-#     Term_ID TEXT,
-#     English_term TEXT,
-#     Description TEXT,
-#     Sanskrit_IAST TEXT,
-#     Sanskrit TEXT
-# )
-# """)
-# conn.commit()
-
-# csv_path = Path(__file__).resolve().parent.parent.parent / "data" / "namaste_codes" / "IAST_Sanskrit_Matching.csv"
-# with open(csv_path, newline='', encoding='utf-8') as csvfile:
-#     reader = csv.DictReader(csvfile)
-#     for row in reader:
-#         cursor.execute("""
-#             INSERT INTO namaste_terms (
-#                 NAMC_ID, NAMC_CODE, NAMC_term, NAMC_term_diacritical, NAMC_term_DEVANAGARI,
-#                 Short_definition, Long_definition, Ontology_branches, Term_ID,
-#                 English_term, Description, Sanskrit_IAST, Sanskrit
-#             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-#         """, (
-#             row["NAMC_ID"], row["NAMC_CODE"], row["NAMC_term"], row["NAMC_term_diacritical"], row["NAMC_term_DEVANAGARI"],
-#             row["Short_definition"], row["Long_definition"], row["Ontology_branches"], row["Term ID"],
-#             row["English term"], row["Description"], row["Sanskrit (IAST)"], row["Sanskrit"]
-#         ))
-
-# conn.commit()
-# print("CSV loaded successfully!")
-# conn.close()
-
-# from connection import get_sqlite_connection
-
-# conn = get_sqlite_connection()
-# cursor = conn.cursor()
-
-# cursor.execute("SELECT COUNT(*) FROM namaste_terms")
-# count = cursor.fetchone()[0]
-# print(f"Total rows in namaste_terms: {count}")
-
-# cursor.execute("SELECT * FROM namaste_terms LIMIT 5")
-# for row in cursor.fetchall():
-#     print(row)
-
-# conn.close()
+"""
+Loads IAST_Sanskrit_Matching.csv into the `namaste_terms` table that the
+backend's code-mapping routes query.
+
+- The CSV is streamed with csv.reader, so multi-line quoted `Description`
+  fields are read as one value and the file is never held in memory.
+- Rows are deduplicated on NAMC_CODE (first occurrence wins, surrounding
+  whitespace stripped); rows without a code are skipped.
+- The table is reloaded in one transaction with `executemany` in batches;
+  its indexes (TableSchemas.NAMASTE_TERMS_INDEXES) are dropped first and
+  created once the rows are in.
+
+    python -m src.database.load_csv [--csv path] [--db path]
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import src.settings.config as config
+from src.schema.table_schema import TableSchemas
+
+from .connection import get_sqlite_connection
+
+CSV_PATH = os.getenv("NAMASTE_TERMS_CSV", config.NAMASTE_TERMS_CSV)
+BATCH_SIZE = int(os.getenv("NAMASTE_TERMS_BATCH_SIZE", 10000))
+
+# CSV header → namaste_terms column
+CSV_COLUMNS: Dict[str, str] = {
+    "NAMC_ID": "NAMC_ID",
+    "NAMC_CODE": "NAMC_CODE",
+    "NAMC_term": "NAMC_term",
+    "NAMC_term_diacritical": "NAMC_term_diacritical",
+    "NAMC_term_DEVANAGARI": "NAMC_term_DEVANAGARI",
+    "Short_definition": "Short_definition",
+    "Long_definition": "Long_definition",
+    "Ontology_branches": "Ontology_branches",
+    "Term ID": "Term_ID",
+    "English term": "English_term",
+    "Description": "Description",
+    "Sanskrit (IAST)": "Sanskrit_IAST",
+    "Sanskrit": "Sanskrit",
+}
+TABLE_COLUMNS: Tuple[str, ...] = tuple(CSV_COLUMNS.values())
+KEY_COLUMN = "NAMC_CODE"
+
+
+def iter_csv_rows(csv_path: str | Path, stats: Optional[Dict[str, int]] = None) -> Iterator[Tuple[Optional[str], ...]]:
+    """
+    Rows of the CSV as TABLE_COLUMNS tuples, deduplicated on NAMC_CODE.
+    Missing columns come out as NULL. `stats` (if given) receives
+    rows_read, duplicates and skipped counts.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(rows_read=0, duplicates=0, skipped=0)
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        positions = {name.strip(): i for i, name in enumerate(header)}
+        if KEY_COLUMN not in positions:
+            raise ValueError(f"{csv_path}: no {KEY_COLUMN} column; found {header}")
+        indexes = [positions.get(name) for name in CSV_COLUMNS]
+        key_index = list(CSV_COLUMNS).index(KEY_COLUMN)
+        width = len(header)
+        seen = set()
+        for record in reader:
+            stats["rows_read"] += 1
+            if len(record) < width:
+                record += [""] * (width - len(record))
+            row = [record[i] if i is not None else None for i in indexes]
+            code = (row[key_index] or "").strip()
+            if not code:
+                stats["skipped"] += 1
+                continue
+            if code in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(code)
+            row[key_index] = code
+            yield tuple(row)
+
+
+def load_namaste_terms(
+    conn: sqlite3.Connection,
+    csv_path: Optional[str | Path] = None,
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Replaces the contents of `namaste_terms` with the CSV. Runs inside the
+    connection's current transaction; the caller commits. Returns counts,
+    timings and the loaded codes (`codes`, for the source manifest).
+    """
+    csv_path = Path(csv_path or CSV_PATH).resolve()
+    start = time.perf_counter()
+    stats: Dict[str, Any] = {}
+    codes: List[str] = []
+    if not conn.in_transaction:
+        conn.execute("BEGIN")  # so the DDL below is rolled back with the rows on failure
+    conn.execute(TableSchemas.NAMASTE_TERMS_SCHEMA)
+    for name in TableSchemas.NAMASTE_TERMS_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.execute("DELETE FROM namaste_terms")
+
+    sql = (
+        f"INSERT INTO namaste_terms ({', '.join(TABLE_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in TABLE_COLUMNS)})"
+    )
+    key_index = TABLE_COLUMNS.index(KEY_COLUMN)
+    rows = iter_csv_rows(csv_path, stats)
+    inserted = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        conn.executemany(sql, batch)
+        codes.extend(row[key_index] for row in batch)
+        inserted += len(batch)
+    load_done = time.perf_counter()
+
+    for index_sql in TableSchemas.NAMASTE_TERMS_INDEXES.values():
+        conn.execute(index_sql)
+    end = time.perf_counter()
+
+    stats.update(
+        rows_inserted=inserted,
+        load_seconds=load_done - start,
+        index_seconds=end - load_done,
+        rows_per_second=stats["rows_read"] / (end - start) if end > start else 0.0,
+        codes=codes,
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load IAST_Sanskrit_Matching.csv into namaste_terms.")
+    parser.add_argument("--csv", default=CSV_PATH, help="CSV path")
+    parser.add_argument("--db", default=None, help="master DB path (default: WHO_TERMINOLOGIES_MASTER_DB)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    conn = get_sqlite_connection(args.db)
+    try:
+        result = load_namaste_terms(conn, args.csv, args.batch_size)
+        conn.commit()
+    finally:
+        conn.close()
+    print(
+        f"Loaded {result['rows_inserted']}/{result['rows_read']} rows into namaste_terms "
+        f"({result['duplicates']} duplicate codes, {result['skipped']} without a code), "
+        f"load {result['load_seconds']:.3f}s, indexes {result['index_seconds']:.3f}s, "
+        f"{result['rows_per_second']:.0f} rows/s"
+    )
@@ -0,0 +1,188 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.schema.table_schema import TableSchemas
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SourceManifest:
+    """
+    Records which source file produced which rows of a master DB.
+
+    - `source_manifest` keeps each file's path, size, mtime, content hash and
+      row count, grouped by `source_kind` (one kind per builder).
+    - `source_rows` maps every (table, key) to the file that last wrote it,
+      so rows of a changed or removed file can be deleted before re-import.
+      Keys are assumed unique across the files of one table.
+    - Unchanged size and mtime short-circuit hashing, so a no-op rebuild only
+      stats its inputs.
+    """
+
+    SCHEMAS: Dict[str, str] = TableSchemas.MANIFEST_SCHEMAS
+
+    def __init__(self, conn: sqlite3.Connection, source_kind: str) -> None:
+        self.conn = conn
+        self.source_kind = source_kind
+
+    def ensure(self) -> "SourceManifest":
+        for sql in self.SCHEMAS.values():
+            self.conn.execute(sql)
+        return self
+
+    @staticmethod
+    def key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def status(self, path: Path) -> Tuple[str, os.stat_result, Optional[str]]:
+        """Returns (NEW | CHANGED | UNCHANGED, stat, content hash if it was computed)."""
+        stat = path.stat()
+        row = self.conn.execute(
+            "SELECT size, mtime, content_hash FROM source_manifest WHERE path = ?",
+            (self.key(path),),
+        ).fetchone()
+        if row is None:
+            return NEW, stat, None
+        size, mtime, content_hash = row
+        if size == stat.st_size and mtime == stat.st_mtime:
+            return UNCHANGED, stat, content_hash
+        current = file_hash(path)
+        if current == content_hash:
+            # Touched but identical: remember the new mtime so the next check is cheap again
+            self.conn.execute(
+                "UPDATE source_manifest SET size = ?, mtime = ? WHERE path = ?",
+                (stat.st_size, stat.st_mtime, self.key(path)),
+            )
+            return UNCHANGED, stat, current
+        return CHANGED, stat, current
+
+    def paths(self) -> List[str]:
+        return [
+            p for (p,) in self.conn.execute(
+                "SELECT path FROM source_manifest WHERE source_kind = ?", (self.source_kind,)
+            )
+        ]
+
+    def remove(self, path: Path | str) -> int:
+        """Deletes the rows a file produced and forgets the file. Returns rows deleted."""
+        key = self.key(Path(path))
+        row = self.conn.execute(
+            "SELECT target_table, key_column FROM source_manifest WHERE path = ?", (key,)
+        ).fetchone()
+        deleted = 0
+        if row is not None and row[0] and row[1]:
+            table, key_column = row
+            deleted = self.conn.execute(
+                f"""
+                DELETE FROM {table} WHERE {key_column} IN (
+                    SELECT row_key FROM source_rows WHERE target_table = ? AND path = ?
+                )
+                """,
+                (table, key),
+            ).rowcount
+        self.conn.execute("DELETE FROM source_rows WHERE path = ?", (key,))
+        self.conn.execute("DELETE FROM source_manifest WHERE path = ?", (key,))
+        return deleted
+
+    def remove_missing(self, present: Iterable[Path]) -> List[str]:
+        """Removes manifest entries (and their rows) for files of this kind no longer present."""
+        present_keys = {self.key(p) for p in present}
+        removed = [p for p in self.paths() if p not in present_keys]
+        for p in removed:
+            self.remove(p)
+        return removed
+
+    def record(
+        self,
+        path: Path,
+        stat: os.stat_result,
+        content_hash: Optional[str],
+        target_table: Optional[str],
+        key_column: Optional[str],
+        keys: Iterable[str],
+    ) -> int:
+        """Stores a file's fingerprint and the keys of the rows it wrote. Returns the row count."""
+        key = self.key(path)
+        self.conn.execute("DELETE FROM source_rows WHERE path = ?", (key,))
+        if target_table:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO source_rows (target_table, row_key, path) VALUES (?, ?, ?)",
+                ((target_table, str(k), key) for k in keys if k is not None),
+            )
+        row_count = self.conn.execute(
+            "SELECT COUNT(*) FROM source_rows WHERE path = ?", (key,)
+        ).fetchone()[0]
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO source_manifest
+                (path, source_kind, target_table, key_column, size, mtime, content_hash, row_count, imported_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key, self.source_kind, target_table, key_column, stat.st_size, stat.st_mtime,
+                content_hash or file_hash(path), row_count, datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        return row_count
+
+
+def stale_sources(
+    db_path: str | Path, sources: Iterable[str | Path], folders: Iterable[str | Path] = ()
+) -> Dict[str, str]:
+    """
+    Compares source files against the manifest of an existing master DB
+    without modifying it. Returns {path: reason} for every source that is
+    missing, never imported, or changed since its last import. `folders`
+    contribute the JSON files in them; a missing folder has none. Like
+    `SourceManifest.status`, a file whose size or mtime differ is hashed, so
+    a touched but identical file is not reported.
+    """
+    stale: Dict[str, str] = {}
+    files: List[Path] = []
+    for folder in map(Path, folders):
+        if folder.is_dir():
+            files.extend(sorted(p for p in folder.iterdir() if p.suffix.lower() == ".json"))
+    for source in map(Path, sources):
+        if source.is_dir():
+            files.extend(sorted(p for p in source.iterdir() if p.suffix.lower() == ".json"))
+        elif source.exists():
+            files.append(source)
+        else:
+            stale[str(source)] = "missing"
+    db_path = Path(db_path).resolve()
+    if not db_path.exists():
+        stale.update({str(f): "master DB not built" for f in files})
+        return stale
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        has_manifest = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'source_manifest'"
+        ).fetchone()
+        for f in files:
+            row = conn.execute(
+                "SELECT size, mtime, content_hash FROM source_manifest WHERE path = ?", (SourceManifest.key(f),)
+            ).fetchone() if has_manifest else None
+            stat = f.stat()
+            if row is None:
+                stale[str(f)] = "not imported"
+            elif (row[0], row[1]) != (stat.st_size, stat.st_mtime) and row[2] != file_hash(f):
+                stale[str(f)] = "changed since last import"
+    finally:
+        conn.close()
+    return stale
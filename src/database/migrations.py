@@ -0,0 +1,76 @@
+import sqlite3
+from typing import Dict, List, Optional, Sequence
+
+from src.schema.table_schema import TableSchemas
+
+
+def add_missing_columns(conn: sqlite3.Connection, migrations: Dict[str, Dict[str, str]]) -> List[str]:
+    """
+    Adds every `{table: {column: type}}` column not yet present, so DBs built
+    before a schema change keep working. Tables that do not exist are
+    skipped (their CREATE statement already has the columns).
+    Returns the added columns as "table.column".
+    """
+    added = []
+    for table, columns in migrations.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if not existing:
+            continue
+        for column, column_type in columns.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                added.append(f"{table}.{column}")
+    return added
+
+
+def rebuild_primary_key(
+    conn: sqlite3.Connection,
+    table: str,
+    create_sql: str,
+    key: Sequence[str],
+    fill: Optional[Dict[str, str]] = None,
+) -> bool:
+    """
+    Recreates `table` from `create_sql` when its primary key is not `key`
+    (SQLite cannot alter a primary key) and copies the rows over. Columns in
+    `fill` are set from SQL expressions over the old row, aliased `old`; the
+    other columns are copied (NULL if the old table lacks them).
+    Returns True if the table was rebuilt.
+    """
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    current = [row[1] for row in sorted((row for row in info if row[5]), key=lambda row: row[5])]
+    if not info or current == list(key):
+        return False
+    old_columns = {row[1] for row in info}
+    old_table = f"{table}__old"
+    conn.execute(f"ALTER TABLE {table} RENAME TO {old_table}")
+    conn.execute(create_sql)
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    values = [
+        (fill or {}).get(column, f"old.{column}" if column in old_columns else "NULL") for column in columns
+    ]
+    conn.execute(
+        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) SELECT {', '.join(values)} FROM {old_table} AS old"
+    )
+    conn.execute(f"DROP TABLE {old_table}")
+    return True
+
+
+def migrate_icd_mapping_tables(conn: sqlite3.Connection) -> List[str]:
+    """
+    Brings the NAMASTE → ICD mapping tables (TableSchemas.ICD_MAPPING_SCHEMAS)
+    of an existing DB up to date: creates missing tables, adds new columns and
+    rebuilds tables whose primary key changed. Returns what was changed.
+    """
+    changed = []
+    for sql in TableSchemas.ICD_MAPPING_SCHEMAS.values():
+        conn.execute(sql)
+    changed += add_missing_columns(conn, TableSchemas.ICD_MAPPING_MIGRATIONS)
+    for table, migration in TableSchemas.ICD_MAPPING_KEY_MIGRATIONS.items():
+        if rebuild_primary_key(
+            conn, table, TableSchemas.ICD_MAPPING_SCHEMAS[table], migration["key"], migration["fill"]
+        ):
+            changed.append(f"{table} primary key ({', '.join(migration['key'])})")
+    for sql in TableSchemas.ICD_MAPPING_SCHEMAS.values():
+        conn.execute(sql)  # indexes dropped with rebuilt tables
+    return changed
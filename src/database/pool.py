@@ -0,0 +1,239 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import src.settings.config as config
+
+READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", 8))
+READ_POOL_TIMEOUT = float(os.getenv("SQLITE_READ_POOL_TIMEOUT", 5.0))
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+READER_CACHE_KIB = int(os.getenv("SQLITE_READER_CACHE_KIB", 16 * 1024))
+
+
+class PoolTimeout(TimeoutError):
+    """No reader connection became free within the pool timeout."""
+
+
+class _Waiter:
+    """A caller queued for a reader; the releasing thread hands its connection over directly."""
+
+    def __init__(self) -> None:
+        self.ready = threading.Event()
+        self.conn: Optional[sqlite3.Connection] = None
+
+
+class SQLitePool:
+    """
+    Long-lived SQLite connections for one database file.
+
+    - `reader()` lends one of up to `size` read-only connections
+      (`mode=ro` URI, `query_only`, memory-mapped I/O, private page cache),
+      opened lazily and reused across requests and threads. When all are
+      busy, callers wait up to `timeout` seconds, then get PoolTimeout.
+    - `writer()` lends the single read-write connection under a lock, so
+      builders never contend for SQLite's write lock; the transaction is
+      committed on success and rolled back on error.
+    - The DB runs in WAL mode, so readers never block the writer or each other.
+    - `stats()` reports checkouts, wait times and how often the pool ran dry.
+
+    Shared-cache mode is deliberately not used: SQLite discourages it, and
+    with WAL plus mmap every reader already shares the OS page cache.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        size: int = READ_POOL_SIZE,
+        timeout: float = READ_POOL_TIMEOUT,
+        mmap_size: int = MMAP_SIZE,
+        cache_kib: int = READER_CACHE_KIB,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.db_path = str(Path(db_path).resolve())
+        self.size = size
+        self.timeout = timeout
+        self.mmap_size = mmap_size
+        self.cache_kib = cache_kib
+        self.log = logger or logging.getLogger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        self._idle: List[sqlite3.Connection] = []  # most recently used last, so hot connections are reused
+        self._waiters: Deque[_Waiter] = deque()
+        self._opened = 0
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+
+        self._counters = {
+            "reader_checkouts": 0,
+            "reader_waits": 0,  # checkouts that found every reader busy
+            "reader_timeouts": 0,
+            "writer_checkouts": 0,
+            "writer_waits": 0,
+        }
+        self._wait = {"reader_wait_seconds": 0.0, "reader_max_wait_seconds": 0.0, "writer_wait_seconds": 0.0}
+
+    # --- readers ---
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._release_reader(conn)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Pool for {self.db_path} is closed")
+            if self._idle and not self._waiters:
+                conn = self._idle.pop()
+                self._record_reader(0.0, waited=False)
+                return conn
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+            else:
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+
+        if can_open:
+            try:
+                conn = self._open_reader()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+            with self._lock:
+                self._record_reader(0.0, waited=False)
+            return conn
+
+        # Released readers are handed to waiters in arrival order, so a
+        # thread that just returned one cannot overtake queued callers.
+        start = time.perf_counter()
+        waiter.ready.wait(self.timeout)
+        with self._lock:
+            if waiter.conn is None:
+                self._waiters.remove(waiter)
+                self._counters["reader_timeouts"] += 1
+                raise PoolTimeout(f"No SQLite reader free for {self.db_path} after {self.timeout}s")
+            self._record_reader(time.perf_counter() - start, waited=True)
+        return waiter.conn
+
+    def _release_reader(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.conn = conn
+                waiter.ready.set()
+            elif self._closed:
+                conn.close()
+            else:
+                self._idle.append(conn)
+
+    def _open_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro&cache=private", uri=True, check_same_thread=False
+        )
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_kib)}")
+        return conn
+
+    # --- writer ---
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        start = time.perf_counter()
+        waited = not self._writer_lock.acquire(blocking=False)
+        if waited:
+            self._writer_lock.acquire()
+        try:
+            with self._lock:
+                self._counters["writer_checkouts"] += 1
+                self._counters["writer_waits"] += waited
+                self._wait["writer_wait_seconds"] += time.perf_counter() - start
+            if self._writer is None:
+                self._writer = self._open_writer()
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        finally:
+            self._writer_lock.release()
+
+    def _open_writer(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA foreign_keys=ON;")
+        conn.execute("PRAGMA busy_timeout=5000;")
+        return conn
+
+    # --- bookkeeping ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus mean/max wait times (ms) and reader occupancy."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            wait = dict(self._wait)
+            stats["readers_open"] = self._opened
+            stats["readers_idle"] = len(self._idle)
+            stats["readers_waiting"] = len(self._waiters)
+        checkouts = stats["reader_checkouts"]
+        stats["mean_reader_wait_ms"] = 1000 * wait["reader_wait_seconds"] / checkouts if checkouts else 0.0
+        stats["max_reader_wait_ms"] = 1000 * wait["reader_max_wait_seconds"]
+        stats["mean_writer_wait_ms"] = (
+            1000 * wait["writer_wait_seconds"] / stats["writer_checkouts"] if stats["writer_checkouts"] else 0.0
+        )
+        return stats
+
+    def close(self) -> None:
+        """Closes idle readers and the writer; readers still lent out are closed when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _record_reader(self, seconds: float, waited: bool) -> None:
+        """Callers hold self._lock."""
+        self._counters["reader_checkouts"] += 1
+        if waited:
+            self._counters["reader_waits"] += 1
+            self._wait["reader_wait_seconds"] += seconds
+            self._wait["reader_max_wait_seconds"] = max(self._wait["reader_max_wait_seconds"], seconds)
+
+
+_pools: Dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_sqlite_pool(db_path: Optional[str] = None, **options: Any) -> SQLitePool:
+    """
+    Returns the process-wide pool for `db_path` (default: WHO_TERMINOLOGIES_MASTER_DB,
+    as in get_sqlite_connection). `options` only apply when the pool is first created.
+    """
+    db_path = db_path or os.getenv("WHO_TERMINOLOGIES_MASTER_DB", config.WHO_TERMINOLOGIES_MASTER_DB)
+    key = str(Path(db_path).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SQLitePool(key, **options)
+    return pool
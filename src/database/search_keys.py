@@ -0,0 +1,54 @@
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+from src.schema.table_schema import TableSchemas
+from src.utils.normalize import search_key
+
+SEARCH_KEY_TABLE = "term_search_keys"
+
+
+def register_search_key(conn: sqlite3.Connection) -> None:
+    """Exposes normalize.search_key() to SQL as `search_key(text)`."""
+    conn.create_function("search_key", 1, search_key, deterministic=True)
+
+
+def existing_sources(conn: sqlite3.Connection) -> List[str]:
+    """Search-key sources (see TableSchemas.SEARCH_KEY_SOURCES) that exist as tables in this DB."""
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return [t for t in TableSchemas.SEARCH_KEY_SOURCES if t in tables]
+
+
+def has_search_keys(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_KEY_TABLE,)
+    ).fetchone() is not None
+
+
+def rebuild_search_keys(conn: sqlite3.Connection, sources: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Creates `term_search_keys` if needed and recomputes the folded key of
+    every spelling variant in the given source tables (default: every known
+    source present in the DB). Variants folding to the same key collapse
+    into one row. Returns keys stored per source.
+    """
+    conn.execute(TableSchemas.SEARCH_KEY_SCHEMA)
+    register_search_key(conn)
+    stored: Dict[str, int] = {}
+    for source in sources if sources is not None else existing_sources(conn):
+        mapping = TableSchemas.SEARCH_KEY_SOURCES[source]
+        conn.execute(f"DELETE FROM {SEARCH_KEY_TABLE} WHERE source = ?", (source,))
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({source})")}
+        for column in (c for c in mapping["terms"] if c in columns):
+            conn.execute(
+                f"""
+                INSERT OR IGNORE INTO {SEARCH_KEY_TABLE} (search_key, source, code, term)
+                SELECT search_key({column}), ?, {mapping["code"]}, {column} FROM {source}
+                WHERE {column} IS NOT NULL AND {column} <> '' AND {mapping["code"]} IS NOT NULL
+                """,
+                (source,),
+            )
+        conn.execute(f"DELETE FROM {SEARCH_KEY_TABLE} WHERE source = ? AND search_key = ''", (source,))
+        (stored[source],) = conn.execute(
+            f"SELECT COUNT(*) FROM {SEARCH_KEY_TABLE} WHERE source = ?", (source,)
+        ).fetchone()
+    return stored
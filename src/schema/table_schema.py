@@ -1,8 +1,12 @@
     # Mapping between system → schema + allowed columns
-from typing import Dict, Any, Set 
+from typing import Dict, Any, Optional, Tuple
 
 class TableSchemas:
-        
+
+    # Stamped into PRAGMA user_version by the master DB builders and checked at
+    # service start (src/services/startup.py); bump when a change needs a rebuild.
+    SCHEMA_VERSION = 1
+
     WHO_TERMINOLOGY_SCHEMAS: Dict[str, Dict[str, Any]] = {
         "ayurveda": {
             "schema": """
@@ -16,6 +20,7 @@ class TableSchemas:
             """,
             "columns": {"term_id", "english_term", "description", "sanskrit_IAST", "sanskrit_devanagari"},
             "table": "ayurveda_terminologies",
+            "key": "term_id",
         },
         "siddha": {
             "schema": """
@@ -29,6 +34,7 @@ class TableSchemas:
             """,
             "columns": {"term_id", "english_term", "description", "transliteration", "native_term"},
             "table": "siddha_terminologies",
+            "key": "term_id",
         },
         "unani": {
             "schema": """
@@ -42,5 +48,229 @@ class TableSchemas:
             """,
             "columns": {"term_id", "english_term", "description", "transliteration", "native_term"},
             "table": "unani_terminologies",
+            "key": "term_id",
+        },
+    }
+
+    # NAMASTE terms with IAST/Devanagari spellings from IAST_Sanskrit_Matching.csv
+    # (src/database/load_csv.py); queried by the Node backend's code-mapping routes
+    NAMASTE_TERMS_SCHEMA: str = """
+        CREATE TABLE IF NOT EXISTS namaste_terms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            NAMC_ID TEXT,
+            NAMC_CODE TEXT,
+            NAMC_term TEXT,
+            NAMC_term_diacritical TEXT,
+            NAMC_term_DEVANAGARI TEXT,
+            Short_definition TEXT,
+            Long_definition TEXT,
+            Ontology_branches TEXT,
+            Term_ID TEXT,
+            English_term TEXT,
+            Description TEXT,
+            Sanskrit_IAST TEXT,
+            Sanskrit TEXT
+        )
+    """
+
+    # Created after the bulk load rather than maintained row by row
+    NAMASTE_TERMS_INDEXES: Dict[str, str] = {
+        "idx_namaste_terms_namc_code": "CREATE UNIQUE INDEX IF NOT EXISTS idx_namaste_terms_namc_code ON namaste_terms (NAMC_CODE)",
+        "idx_namaste_terms_term_id": "CREATE INDEX IF NOT EXISTS idx_namaste_terms_term_id ON namaste_terms (Term_ID)",
+    }
+
+    # NAMASTE -> ICD-11 mappings precomputed by src/utils/build_icd_mapping_db.py
+    ICD_MAPPING_SCHEMAS: Dict[str, str] = {
+        "namaste_icd_map": """
+            CREATE TABLE IF NOT EXISTS namaste_icd_map (
+                system TEXT NOT NULL,
+                namaste_code TEXT NOT NULL,
+                icd_release TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                icd_code TEXT,
+                icd_title TEXT,
+                icd_uri TEXT,
+                score REAL,
+                confidence REAL,
+                equivalence TEXT,
+                method TEXT NOT NULL,
+                PRIMARY KEY (system, namaste_code, icd_release, method, rank)
+            ) WITHOUT ROWID
+        """,
+        "namaste_icd_map_progress": """
+            CREATE TABLE IF NOT EXISTS namaste_icd_map_progress (
+                system TEXT NOT NULL,
+                namaste_code TEXT NOT NULL,
+                icd_release TEXT NOT NULL,
+                method TEXT NOT NULL,
+                match_count INTEGER NOT NULL,
+                mapped_at TEXT NOT NULL,
+                PRIMARY KEY (system, namaste_code, icd_release, method)
+            ) WITHOUT ROWID
+        """,
+        "idx_namaste_icd_map_icd_code": """
+            CREATE INDEX IF NOT EXISTS idx_namaste_icd_map_icd_code
+            ON namaste_icd_map (icd_release, icd_code)
+        """,
+    }
+
+    # Columns added to ICD_MAPPING_SCHEMAS tables after their first release;
+    # applied to existing DBs by src/database/migrations.py
+    ICD_MAPPING_MIGRATIONS: Dict[str, Dict[str, str]] = {
+        "namaste_icd_map": {
+            "confidence": "REAL",
+            "equivalence": "TEXT",
+            "method": "TEXT",
+        },
+    }
+
+    # Mapping tables whose primary key gained `method` (each mapping method
+    # keeps its own rows and progress); existing tables are rebuilt with the
+    # key and the new columns filled from these SQL expressions over the old
+    # row (`old`). Rows written before `method` existed came from the API builder.
+    ICD_MAPPING_KEY_MIGRATIONS: Dict[str, Dict[str, Any]] = {
+        "namaste_icd_map": {
+            "key": ("system", "namaste_code", "icd_release", "method", "rank"),
+            "fill": {"method": "COALESCE(old.method, 'icd_api')"},
+        },
+        "namaste_icd_map_progress": {
+            "key": ("system", "namaste_code", "icd_release", "method"),
+            "fill": {"method": """COALESCE((
+                SELECT m.method FROM namaste_icd_map m
+                WHERE m.system = old.system AND m.namaste_code = old.namaste_code
+                  AND m.icd_release = old.icd_release
+                LIMIT 1
+            ), 'icd_api')"""},
+        },
+    }
+
+    # Mapping methods, preferred first: readers serve one method's matches per
+    # code (ICD search results over similarity scores when both exist)
+    ICD_MAPPING_METHODS: Tuple[str, ...] = ("icd_api", "icd_local", "tfidf")
+
+    @staticmethod
+    def method_preference(method: Optional[str]) -> Tuple[int, str]:
+        """Sort key of a mapping method: ICD_MAPPING_METHODS order, unknown methods last."""
+        methods = TableSchemas.ICD_MAPPING_METHODS
+        return (methods.index(method), "") if method in methods else (len(methods), method or "")
+
+    # Source file manifest for incremental rebuilds (src/database/manifest.py)
+    MANIFEST_SCHEMAS: Dict[str, str] = {
+        "source_manifest": """
+            CREATE TABLE IF NOT EXISTS source_manifest (
+                path TEXT PRIMARY KEY,
+                source_kind TEXT NOT NULL,
+                target_table TEXT,
+                key_column TEXT,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                imported_at TEXT NOT NULL
+            )
+        """,
+        "source_rows": """
+            CREATE TABLE IF NOT EXISTS source_rows (
+                target_table TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                path TEXT NOT NULL,
+                PRIMARY KEY (target_table, row_key)
+            ) WITHOUT ROWID
+        """,
+        "idx_source_rows_path": """
+            CREATE INDEX IF NOT EXISTS idx_source_rows_path ON source_rows (path)
+        """,
+    }
+
+    # Folded spelling/script-insensitive keys (src/database/search_keys.py); the
+    # primary key doubles as the lookup index, so any variant resolves with one seek
+    SEARCH_KEY_SCHEMA: str = """
+        CREATE TABLE IF NOT EXISTS term_search_keys (
+            search_key TEXT NOT NULL,
+            source TEXT NOT NULL,
+            code TEXT NOT NULL,
+            term TEXT,
+            PRIMARY KEY (search_key, source, code)
+        ) WITHOUT ROWID
+    """
+
+    # Per source table: code column and the spelling variants folded into keys,
+    # preferred display form first
+    SEARCH_KEY_SOURCES: Dict[str, Dict[str, Any]] = {
+        "namaste_terms": {
+            "code": "NAMC_CODE",
+            "terms": ["NAMC_term_diacritical", "Sanskrit_IAST", "NAMC_term", "NAMC_term_DEVANAGARI", "Sanskrit"],
+        },
+        "ayurveda_terminologies": {
+            "code": "term_id",
+            "terms": ["sanskrit_IAST", "sanskrit_devanagari", "english_term"],
+        },
+        "siddha_terminologies": {
+            "code": "term_id",
+            "terms": ["transliteration", "native_term", "english_term"],
+        },
+        "unani_terminologies": {
+            "code": "term_id",
+            "terms": ["transliteration", "native_term", "english_term"],
+        },
+        **{
+            f"namaste_{system}": {"code": "code", "terms": ["english_term"]}
+            for system in ("ayurveda", "siddha", "unani")
+        },
+    }
+
+    # Full-text search index over every terminology table (src/database/fts.py).
+    # Each source maps its own columns onto the shared term/term_alt/english_term/description fields.
+    FTS_SCHEMA: str = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS terminology_fts USING fts5(
+            source UNINDEXED,
+            code UNINDEXED,
+            term,
+            term_alt,
+            english_term,
+            description,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3 4'
+        )
+    """
+
+    FTS_SOURCES: Dict[str, Dict[str, str]] = {
+        "namaste_terms": {
+            "code": "NAMC_CODE",
+            "term": "NAMC_term",
+            "term_alt": "COALESCE(NAMC_term_diacritical, '') || ' ' || COALESCE(Sanskrit_IAST, '')",
+            "english_term": "English_term",
+            "description": "Description",
+        },
+        "ayurveda_terminologies": {
+            "code": "term_id",
+            "term": "sanskrit_IAST",
+            "term_alt": "sanskrit_devanagari",
+            "english_term": "english_term",
+            "description": "description",
+        },
+        "siddha_terminologies": {
+            "code": "term_id",
+            "term": "transliteration",
+            "term_alt": "native_term",
+            "english_term": "english_term",
+            "description": "description",
+        },
+        "unani_terminologies": {
+            "code": "term_id",
+            "term": "transliteration",
+            "term_alt": "native_term",
+            "english_term": "english_term",
+            "description": "description",
+        },
+        **{
+            f"namaste_{system}": {
+                "code": "code",
+                "term": "english_term",
+                "term_alt": "''",
+                "english_term": "''",
+                "description": "description",
+            }
+            for system in ("ayurveda", "siddha", "unani")
         },
     }
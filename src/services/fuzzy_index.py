@@ -0,0 +1,164 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import src.settings.config as config
+from src.database.search_keys import SEARCH_KEY_TABLE, existing_sources, has_search_keys
+from src.schema.table_schema import TableSchemas
+from src.utils.normalize import search_key
+
+# (search_key, source, code, term)
+Entry = Tuple[str, str, str, str]
+
+
+def trigrams(key: str) -> set:
+    """pg_trgm-style trigrams of a folded key, padded so short words still match."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyTermIndex:
+    """
+    In-memory trigram index for typo-tolerant term lookup.
+
+    - Indexes the folded search keys (src/utils/normalize.py) of every term
+      in the NAMASTE and WHO terminology tables, so misspellings are matched
+      on top of diacritic/script folding.
+    - Each trigram maps to a numpy array of key ids; a query sums the
+      posting lists of its trigrams with one `np.bincount` and scores every
+      candidate by trigram Jaccard similarity (as pg_trgm's `similarity()`).
+    - Read-only after construction, so one instance serves all threads.
+    """
+
+    def __init__(self, entries: Iterable[Entry]) -> None:
+        start = time.perf_counter()
+        key_ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.entries: List[List[Tuple[str, str, str]]] = []
+        for key, source, code, term in entries:
+            if not key:
+                continue
+            key_id = key_ids.get(key)
+            if key_id is None:
+                key_id = key_ids[key] = len(self.keys)
+                self.keys.append(key)
+                self.entries.append([])
+            self.entries[key_id].append((source, code, term))
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        sizes = np.empty(len(self.keys), dtype=np.int32)
+        for key_id, key in enumerate(self.keys):
+            grams = trigrams(key)
+            sizes[key_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(key_id)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._sizes = sizes
+        self.build_seconds = time.perf_counter() - start
+
+    @classmethod
+    def from_db(cls, db_paths: Iterable[str | Path]) -> "FuzzyTermIndex":
+        """Builds the index from every existing master DB in `db_paths` (missing ones are skipped with a warning)."""
+        def entries() -> Iterator[Entry]:
+            for db_path in db_paths:
+                if not os.path.exists(db_path):
+                    logging.getLogger("FuzzyTermIndex").warning("Master DB not found, not indexed: %s", db_path)
+                    continue
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+                try:
+                    yield from _read_entries(conn)
+                finally:
+                    conn.close()
+        return cls(entries())
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        min_similarity: float = 0.3,
+        sources: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Top-k terms by trigram similarity (0..1, higher is better) to `query`."""
+        key = search_key(query)
+        if not key or not self.keys:
+            return []
+        grams = [self._postings[g] for g in trigrams(key) if g in self._postings]
+        if not grams:
+            return []
+        query_size = len(trigrams(key))
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.keys))
+        similarity = shared / (query_size + self._sizes - shared)
+
+        candidates = np.flatnonzero(similarity >= min_similarity)
+        if sources is None and len(candidates) > k:
+            candidates = candidates[np.argpartition(-similarity[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-similarity[candidates], kind="stable")]
+
+        allowed = set(sources) if sources is not None else None
+        results: List[Dict[str, Any]] = []
+        for key_id in candidates:
+            score = float(similarity[key_id])
+            for source, code, term in self.entries[key_id]:
+                if allowed is not None and source not in allowed:
+                    continue
+                results.append({
+                    "source": source, "code": code, "term": term,
+                    "search_key": self.keys[key_id], "score": score,
+                })
+                if len(results) >= k:
+                    return results
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "keys": len(self.keys),
+            "entries": sum(len(e) for e in self.entries),
+            "trigrams": len(self._postings),
+            "postings": int(sum(len(p) for p in self._postings.values())),
+        }
+
+
+def _read_entries(conn: sqlite3.Connection) -> Iterator[Entry]:
+    """Search keys stored by the builders, or computed from the source tables of older DBs."""
+    if has_search_keys(conn):
+        yield from conn.execute(f"SELECT search_key, source, code, term FROM {SEARCH_KEY_TABLE}")
+        return
+    for source in existing_sources(conn):
+        mapping = TableSchemas.SEARCH_KEY_SOURCES[source]
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({source})")}
+        for column in (c for c in mapping["terms"] if c in columns):
+            rows = conn.execute(f"SELECT {mapping['code']}, {column} FROM {source} WHERE {column} <> ''")
+            yield from ((search_key(term), source, code, term) for code, term in rows if code and term)
+
+
+_fuzzy_index: Optional[FuzzyTermIndex] = None
+_fuzzy_index_lock = threading.Lock()
+
+
+def default_db_paths() -> List[str]:
+    """The WHO and NAMASTE master DBs, as configured (env overrides src/settings/config.py)."""
+    return [
+        os.getenv("WHO_TERMINOLOGIES_MASTER_DB", config.WHO_TERMINOLOGIES_MASTER_DB),
+        os.getenv("NAMASTE_MASTER_DB", config.NAMASTE_MASTER_DB),
+    ]
+
+
+def get_fuzzy_index() -> FuzzyTermIndex:
+    """Process-wide index over the master DBs, built on first use (or at service start)."""
+    global _fuzzy_index
+    if _fuzzy_index is None:
+        with _fuzzy_index_lock:
+            if _fuzzy_index is None:
+                index = FuzzyTermIndex.from_db(default_db_paths())
+                logging.getLogger("FuzzyTermIndex").info(
+                    "Fuzzy index built in %.2fs: %s", index.build_seconds, index.stats()
+                )
+                _fuzzy_index = index
+    return _fuzzy_index
@@ -1,12 +1,12 @@
 import logging
 import os
 import src.settings.config as config
+from src.database.manifest import stale_sources
 
 
 class AyushSetuServiceInitializer:
     """Initializes the AyushSetu terminology microservice."""
     paths = [
-            config.WHO_TERMINOLOGIES_JSON_FOLDER,
             config.NAMC_AYURVEDA,
             config.NAMC_UNANI,
             config.NAMC_SIDDHA
@@ -19,8 +19,9 @@ class AyushSetuServiceInitializer:
 
         # Example: initialize ingestor or other required objects here
         class DummyIngestor:
-            db_path = config.WHO_TERMINOLOGIES_MASTER_DB
-            json_folder = config.WHO_TERMINOLOGIES_JSON_FOLDER
+            db_path = os.getenv("WHO_TERMINOLOGIES_MASTER_DB", config.WHO_TERMINOLOGIES_MASTER_DB)
+            json_folder = os.getenv("WHO_TERMINOLOGIES_JSON_FOLDER", config.WHO_TERMINOLOGIES_JSON_FOLDER)
+            terms_csv = os.getenv("NAMASTE_TERMS_CSV", config.NAMASTE_TERMS_CSV)
         self.ingestor = DummyIngestor()
 
     def checkAllFilesExist(self) -> bool:
@@ -28,17 +29,55 @@ class AyushSetuServiceInitializer:
 
         required_paths = self.paths
         missing_paths = [path for path in required_paths if not os.path.exists(path)]
+        if not os.path.isdir(self.ingestor.json_folder):
+            # The WHO JSON exports are not shipped; the master DB is built without them
+            self.logger.warning(f"WHO JSON folder not found, no WHO terminologies: {self.ingestor.json_folder}")
         if missing_paths:
             for path in missing_paths:
                 self.logger.error(f"Required path does not exist: {path}")
             return False
         self.logger.info("All required files and directories exist.")
         return True 
-    
+
+    def checkSourcesUpToDate(self) -> bool:
+        """Report source files that changed since the master DBs were last built."""
+        checks = [
+            (self.ingestor.db_path, [self.ingestor.terms_csv], [self.ingestor.json_folder]),
+            (os.getenv("NAMASTE_MASTER_DB", config.NAMASTE_MASTER_DB),
+             [config.NAMC_AYURVEDA, config.NAMC_UNANI, config.NAMC_SIDDHA], []),
+        ]
+        up_to_date = True
+        for db_path, sources, folders in checks:
+            for path, reason in stale_sources(db_path, sources, folders).items():
+                self.logger.warning(f"Stale source for {db_path}: {path} ({reason})")
+                up_to_date = False
+        if up_to_date:
+            self.logger.info("All master databases are up to date with their sources.")
+        return up_to_date
+
+    def loadFuzzyIndex(self):
+        """Build the in-memory fuzzy term index so the first lookup does not pay for it."""
+        from src.services.fuzzy_index import get_fuzzy_index
+        index = get_fuzzy_index()
+        self.logger.info(f"Fuzzy term index ready: {index.stats()} in {index.build_seconds:.2f}s")
+        return index
+
+    def startServices(self, preload: str = "fuzzy_index,search_cache,token"):
+        """Check the master DB schemas and preload hot structures in parallel (see startup.py)."""
+        from src.services.startup import ServiceStartup, preloaders
+        startup = ServiceStartup(preloaders(preload)).run()
+        for phase, ms in startup.status()["timings_ms"].items():
+            self.logger.info(f"Startup {phase}: {ms:.1f} ms")
+        return startup
+
 
 if __name__ == "__main__":
     initializer = AyushSetuServiceInitializer()
     if initializer.checkAllFilesExist():
-        initializer.logger.info("Initialization successful. All systems go!")
+        initializer.checkSourcesUpToDate()
+        if initializer.startServices().ready:
+            initializer.logger.info("Initialization successful. All systems go!")
+        else:
+            initializer.logger.error("Initialization failed: master DB check or preload failed.")
     else:
         initializer.logger.error("Initialization failed due to missing files or directories.")
@@ -0,0 +1,294 @@
+"""
+Service startup: master DB check, parallel preload and readiness.
+
+- `check_master_db()` verifies a master DB's schema version
+  (PRAGMA user_version, see TableSchemas.SCHEMA_VERSION) and required tables
+  in a single query, read-only.
+- Hot structures (PRELOADERS: code index, fuzzy index, search cache and HTTP
+  session, WHO API token, local ICD snapshot, $translate index) are built in
+  parallel threads. Each preloader imports its module itself, so heavy
+  dependencies are only loaded for the structures a service asks for.
+- `ServiceStartup.status()` reports readiness and the per-phase timing
+  breakdown; the servers expose it (`GET /ready` on src/services/translate.py,
+  `{"op": "ready"}` on `icd_search.py --serve`).
+
+    python -m src.services.startup [--preload search_cache,token] [--json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import src.settings.config as config
+from src.schema.table_schema import TableSchemas
+from src.utils import metrics
+
+# term_store is opt-in (STARTUP_PRELOAD): no request path reads it, so preloading it only costs startup time
+DEFAULT_PRELOAD = os.getenv("STARTUP_PRELOAD", "search_cache,token")
+OPTIONAL_PRELOAD = ("token",)  # network; a failure here is retried by the first search
+
+NAMASTE_TABLES = ("namaste_ayurveda", "namaste_siddha", "namaste_unani")
+
+# Schema version and table names in one round trip
+SCHEMA_QUERY = """
+    SELECT (SELECT user_version FROM pragma_user_version),
+           (SELECT json_group_array(name) FROM sqlite_master WHERE type = 'table')
+"""
+
+STARTING, READY, FAILED = "starting", "ready", "failed"
+
+STARTUP_SECONDS = metrics.histogram("service_startup_seconds", "Service startup time per phase", ("phase",))
+
+
+def default_databases() -> Dict[str, Sequence[str]]:
+    """Master DB path → tables the service cannot run without."""
+    return {
+        os.getenv("WHO_TERMINOLOGIES_MASTER_DB", config.WHO_TERMINOLOGIES_MASTER_DB): (),
+        os.getenv("NAMASTE_MASTER_DB", config.NAMASTE_MASTER_DB): NAMASTE_TABLES,
+    }
+
+
+def check_master_db(db_path: str, required: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Schema version, table count, missing required tables and optional
+    features (FTS, search keys, ICD mappings) of a master DB. `ok` is False
+    if the file is missing, a required table is missing, or the DB was built
+    for a different schema version. Unversioned DBs (user_version 0, built
+    before versioning) pass with a warning.
+    """
+    from src.database.fts import FTS_TABLE
+    from src.database.search_keys import SEARCH_KEY_TABLE
+
+    result: Dict[str, Any] = {"path": str(db_path), "ok": False, "error": None, "warning": None}
+    if not os.path.exists(db_path):
+        result["error"] = "database file not found"
+        return result
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            version, tables = conn.execute(SCHEMA_QUERY).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        result["error"] = f"cannot read schema: {e}"
+        return result
+
+    tables = set(json.loads(tables))
+    missing = [table for table in required if table not in tables]
+    result.update(
+        version=version,
+        tables=len(tables),
+        missing=missing,
+        features={
+            "fts": FTS_TABLE in tables,
+            "search_keys": SEARCH_KEY_TABLE in tables,
+            "mappings": "namaste_icd_map" in tables,
+        },
+    )
+    if missing:
+        result["error"] = f"missing tables: {', '.join(missing)}"
+    elif version not in (0, TableSchemas.SCHEMA_VERSION):
+        result["error"] = f"schema version {version}, expected {TableSchemas.SCHEMA_VERSION}; rebuild the DB"
+    else:
+        result["ok"] = True
+        if version == 0:
+            result["warning"] = "unversioned DB (built before schema versioning)"
+    return result
+
+
+def _term_store() -> Any:
+    from src.services.term_store import get_term_store
+    return get_term_store()
+
+
+def _fuzzy_index() -> Any:
+    from src.services.fuzzy_index import get_fuzzy_index
+    return get_fuzzy_index()
+
+
+def _search_cache() -> Any:
+    from src.api import icd_search
+    icd_search.get_session()  # imports requests/urllib3 and opens the connection pool
+    return icd_search.get_search_cache()
+
+
+def _token() -> Any:
+    from src.api import icd_search
+    if icd_search.LOCAL_SNAPSHOT:
+        return None  # searches never call the WHO API
+    return icd_search.get_token()
+
+
+def _local_index() -> Any:
+    from src.api import icd_search
+    return icd_search.get_local_index() if icd_search.LOCAL_SNAPSHOT else None
+
+
+def _translate() -> Any:
+    from src.services.translate import get_translate_service
+    return get_translate_service()
+
+
+PRELOADERS: Dict[str, Callable[[], Any]] = {
+    "term_store": _term_store,
+    "fuzzy_index": _fuzzy_index,
+    "search_cache": _search_cache,
+    "token": _token,
+    "local_index": _local_index,
+    "translate": _translate,
+}
+
+
+def preloaders(names: Iterable[str] | str = DEFAULT_PRELOAD) -> Dict[str, Callable[[], Any]]:
+    """PRELOADERS entries by name (a list or a comma-separated string)."""
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(",") if name.strip()]
+    unknown = [name for name in names if name not in PRELOADERS]
+    if unknown:
+        raise ValueError(f"Unknown preload {unknown}; choose from {sorted(PRELOADERS)}")
+    return {name: PRELOADERS[name] for name in names}
+
+
+class ServiceStartup:
+    """
+    Runs the startup phases of a service and reports readiness.
+
+    - `schema`: every DB in `databases` ({path: required tables}) is checked
+      with check_master_db(); a failure stops startup.
+    - `preload`: the `preload` callables ({name: callable}) run in parallel
+      threads; their return values are kept in `results`. Failures of names
+      in `optional` are logged but do not block readiness.
+
+    `run()` blocks; `start()` runs the same phases in a background thread so
+    a server can accept work (and answer readiness probes) meanwhile.
+    `timings` holds seconds per phase and per preload (`preload.<name>`).
+    """
+
+    def __init__(
+        self,
+        preload: Optional[Mapping[str, Callable[[], Any]]] = None,
+        databases: Optional[Mapping[str, Sequence[str]]] = None,
+        optional: Iterable[str] = OPTIONAL_PRELOAD,
+        workers: Optional[int] = None,
+    ) -> None:
+        self.preload = dict(preloaders() if preload is None else preload)
+        self.databases = dict(default_databases() if databases is None else databases)
+        self.optional = set(optional)
+        self.workers = workers
+        self.state = STARTING
+        self.timings: Dict[str, float] = {}
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self.log = logging.getLogger("ServiceStartup")
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until startup finished (ready or failed); returns readiness."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def _timed(self, phase: str, started: float) -> None:
+        seconds = time.perf_counter() - started
+        STARTUP_SECONDS.labels(phase).observe(seconds)
+        with self._lock:
+            self.timings[phase] = seconds
+
+    def check_schema(self) -> bool:
+        started = time.perf_counter()
+        for db_path, required in self.databases.items():
+            check = check_master_db(db_path, required)
+            self.checks[db_path] = check
+            if check["warning"]:
+                self.log.warning("%s: %s", db_path, check["warning"])
+            if not check["ok"]:
+                self.errors[f"schema:{db_path}"] = check["error"]
+        self._timed("schema", started)
+        return not any(name.startswith("schema:") for name in self.errors)
+
+    def _preload_one(self, name: str, loader: Callable[[], Any]) -> None:
+        started = time.perf_counter()
+        try:
+            result = loader()
+            with self._lock:
+                self.results[name] = result
+        except Exception as e:
+            with self._lock:
+                self.errors[name] = f"{type(e).__name__}: {e}"
+            log = self.log.warning if name in self.optional else self.log.error
+            log("Preload %s failed: %s", name, e)
+        finally:
+            self._timed(f"preload.{name}", started)
+
+    def preload_all(self) -> bool:
+        started = time.perf_counter()
+        if self.preload:
+            with ThreadPoolExecutor(
+                max_workers=self.workers or len(self.preload), thread_name_prefix="preload"
+            ) as pool:
+                for name, loader in self.preload.items():
+                    pool.submit(self._preload_one, name, loader)
+        self._timed("preload", started)
+        return not any(name in self.errors for name in self.preload if name not in self.optional)
+
+    def run(self) -> "ServiceStartup":
+        """Runs all phases and returns self; `ready` tells whether the service can serve."""
+        started = time.perf_counter()
+        try:
+            ok = self.check_schema() and self.preload_all()
+            self.state = READY if ok else FAILED
+        except Exception as e:
+            self.errors["startup"] = f"{type(e).__name__}: {e}"
+            self.state = FAILED
+        finally:
+            self._timed("total", started)
+            self._done.set()
+        breakdown = ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in self.timings.items())
+        if self.ready:
+            self.log.info("Service ready: %s", breakdown)
+        else:
+            self.log.error("Service startup failed (%s): %s", breakdown, self.errors)
+        return self
+
+    def start(self) -> "ServiceStartup":
+        """Runs the phases in a daemon thread and returns immediately."""
+        threading.Thread(target=self.run, name="startup", daemon=True).start()
+        return self
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness, state, per-phase timings (ms), DB checks and errors; JSON-serializable."""
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "state": self.state,
+                "timings_ms": {phase: round(seconds * 1000, 3) for phase, seconds in self.timings.items()},
+                "checks": dict(self.checks),
+                "errors": dict(self.errors),
+            }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the master DBs and preload service structures.")
+    parser.add_argument("--preload", default=DEFAULT_PRELOAD, help=f"comma-separated, from: {', '.join(PRELOADERS)}")
+    parser.add_argument("--db", action="append", default=None, help="master DB to check (repeatable; default: both)")
+    parser.add_argument("--json", action="store_true", help="print the status as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    databases: Optional[Dict[str, List[str]]] = {path: [] for path in args.db} if args.db else None
+    startup = ServiceStartup(preloaders(args.preload), databases).run()
+    if args.json:
+        print(json.dumps(startup.status(), indent=2))
+    sys.exit(0 if startup.ready else 1)
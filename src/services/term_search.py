@@ -0,0 +1,94 @@
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.database.fts import FTS_TABLE
+from src.database.search_keys import SEARCH_KEY_TABLE
+from src.utils.normalize import search_key
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MIN_PREFIX_LENGTH = 3  # shorter trailing words match exactly; "a*" would expand to most of the vocabulary
+
+
+def to_fts_query(text: str) -> Optional[str]:
+    """
+    Turns free text into an FTS5 MATCH expression: every word must match,
+    the last one as a prefix (if at least MIN_PREFIX_LENGTH characters) so
+    results appear while the user is typing.
+    Returns None if the text has no searchable words.
+    """
+    tokens = _TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    quoted = [f'"{t}"' for t in tokens]
+    if len(tokens[-1]) >= MIN_PREFIX_LENGTH:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_terms(
+    conn: sqlite3.Connection,
+    query: str,
+    limit: int = 50,
+    sources: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    BM25-ranked full-text search over every indexed terminology table.
+    Each hit carries its source table, code, matched fields, score (lower is
+    better, as returned by SQLite's bm25) and a highlighted snippet.
+
+    Ordering by FTS5's `rank` column (configured as weighted bm25 by
+    rebuild_fts) lets FTS5 sort internally, so snippets are only built for
+    the rows actually returned.
+    """
+    match = to_fts_query(query)
+    if match is None:
+        return []
+    sql = f"""
+        SELECT source, code, term, term_alt, english_term,
+               rank AS score,
+               snippet({FTS_TABLE}, -1, '<b>', '</b>', '…', 12) AS snippet
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH ?
+    """
+    params: List[Any] = [match]
+    if sources:
+        sources = list(sources)
+        sql += f" AND source IN ({', '.join('?' for _ in sources)})"
+        params.extend(sources)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+    columns = ("source", "code", "term", "term_alt", "english_term", "score", "snippet")
+    return [dict(zip(columns, row)) for row in conn.execute(sql, params)]
+
+
+def find_by_search_key(
+    conn: sqlite3.Connection,
+    text: str,
+    prefix: bool = False,
+    limit: int = 50,
+    sources: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Resolves any spelling of a term (plain ASCII, IAST with diacritics,
+    ITRANS or Devanagari) through its folded search key: an exact match, or
+    with `prefix=True` every key starting with it. Both are a single range
+    seek on the term_search_keys primary key.
+    """
+    key = search_key(text)
+    if not key:
+        return []
+    if prefix:
+        sql = f"SELECT search_key, source, code, term FROM {SEARCH_KEY_TABLE} WHERE search_key >= ? AND search_key < ?"
+        params: List[Any] = [key, key + "\U0010ffff"]
+    else:
+        sql = f"SELECT search_key, source, code, term FROM {SEARCH_KEY_TABLE} WHERE search_key = ?"
+        params = [key]
+    if sources:
+        sources = list(sources)
+        sql += f" AND source IN ({', '.join('?' for _ in sources)})"
+        params.extend(sources)
+    sql += " ORDER BY search_key LIMIT ?"
+    params.append(limit)
+    columns = ("search_key", "source", "code", "term")
+    return [dict(zip(columns, row)) for row in conn.execute(sql, params)]
@@ -0,0 +1,304 @@
+import argparse
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.database.fts import existing_sources
+from src.schema.table_schema import TableSchemas
+
+FIELDS = ("source", "code", "term", "english_term", "description")
+MAGIC = b"AYTS"
+VERSION = 2
+# magic, version, records, strings, slots, pool bytes, digest of the source DBs (see sources_digest)
+_HEADER = struct.Struct("<4sIIIIQ32s")
+_EMPTY = 0xFFFFFFFF
+_NO_SOURCES = bytes(32)
+
+
+def _code_hash(code: bytes) -> int:
+    """Stable across processes (unlike hash()), so the slot table can live in a shared snapshot."""
+    return zlib.crc32(code)
+
+
+def sources_digest(db_paths: Iterable[str | Path]) -> bytes:
+    """
+    SHA-256 over what each master DB was built from: its schema version
+    (user_version) and source manifest (path, content hash, row count per
+    file). DBs without a manifest fall back to file size and mtime; a
+    missing DB counts as missing. Any rebuild that changed a source changes it.
+    """
+    digest = hashlib.sha256()
+    for db_path in db_paths:
+        digest.update(str(Path(db_path).resolve()).encode("utf-8") + b"\0")
+        if not os.path.exists(db_path):
+            digest.update(b"missing\0")
+            continue
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            (version,) = conn.execute("PRAGMA user_version").fetchone()
+            digest.update(f"v{version}\0".encode())
+            if conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'source_manifest'"
+            ).fetchone():
+                rows = conn.execute("SELECT path, content_hash, row_count FROM source_manifest ORDER BY path")
+                for row in rows:
+                    digest.update("\t".join(map(str, row)).encode("utf-8") + b"\n")
+            else:
+                stat = os.stat(db_path)
+                digest.update(f"{stat.st_size}:{stat.st_mtime_ns}\0".encode())
+        finally:
+            conn.close()
+    return digest.digest()
+
+
+def _pack(rows: Iterable[Sequence[Optional[str]]], sources: bytes = _NO_SOURCES) -> bytes:
+    """
+    Serializes rows of FIELDS into the snapshot layout:
+    header | string offsets (u32) | records (u32 string ids) | code slots (u32) | string pool (UTF-8)
+    Identical strings are stored once. `sources` is the sources_digest() of
+    the DBs the rows came from.
+    """
+    strings: Dict[str, int] = {}
+    pool = bytearray()
+    offsets = array("I", [0])
+    records = array("I")
+    codes: List[bytes] = []
+    for row in rows:
+        row = ["" if value is None else str(value) for value in row]
+        for value in row:
+            string_id = strings.get(value)
+            if string_id is None:
+                string_id = strings[value] = len(offsets) - 1
+                pool += value.encode("utf-8")
+                offsets.append(len(pool))
+            records.append(string_id)
+        codes.append(row[1].encode("utf-8"))
+
+    count = len(codes)
+    slot_count = 1
+    while slot_count < 2 * count:
+        slot_count *= 2
+    slots = array("I", [_EMPTY]) * slot_count
+    for row_id, code in enumerate(codes):
+        slot = _code_hash(code) & (slot_count - 1)
+        while slots[slot] != _EMPTY:
+            slot = (slot + 1) & (slot_count - 1)
+        slots[slot] = row_id
+
+    header = _HEADER.pack(MAGIC, VERSION, count, len(offsets) - 1, slot_count, len(pool), sources)
+    return b"".join([header, offsets.tobytes(), records.tobytes(), slots.tobytes(), bytes(pool)])
+
+
+class TerminologyStore:
+    """
+    Immutable, compact in-memory copy of every terminology row
+    (source, code, term, english_term, description) for hot lookups.
+
+    - Columnar layout: each record is five u32 ids into one interned UTF-8
+      string pool, so repeated strings (sources, shared descriptions) are
+      stored once and there is no per-row Python object.
+    - A code → record open-addressing hash table (CRC32, linear probing)
+      is part of the same buffer.
+    - The buffer is either built in memory (`from_db`) or memory-mapped from
+      a snapshot file (`save` / `open`); mapped snapshots are shared page by
+      page between worker processes instead of each holding its own copy.
+    - A store built from master DBs carries their sources_digest(), so a
+      snapshot can be checked against the DBs (`is_current`) before use.
+    - Lookups decode only the strings they return; instances are read-only
+      and safe to share between threads.
+    """
+
+    def __init__(self, buffer: Any) -> None:
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError("Not a terminology store snapshot (truncated header)")
+        magic, version, self.count, strings, slots, pool_bytes, self.sources = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a terminology store snapshot (magic={magic!r}, version={version})")
+        pos = _HEADER.size
+        self._offsets = view[pos:pos + 4 * (strings + 1)].cast("I")
+        pos += 4 * (strings + 1)
+        self._records = view[pos:pos + 4 * len(FIELDS) * self.count].cast("I")
+        pos += 4 * len(FIELDS) * self.count
+        self._slots = view[pos:pos + 4 * slots].cast("I")
+        self._mask = slots - 1
+        pos += 4 * slots
+        self._pool = view[pos:pos + pool_bytes]
+        self.string_count = strings
+        self.nbytes = pos + pool_bytes
+
+    # --- construction ---
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Optional[str]]]) -> "TerminologyStore":
+        return cls(_pack(rows))
+
+    @classmethod
+    def from_db(cls, db_paths: Iterable[str | Path]) -> "TerminologyStore":
+        """
+        Loads every terminology table (TableSchemas.FTS_SOURCES) of each master
+        DB in `db_paths`; missing DBs are skipped with a warning.
+        """
+        db_paths = list(db_paths)
+        # Digest first: if a DB changes while it is read, the store just looks stale next time
+        sources = sources_digest(db_paths)
+        return cls(_pack(_db_rows(db_paths), sources))
+
+    @classmethod
+    def open(cls, path: str | Path) -> "TerminologyStore":
+        """Memory-maps a snapshot written by save()."""
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def save(self, path: str | Path) -> Path:
+        """Writes the snapshot atomically (temp file + rename), so readers never map a partial file."""
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(memoryview(self._buffer)[: self.nbytes])
+        os.replace(tmp, path)
+        return path
+
+    def is_current(self, db_paths: Iterable[str | Path]) -> bool:
+        """Whether the master DBs are still the ones this store was built from."""
+        return self.sources != _NO_SOURCES and self.sources == sources_digest(db_paths)
+
+    # --- lookups ---
+
+    def _string(self, string_id: int) -> str:
+        return str(self._pool[self._offsets[string_id]:self._offsets[string_id + 1]], "utf-8")
+
+    def _record(self, row_id: int) -> Dict[str, str]:
+        base = row_id * len(FIELDS)
+        return {field: self._string(self._records[base + i]) for i, field in enumerate(FIELDS)}
+
+    def _rows_for(self, code: str) -> Iterator[int]:
+        encoded = code.encode("utf-8")
+        slot = _code_hash(encoded) & self._mask
+        code_field = FIELDS.index("code")
+        while True:
+            row_id = self._slots[slot]
+            if row_id == _EMPTY:
+                return
+            string_id = self._records[row_id * len(FIELDS) + code_field]
+            if self._pool[self._offsets[string_id]:self._offsets[string_id + 1]] == encoded:
+                yield row_id
+            slot = (slot + 1) & self._mask
+
+    def lookup(self, code: str, source: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """The record for `code` (in `source`, if given), or None."""
+        for row_id in self._rows_for(code):
+            if source is None:
+                return self._record(row_id)
+            record = self._record(row_id)
+            if record["source"] == source:
+                return record
+        return None
+
+    def lookup_all(self, code: str) -> List[Dict[str, str]]:
+        """Every record with this code, across sources."""
+        return [self._record(row_id) for row_id in self._rows_for(code)]
+
+    def description(self, code: str, source: Optional[str] = None) -> Optional[str]:
+        record = self.lookup(code, source)
+        return record["description"] if record else None
+
+    def records(self) -> Iterator[Dict[str, str]]:
+        for row_id in range(self.count):
+            yield self._record(row_id)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def stats(self) -> Dict[str, int]:
+        return {"records": self.count, "strings": self.string_count, "bytes": self.nbytes}
+
+
+def _db_rows(db_paths: Iterable[str | Path]) -> Iterator[Tuple[str, ...]]:
+    for db_path in db_paths:
+        if not os.path.exists(db_path):
+            logging.getLogger("TerminologyStore").warning("Master DB not found, not loaded: %s", db_path)
+            continue
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            for source in existing_sources(conn):
+                mapping = TableSchemas.FTS_SOURCES[source]
+                yield from conn.execute(
+                    f"""
+                    SELECT ?, {mapping["code"]}, {mapping["term"]}, {mapping["english_term"]}, {mapping["description"]}
+                    FROM {source} WHERE {mapping["code"]} IS NOT NULL
+                    """,
+                    (source,),
+                )
+        finally:
+            conn.close()
+
+
+_term_store: Optional[TerminologyStore] = None
+_term_store_lock = threading.Lock()
+
+
+def _open_snapshot(snapshot: str, db_paths: List[str]) -> Optional[TerminologyStore]:
+    """The mapped snapshot if it matches `db_paths`, else None (logged)."""
+    log = logging.getLogger("TerminologyStore")
+    try:
+        store = TerminologyStore.open(snapshot)
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring term store snapshot %s: %s", snapshot, e)
+        return None
+    if not store.is_current(db_paths):
+        log.warning(
+            "Term store snapshot %s is stale (master DBs rebuilt); loading from the DBs. "
+            "Rewrite it with: python -m src.services.term_store", snapshot,
+        )
+        return None
+    return store
+
+
+def get_term_store() -> TerminologyStore:
+    """
+    Process-wide store. Maps TERM_STORE_SNAPSHOT if that file exists and was
+    written from the current master DBs (shared between workers), otherwise
+    loads the master DBs into process memory.
+    """
+    global _term_store
+    if _term_store is None:
+        with _term_store_lock:
+            if _term_store is None:
+                from src.services.fuzzy_index import default_db_paths
+                db_paths = default_db_paths()
+                snapshot = os.getenv("TERM_STORE_SNAPSHOT")
+                store = _open_snapshot(snapshot, db_paths) if snapshot and os.path.exists(snapshot) else None
+                _term_store = store or TerminologyStore.from_db(db_paths)
+    return _term_store
+
+
+if __name__ == "__main__":
+    from src.services.fuzzy_index import default_db_paths
+
+    parser = argparse.ArgumentParser(description="Write the memory-mapped term store snapshot from the master DBs.")
+    parser.add_argument("--snapshot", default=os.getenv("TERM_STORE_SNAPSHOT"), help="output file (default: TERM_STORE_SNAPSHOT)")
+    parser.add_argument("--db", action="append", default=None, help="master DB to load (repeatable; default: both)")
+    parser.add_argument("--check", action="store_true", help="only report whether the snapshot is current")
+    args = parser.parse_args()
+    if not args.snapshot:
+        parser.error("no --snapshot given and TERM_STORE_SNAPSHOT is not set")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    db_paths = args.db or default_db_paths()
+    if args.check:
+        current = os.path.exists(args.snapshot) and _open_snapshot(args.snapshot, db_paths) is not None
+        print(f"{args.snapshot}: {'current' if current else 'stale or missing'}")
+        raise SystemExit(0 if current else 1)
+    store = TerminologyStore.from_db(db_paths)
+    store.save(args.snapshot)
+    print(f"{args.snapshot}: {store.stats()}")
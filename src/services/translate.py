@@ -0,0 +1,347 @@
+"""
+FHIR `ConceptMap/$translate` served from the precomputed NAMASTE ↔ ICD-11
+mappings (`namaste_icd_map`, see src/utils/build_icd_mapping_db.py and
+src/utils/score_icd_mapping.py).
+
+    python -m src.services.translate --db data/namaste_master.db --port 8090
+    GET  /ConceptMap/$translate?system=<namaste CodeSystem>&code=SR11
+    GET  /ConceptMap/$translate?system=http://id.who.int/icd/release/11/mms&code=MG26&reverse=true
+    POST /  (FHIR batch Bundle of $translate requests)
+    GET  /ready  (startup status, 503 until ready; see src/services/startup.py)
+    GET  /metrics  (Prometheus text; see src/utils/metrics.py)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.api.icd_search import ICD_RELEASE
+from src.utils import metrics
+from src.utils.export_terminology import FHIR_BASE, ICD_SYSTEM, MAPPING_COLUMNS, mapping_records
+
+CONCEPTMAP_URL = f"{FHIR_BASE}/ConceptMap/namaste-to-icd11"
+ICD_SYSTEM_PREFIX = "http://id.who.int/icd/release/11/"
+RESPONSE_CACHE_SIZE = int(os.getenv("TRANSLATE_CACHE_SIZE", 65536))
+FHIR_JSON = "application/fhir+json"
+HTTP_RESPONSES = metrics.counter("translate_http_responses_total", "$translate server responses by status", ("status",))
+
+# Equivalence read from the target's side when translating ICD → NAMASTE
+REVERSED_EQUIVALENCE = {
+    "wider": "narrower", "narrower": "wider", "subsumes": "specializes", "specializes": "subsumes",
+}
+
+# (code, display, equivalence, confidence) per match, best first
+Match = Tuple[str, Optional[str], str, Optional[float]]
+
+
+def namaste_system_uri(system: str) -> str:
+    return f"{FHIR_BASE}/CodeSystem/namaste-{system}"
+
+
+def _outcome(status: int, message: str) -> Tuple[int, Dict[str, str], bytes]:
+    body = {
+        "resourceType": "OperationOutcome",
+        "issue": [{"severity": "error", "code": "invalid" if status == 400 else "processing", "diagnostics": message}],
+    }
+    return status, {"Content-Type": FHIR_JSON}, json.dumps(body).encode("utf-8")
+
+
+class MappingIndex:
+    """
+    Every mapping of one ICD release, held in two dicts:
+    (system, NAMASTE code) → ICD matches and ICD code → NAMASTE matches.
+    """
+
+    def __init__(self, rows: List[Tuple], release: Optional[str] = None) -> None:
+        self.release = release
+        forward: Dict[Tuple[str, str], List[Match]] = {}
+        reverse: Dict[str, List[Tuple[str, Match]]] = {}
+        for row in rows:
+            r = dict(zip(MAPPING_COLUMNS, row))
+            if not r["icd_code"] or r["equivalence"] == "unmatched":
+                continue
+            equivalence = r["equivalence"] or "relatedto"
+            forward.setdefault((r["system"], r["namaste_code"]), []).append(
+                (r["icd_code"], r["icd_title"], equivalence, r["confidence"])
+            )
+            reverse.setdefault(r["icd_code"], []).append((
+                r["system"],
+                (r["namaste_code"], r["namaste_display"],
+                 REVERSED_EQUIVALENCE.get(equivalence, equivalence), r["confidence"]),
+            ))
+        self.forward = {key: tuple(matches) for key, matches in forward.items()}
+        # Reverse matches from every system, most confident first
+        self.reverse = {
+            code: tuple(sorted(matches, key=lambda m: -(m[1][3] or 0.0))) for code, matches in reverse.items()
+        }
+        self.systems = sorted({system for system, _ in self.forward})
+
+    @classmethod
+    def from_db(cls, db_path: str, release: Optional[str] = ICD_RELEASE) -> "MappingIndex":
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            return cls(list(mapping_records(conn, release)), release)
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "namaste_codes": len(self.forward),
+            "icd_codes": len(self.reverse),
+            "mappings": sum(len(m) for m in self.forward.values()),
+        }
+
+
+class TranslateService:
+    """
+    `$translate` over a MappingIndex.
+
+    - Forward (NAMASTE → ICD-11): `system` is a NAMASTE CodeSystem URL (see
+      export_terminology.py) or a bare system name; without it every system is tried.
+    - Reverse (`reverse=true`, ICD-11 → NAMASTE): `code` is an ICD-11 code,
+      `target` optionally restricts the NAMASTE system; wider/narrower are flipped.
+    - Each distinct request is serialized once; the bytes and a strong ETag
+      (hash of the body) are kept in an LRU of `cache_size` entries, and a
+      matching If-None-Match gets 304 with no body.
+    - `bundle()` answers a FHIR batch Bundle of $translate requests.
+    """
+
+    def __init__(self, index: MappingIndex, cache_size: int = RESPONSE_CACHE_SIZE) -> None:
+        self.index = index
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Tuple[int, str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # --- parameters ---
+
+    @staticmethod
+    def _namaste_system(value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        prefix = f"{FHIR_BASE}/CodeSystem/namaste-"
+        return value[len(prefix):] if value.startswith(prefix) else value
+
+    def _key(self, params: Mapping[str, Any]) -> Tuple:
+        code = (params.get("code") or "").strip()
+        reverse = str(params.get("reverse", "false")).lower() == "true"
+        if reverse:
+            target = self._namaste_system(params.get("target") or params.get("targetsystem"))
+            return (True, None, code, target)
+        system = params.get("system")
+        if system and system.startswith(ICD_SYSTEM_PREFIX):
+            raise ValueError("system is ICD-11; use reverse=true to translate ICD-11 codes to NAMASTE")
+        return (False, self._namaste_system(system), code, None)
+
+    # --- responses ---
+
+    def translate(
+        self, params: Mapping[str, Any], if_none_match: Optional[str] = None
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """(status, headers, body) for one $translate call; `params` are its query/Parameters values."""
+        try:
+            key = self._key(params)
+        except ValueError as e:
+            return _outcome(400, str(e))
+        if not key[2]:
+            return _outcome(400, "code is required")
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        if cached is None:
+            cached = self._render(key)
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = cached
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        status, etag, body = cached
+        headers = {"Content-Type": FHIR_JSON, "ETag": etag, "Cache-Control": "public, max-age=3600"}
+        if if_none_match and etag in (t.strip() for t in if_none_match.split(",")):
+            return 304, headers, b""
+        return status, headers, body
+
+    def _render(self, key: Tuple) -> Tuple[int, str, bytes]:
+        reverse, system, code, target = key
+        if reverse:
+            matches = [
+                (namaste_system_uri(s), match) for s, match in self.index.reverse.get(code, ())
+                if target is None or s == target
+            ]
+        else:
+            systems = [system] if system else self.index.systems
+            target_uri = ICD_SYSTEM.format(release=self.index.release or ICD_RELEASE)
+            matches = [(target_uri, m) for s in systems for m in self.index.forward.get((s, code), ())]
+
+        parameters: List[Dict[str, Any]] = [{"name": "result", "valueBoolean": bool(matches)}]
+        if not matches:
+            parameters.append({"name": "message", "valueString": f"No mapping found for code {code}"})
+        for system_uri, (match_code, display, equivalence, confidence) in matches:
+            coding = {"system": system_uri, "code": match_code}
+            if display:
+                coding["display"] = display
+            part = [
+                {"name": "equivalence", "valueCode": equivalence},
+                {"name": "concept", "valueCoding": coding},
+                {"name": "source", "valueUri": CONCEPTMAP_URL},
+            ]
+            if confidence is not None:
+                part.append({"name": "confidence", "valueDecimal": round(confidence, 4)})
+            parameters.append({"name": "match", "part": part})
+
+        body = json.dumps({"resourceType": "Parameters", "parameter": parameters}, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        return 200, etag, body
+
+    def bundle(self, bundle: Mapping[str, Any]) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        FHIR batch Bundle: each entry is a GET `ConceptMap/$translate?...` request,
+        or a POST whose resource is a Parameters with the same inputs.
+        """
+        if bundle.get("resourceType") != "Bundle" or bundle.get("type") != "batch":
+            return _outcome(400, "expected a Bundle of type batch")
+        parts: List[bytes] = []
+        for entry in bundle.get("entry") or []:
+            request = entry.get("request") or {}
+            url = urlparse(request.get("url") or "")
+            if not url.path.rstrip("/").endswith("$translate"):
+                status, headers, body = _outcome(400, f"unsupported request url {request.get('url')!r}")
+            elif (request.get("method") or "GET").upper() == "POST":
+                status, headers, body = self.translate(parameters_to_dict(entry.get("resource") or {}))
+            else:
+                status, headers, body = self.translate({k: v[-1] for k, v in parse_qs(url.query).items()})
+            response = {"status": str(status)}
+            if "ETag" in headers:
+                response["etag"] = headers["ETag"]
+            # Cached resource bytes are spliced in as-is instead of being parsed and re-encoded
+            parts.append(b'{"resource":' + body + b',"response":' + json.dumps(response).encode("utf-8") + b"}")
+        body = b'{"resourceType":"Bundle","type":"batch-response","entry":[' + b",".join(parts) + b"]}"
+        return 200, {"Content-Type": FHIR_JSON}, body
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.index.stats(), "cached_responses": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+def parameters_to_dict(resource: Mapping[str, Any]) -> Dict[str, Any]:
+    """Flattens a FHIR Parameters resource into $translate inputs (a `coding` sets system and code)."""
+    params: Dict[str, Any] = {}
+    for parameter in resource.get("parameter") or []:
+        name = parameter.get("name")
+        if name == "coding" and isinstance(parameter.get("valueCoding"), dict):
+            params.setdefault("system", parameter["valueCoding"].get("system"))
+            params.setdefault("code", parameter["valueCoding"].get("code"))
+            continue
+        for field, value in parameter.items():
+            if field.startswith("value"):
+                params[name] = value if not isinstance(value, bool) else str(value).lower()
+    return params
+
+
+def make_server(
+    service: TranslateService, host: str = "127.0.0.1", port: int = 8090, startup: Optional[Any] = None
+) -> ThreadingHTTPServer:
+    """
+    Threaded HTTP server for the $translate endpoints (call serve_forever() on it).
+    With a ServiceStartup, `GET /ready` returns its status (200 ready, 503 otherwise).
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 64 * 1024
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, headers: Dict[str, str], body: bytes) -> None:
+            HTTP_RESPONSES.labels(status).inc()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/metrics":
+                body = metrics.render().encode("utf-8")
+                return self._send(200, {"Content-Type": "text/plain; version=0.0.4"}, body)
+            if url.path == "/ready" and startup is not None:
+                body = json.dumps(startup.status()).encode("utf-8")
+                return self._send(200 if startup.ready else 503, {"Content-Type": "application/json"}, body)
+            if not url.path.rstrip("/").endswith("ConceptMap/$translate"):
+                return self._send(*_outcome(404, f"unknown path {url.path}"))
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            self._send(*service.translate(params, self.headers.get("If-None-Match")))
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            except ValueError as e:
+                return self._send(*_outcome(400, f"invalid JSON: {e}"))
+            if url.path.rstrip("/").endswith("ConceptMap/$translate"):
+                return self._send(*service.translate(parameters_to_dict(payload), self.headers.get("If-None-Match")))
+            if url.path in ("", "/"):
+                return self._send(*service.bundle(payload))
+            self._send(*_outcome(404, f"unknown path {url.path}"))
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256
+
+    return Server((host, port), Handler)
+
+
+_translate_service: Optional[TranslateService] = None
+_translate_service_lock = threading.Lock()
+
+
+def get_translate_service(db_path: Optional[str] = None) -> TranslateService:
+    """Process-wide service over the NAMASTE master DB (NAMASTE_MASTER_DB, or `db_path`)."""
+    global _translate_service
+    with _translate_service_lock:
+        if _translate_service is None:
+            from src.utils.build_namaste_master_db import DB_PATH
+            index = MappingIndex.from_db(db_path or os.getenv("NAMASTE_MASTER_DB", DB_PATH))
+            _translate_service = TranslateService(index)
+    return _translate_service
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve FHIR ConceptMap/$translate from namaste_icd_map.")
+    parser.add_argument("--db", default=None, help="NAMASTE master DB path")
+    parser.add_argument("--release", default=ICD_RELEASE)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    args = parser.parse_args()
+
+    from src.services.startup import ServiceStartup
+    from src.utils.build_namaste_master_db import DB_PATH
+    db_path = args.db or os.getenv("NAMASTE_MASTER_DB", DB_PATH)
+    startup = ServiceStartup(
+        {"translate": lambda: TranslateService(MappingIndex.from_db(db_path, args.release))},
+        databases={db_path: ("namaste_icd_map",)},
+    ).run()
+    if not startup.ready:
+        print(json.dumps(startup.status()), file=sys.stderr)
+        sys.exit(1)
+    service = startup.results["translate"]
+    print(json.dumps({**service.stats(), "startup_ms": startup.status()["timings_ms"]}))
+    make_server(service, args.host, args.port, startup).serve_forever()
@@ -1,11 +1,13 @@
 
 # WHO TERMINOLOGIES MASTER DATABASE CONFIGURATION
-WHO_TERMINOLOGIES_MASTER_DB="./data/who_terminology_master.db"
+WHO_TERMINOLOGIES_MASTER_DB="./data/master.db"
 WHO_TERMINOLOGIES_JSON_FOLDER="./data/who_terminologies/json"
 
 # National AYUSH Morbidity and Standardized Terminologies Electronic Codes
 
 NATIONAL_AYUSH_MORBIDITY="./data/national_ayush_morbidity.db"
+NAMASTE_MASTER_DB="./data/namaste_master.db"
 NAMC_AYURVEDA="./data/namaste_codes/ayurveda.xls"
 NAMC_UNANI="./data/namaste_codes/unani.xls"
-NAMC_SIDDHA="./data/namaste_codes/siddha.xls"
\ No newline at end of file
+NAMC_SIDDHA="./data/namaste_codes/siddha.xls"
+NAMASTE_TERMS_CSV="./data/namaste_codes/IAST_Sanskrit_Matching.csv"
\ No newline at end of file
@@ -0,0 +1,237 @@
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.api import icd_search
+from src.api.rate_limit import TokenBucket
+from src.database import get_sqlite_pool
+from src.database.migrations import migrate_icd_mapping_tables
+from src.schema.table_schema import TableSchemas
+from src.utils import metrics
+from src.utils.build_namaste_master_db import DB_PATH as NAMASTE_DB_PATH, NAMASTE_CODES
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_LOOKUP_QUERY = metrics.DB_QUERY_SECONDS.labels("lookup_mapping")
+MAPPED_CODES = metrics.counter("icd_mapping_codes_total", "NAMASTE codes processed by the ICD mapping builder", ("result",))
+
+
+class ICDMappingBuilder:
+    """
+    Precomputes NAMASTE → ICD-11 mappings into the `namaste_icd_map` table.
+
+    - Walks every code in the `namaste_<system>` tables of the NAMASTE master DB.
+    - Searches ICD-11 for each description with bounded concurrency and a
+      token-bucket rate limit, keeping the top-k matches with their scores.
+    - Resumable: codes already recorded in `namaste_icd_map_progress` for the
+      same ICD release and method are skipped. Rows are keyed by `method`
+      (`icd_api`, or `icd_local` with ICD_LOCAL_SNAPSHOT), so other methods'
+      rows (similarity scores, src/utils/score_icd_mapping.py) are untouched.
+    - Serving a mapping is then a primary-key range lookup on
+      (system, namaste_code, icd_release), see lookup_mapping().
+    """
+
+    TABLE_SCHEMAS: Dict[str, str] = TableSchemas.ICD_MAPPING_SCHEMAS
+
+    def __init__(
+        self,
+        db_path: Optional[str | Path] = None,
+        release: str = icd_search.ICD_RELEASE,
+        top_k: int = 5,
+        concurrency: int = 8,
+        rate: float = 10.0,
+        commit_every: int = 100,
+        report_every: int = 100,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.db_path = Path(db_path or NAMASTE_DB_PATH).resolve()
+        self.release = release
+        self.top_k = top_k
+        self.concurrency = concurrency
+        self.limiter = TokenBucket(rate, burst=concurrency)
+        self.commit_every = commit_every
+        self.report_every = report_every
+        self.method = "icd_local" if icd_search.LOCAL_SNAPSHOT else "icd_api"
+
+        self.log = logger or logging.getLogger(self.__class__.__name__)
+        if not logger:
+            logging.basicConfig(
+                level=logging.INFO,
+                format="%(asctime)s %(levelname)s [%(name)s]: %(message)s",
+            )
+
+    def _ensure_tables(self, conn: sqlite3.Connection) -> None:
+        for change in migrate_icd_mapping_tables(conn):
+            self.log.info("Migrated %s", change)
+
+    def pending_codes(
+        self, conn: sqlite3.Connection, systems: Iterable[str]
+    ) -> List[Tuple[str, str, str]]:
+        """(system, code, query) for every NAMASTE code not yet mapped for this release and method."""
+        pending = []
+        for system in systems:
+            table = f"namaste_{system}"
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if not exists:
+                self.log.warning("Skipping %s: table %s not found in %s", system, table, self.db_path)
+                continue
+            rows = conn.execute(
+                f"""
+                SELECT t.code, COALESCE(NULLIF(t.description, ''), t.english_term)
+                FROM {table} t
+                LEFT JOIN namaste_icd_map_progress p
+                    ON p.system = ? AND p.namaste_code = t.code AND p.icd_release = ? AND p.method = ?
+                WHERE p.namaste_code IS NULL
+                ORDER BY t.code
+                """,
+                (system, self.release, self.method),
+            )
+            pending.extend((system, code, query) for code, query in rows if query)
+        return pending
+
+    def _search(self, query: str) -> List[Dict[str, Any]]:
+        self.limiter.acquire()
+        matches = icd_search.shape_results(icd_search.cached_search_icd(query))
+        return matches[: self.top_k]
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        system: str,
+        code: str,
+        matches: List[Dict[str, Any]],
+    ) -> None:
+        conn.execute(
+            "DELETE FROM namaste_icd_map WHERE system = ? AND namaste_code = ? AND icd_release = ? AND method = ?",
+            (system, code, self.release, self.method),
+        )
+        conn.executemany(
+            """
+            INSERT INTO namaste_icd_map
+                (system, namaste_code, icd_release, rank, icd_code, icd_title, icd_uri, score, method)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    system, code, self.release, rank,
+                    m["icd_code"], _TAG_RE.sub("", m["title"] or ""), m["uri"], m["score"], self.method,
+                )
+                for rank, m in enumerate(matches, start=1)
+            ],
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO namaste_icd_map_progress
+                (system, namaste_code, icd_release, method, match_count, mapped_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (system, code, self.release, self.method, len(matches), datetime.now(timezone.utc).isoformat()),
+        )
+
+    def _report(self, done: int, total: int, failed: int, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed else 0.0
+        eta = (total - done) / rate if rate else 0.0
+        self.log.info(
+            "Mapped %d/%d codes (%d failed) at %.1f codes/s, ETA %.0fs",
+            done, total, failed, rate, eta,
+        )
+
+    def build(self, systems: Optional[Iterable[str]] = None) -> Path:
+        """Maps every pending NAMASTE code and returns the DB path."""
+        systems = list(systems or NAMASTE_CODES)
+        with get_sqlite_pool(str(self.db_path)).writer() as conn:
+            self._ensure_tables(conn)
+            pending = self.pending_codes(conn, systems)
+            total = len(pending)
+            self.log.info("%d codes to map for ICD release %s", total, self.release)
+
+            done = failed = 0
+            start = time.perf_counter()
+            work = iter(pending)
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                # Keep at most 2x concurrency searches queued so memory stays flat
+                in_flight = {}
+                for system, code, query in work:
+                    in_flight[pool.submit(self._search, query)] = (system, code)
+                    if len(in_flight) >= 2 * self.concurrency:
+                        break
+                while in_flight:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        system, code = in_flight.pop(future)
+                        try:
+                            matches = future.result()
+                            self._write(conn, system, code, matches)
+                            MAPPED_CODES.labels("mapped").inc()
+                            metrics.BUILD_ROWS.labels("icd_mapping", "namaste_icd_map").inc(len(matches))
+                        except Exception as e:
+                            failed += 1
+                            MAPPED_CODES.labels("failed").inc()
+                            self.log.error(
+                                "Mapping %s/%s failed: %s", system, code, e,
+                                extra={"system": system, "namaste_code": code, "error": type(e).__name__},
+                            )
+                        done += 1
+                        if done % self.commit_every == 0:
+                            conn.commit()
+                        if done % self.report_every == 0:
+                            self._report(done, total, failed, start)
+                        nxt = next(work, None)
+                        if nxt is not None:
+                            in_flight[pool.submit(self._search, nxt[2])] = (nxt[0], nxt[1])
+            conn.commit()
+            self._report(done, total, failed, start)
+            metrics.BUILD_SECONDS.labels("icd_mapping", "total").observe(time.perf_counter() - start)
+
+        self.log.info("ICD mapping table updated at: %s", self.db_path)
+        return self.db_path
+
+
+def lookup_mapping(
+    conn: sqlite3.Connection,
+    system: str,
+    code: str,
+    release: str = icd_search.ICD_RELEASE,
+    method: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Precomputed matches for one NAMASTE code, best first: those of `method`,
+    or of the first method in TableSchemas.ICD_MAPPING_METHODS that mapped it.
+    """
+    with metrics.span(_LOOKUP_QUERY):
+        rows = conn.execute(
+            """
+            SELECT method, icd_code, icd_title, icd_uri, score, confidence, equivalence FROM namaste_icd_map
+            WHERE system = ? AND namaste_code = ? AND icd_release = ?
+            ORDER BY method, rank
+            """,
+            (system, code, release),
+        ).fetchall()
+    if method is None and rows:
+        method = min({row[0] for row in rows}, key=TableSchemas.method_preference)
+    columns = ("icd_code", "title", "uri", "score", "confidence", "equivalence")
+    return [dict(zip(columns, row[1:])) for row in rows if row[0] == method]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute NAMASTE → ICD-11 mappings.")
+    parser.add_argument("--db", default=os.getenv("NAMASTE_MASTER_DB"), help="NAMASTE master DB path")
+    parser.add_argument("--systems", nargs="+", choices=list(NAMASTE_CODES), help="systems to map")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=10.0, help="max ICD searches per second (0 = unlimited)")
+    args = parser.parse_args()
+
+    builder = ICDMappingBuilder(
+        db_path=args.db, top_k=args.top_k, concurrency=args.concurrency, rate=args.rate
+    )
+    builder.build(args.systems)
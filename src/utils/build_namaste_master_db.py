@@ -1,14 +1,33 @@
+import argparse
 import os
-import pandas as pd
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, List
 from src.database import get_sqlite_connection
+from src.database.backends import get_backend
+from src.database.fts import existing_sources, has_fts, rebuild_fts
+from src.database.search_keys import has_search_keys, rebuild_search_keys
+from src.database.manifest import NEW, UNCHANGED, SourceManifest
+from src.schema.table_schema import TableSchemas
+from src.utils import metrics
+import src.settings.config as config
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported where sheets are read; importers of DB_PATH/NAMASTE_CODES skip it
 
 # Define the mapping of system to xls file
 NAMASTE_CODES = {
-    "ayurveda": "src/data/namasteCodes/ayurveda.xls",
-    "siddha": "src/data/namasteCodes/siddha.xls",
-    "unani": "src/data/namasteCodes/unani.xls",
+    "ayurveda": config.NAMC_AYURVEDA,
+    "siddha": config.NAMC_SIDDHA,
+    "unani": config.NAMC_UNANI,
+}
+
+# Source columns tried in order for each target column; the first non-empty value wins.
+# Covers both the generic headers and the NAMC/NUMC export headers of the shipped sheets.
+COLUMN_CANDIDATES: Dict[str, List[str]] = {
+    "code": ["code", "Code", "CODE", "NAMC_CODE", "NUMC_CODE"],
+    "english_term": ["english_term", "English Term", "ENGLISH_TERM", "NAMC_TERM", "NUMC_TERM", "NAMC_term"],
+    "description": ["description", "Description", "DESCRIPTION", "Long_definition", "Short_definition"],
 }
 
 # Define the schema for each system (customize columns as needed)
@@ -36,36 +55,156 @@ TABLE_SCHEMAS = {
     """,
 }
 
-DB_PATH = os.getenv("NAMASTE_MASTER_DB", "./data/namaste_master.db")
+# Secondary indexes, created after the bulk load instead of maintained row by row
+TABLE_INDEXES = {
+    system: [
+        f"CREATE INDEX IF NOT EXISTS idx_namaste_{system}_english_term ON namaste_{system} (english_term)",
+    ]
+    for system in TABLE_SCHEMAS
+}
+
+# Bulk-load settings; the DB is rebuilt from the sheets, so durability is traded for speed
+BUILD_PRAGMAS = [
+    "PRAGMA synchronous=OFF;",
+    "PRAGMA cache_size=-65536;",  # 64 MiB
+    "PRAGMA temp_store=MEMORY;",
+]
+
+DB_PATH = os.getenv("NAMASTE_MASTER_DB", config.NAMASTE_MASTER_DB)
+
+def resolve_columns(columns) -> Dict[str, List[str]]:
+    """Maps each target column to the candidate source columns present in a sheet."""
+    present = set(columns)
+    return {target: [c for c in candidates if c in present] for target, candidates in COLUMN_CANDIDATES.items()}
+
+def clean_sheet(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Vectorized equivalent of the per-row coalesce/strip, keeping the last row per code."""
+    import pandas as pd
+    out = {}
+    for target, sources in resolve_columns(df.columns).items():
+        value = pd.Series("", index=df.index, dtype=object)
+        for source in sources:
+            col = df[source].astype(object).where(df[source].notna(), "").astype(str).str.strip()
+            value = value.where(value != "", col)
+        out[target] = value
+    clean = pd.DataFrame(out, columns=list(COLUMN_CANDIDATES))
+    clean = clean[clean["code"] != ""]
+    return clean.drop_duplicates(subset="code", keep="last")
 
-def build_namaste_master_db():
+def build_namaste_master_db(force: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Builds the NAMASTE master DB and returns per-system timings (rows, seconds, rows/sec).
+    Sheets unchanged since the last build (per the source manifest) are skipped
+    unless `force` is set; rows of changed or removed sheets are replaced.
+    """
+    import pandas as pd
+    build_start = time.perf_counter()
+    report: Dict[str, Dict[str, float]] = {}
     conn = get_sqlite_connection(DB_PATH)
     try:
+        for pragma in BUILD_PRAGMAS:
+            conn.execute(pragma)
+        manifest = SourceManifest(conn, "namaste").ensure()
+        present = [Path(p).resolve() for p in NAMASTE_CODES.values() if Path(p).exists()]
+        removed = manifest.remove_missing(present)
+        for path in removed:
+            print(f"Removed rows of deleted source {path}")
         for system, xls_path in NAMASTE_CODES.items():
             abs_path = Path(xls_path).resolve()
             if not abs_path.exists():
                 print(f"File not found: {abs_path}")
                 continue
-            # Create table
+            start = time.perf_counter()
             conn.execute(TABLE_SCHEMAS[system])
+            status, stat, content_hash = manifest.status(abs_path)
+            if status == UNCHANGED and not force:
+                print(f"Unchanged {system} NAMASTE codes at {abs_path}, skipping")
+                continue
+            if status != NEW:
+                manifest.remove(abs_path)
+            # Indexes are dropped during the load and rebuilt afterwards
+            conn.execute(f"DROP INDEX IF EXISTS idx_namaste_{system}_english_term")
             # Read Excel
             df = pd.read_excel(abs_path)
-            # Expect columns: code, english_term, description (customize as needed)
-            for _, row in df.iterrows():
-                code = str(row.get("code") or row.get("Code") or row.get("CODE") or "").strip()
-                english_term = str(row.get("english_term") or row.get("English Term") or row.get("ENGLISH_TERM") or "").strip()
-                description = str(row.get("description") or row.get("Description") or row.get("DESCRIPTION") or "").strip()
-                if not code:
-                    continue
-                conn.execute(
-                    f"INSERT OR REPLACE INTO namaste_{system} (code, english_term, description) VALUES (?, ?, ?)",
-                    (code, english_term, description)
-                )
-            print(f"Imported {system} NAMASTE codes from {abs_path}")
+            read_done = time.perf_counter()
+            clean = clean_sheet(df)
+            conn.executemany(
+                f"INSERT OR REPLACE INTO namaste_{system} (code, english_term, description) VALUES (?, ?, ?)",
+                clean.itertuples(index=False, name=None),
+            )
+            for index_sql in TABLE_INDEXES[system]:
+                conn.execute(index_sql)
+            manifest.record(abs_path, stat, content_hash, f"namaste_{system}", "code", clean["code"])
+            end = time.perf_counter()
+            metrics.BUILD_SECONDS.labels("namaste", "read").observe(read_done - start)
+            metrics.BUILD_SECONDS.labels("namaste", "insert").observe(end - read_done)
+            metrics.BUILD_ROWS.labels("namaste", f"namaste_{system}").inc(len(clean))
+            report[system] = {
+                "rows_read": len(df),
+                "rows_inserted": len(clean),
+                "read_seconds": read_done - start,
+                "insert_seconds": end - read_done,
+                "rows_per_second": len(df) / (end - start) if end > start else 0.0,
+            }
+            print(
+                f"Imported {system} NAMASTE codes from {abs_path}: {len(clean)}/{len(df)} rows, "
+                f"read {read_done - start:.3f}s, insert {end - read_done:.3f}s, "
+                f"{report[system]['rows_per_second']:.0f} rows/s"
+            )
+        if report or removed or not has_fts(conn) or not has_search_keys(conn):
+            tables = [t for t in existing_sources(conn) if t in {f"namaste_{system}" for system in NAMASTE_CODES}]
+            with metrics.span(metrics.BUILD_SECONDS, builder="namaste", phase="search_index"):
+                indexed = rebuild_fts(conn, tables)
+                keys = rebuild_search_keys(conn, tables)
+            print(
+                f"Indexed {sum(indexed.values())} NAMASTE terms for full-text search, "
+                f"{sum(keys.values())} search keys"
+            )
+        conn.execute(f"PRAGMA user_version = {TableSchemas.SCHEMA_VERSION}")
         conn.commit()
         print(f"NAMASTE master DB created at: {DB_PATH}")
     finally:
         conn.close()
+    metrics.BUILD_SECONDS.labels("namaste", "total").observe(time.perf_counter() - build_start)
+    return report
+
+def load_namaste_into(backend: Any) -> Dict[str, int]:
+    """
+    Full load of every NAMASTE sheet into a storage backend (src/database/backends.py),
+    e.g. PostgresBackend with COPY and pg_trgm indexes. Returns rows loaded per system.
+    """
+    import pandas as pd
+    loaded: Dict[str, int] = {}
+    with backend.connection() as conn:
+        for system, xls_path in NAMASTE_CODES.items():
+            abs_path = Path(xls_path).resolve()
+            if not abs_path.exists():
+                print(f"File not found: {abs_path}")
+                continue
+            start = time.perf_counter()
+            backend.create_table(conn, TABLE_SCHEMAS[system])
+            clean = clean_sheet(pd.read_excel(abs_path))
+            loaded[system] = backend.load_rows(
+                conn, f"namaste_{system}", list(clean.columns), clean.itertuples(index=False, name=None), key="code"
+            )
+            backend.create_search_indexes(conn, f"namaste_{system}", ["english_term", "description"])
+            print(
+                f"Loaded {system} NAMASTE codes into {backend.name}: {loaded[system]} rows "
+                f"in {time.perf_counter() - start:.3f}s"
+            )
+    return loaded
 
 if __name__ == "__main__":
-    build_namaste_master_db()
+    parser = argparse.ArgumentParser(description="Build the NAMASTE master database from the NAMC/NUMC sheets.")
+    parser.add_argument("--force", action="store_true", help="re-import sheets even if unchanged")
+    parser.add_argument("--backend", choices=["sqlite", "postgres"], help="load into this backend instead (full load)")
+    args = parser.parse_args()
+
+    if args.backend:
+        backend = get_backend(args.backend, **({"db_path": DB_PATH} if args.backend == "sqlite" else {}))
+        try:
+            load_namaste_into(backend)
+        finally:
+            backend.close()
+    else:
+        build_namaste_master_db(force=args.force)
@@ -1,17 +1,153 @@
 
 import os
 import json
+import time
 import sqlite3
 import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
 
-
-from dotenv import load_dotenv
+import src.settings.config as config
 from src.schema.table_schema import TableSchemas
 from src.database import get_sqlite_connection
+from src.database.backends import get_backend
+from src.database.fts import has_fts, rebuild_fts
+from src.database.load_csv import CSV_PATH as NAMASTE_TERMS_CSV, load_namaste_terms
+from src.database.search_keys import has_search_keys, rebuild_search_keys
+from src.database.manifest import NEW, UNCHANGED, SourceManifest
+from src.utils import metrics
+
+
+
+def iter_json_records(f: TextIO, chunk_size: int = 1 << 20) -> Iterator[Any]:
+    """
+    Yields the elements of a top-level JSON array one at a time, reading `f`
+    in `chunk_size` pieces so the whole array is never held in memory.
+    A top-level object (or any other value) is yielded as a single item.
+    Accepts exactly what json.load accepts: empty elements, trailing commas
+    and anything but whitespace after the array raise json.JSONDecodeError.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def read_more() -> None:
+        nonlocal buf, pos, eof
+        more = f.read(chunk_size)
+        eof = not more
+        buf, pos = buf[pos:] + more, 0
+
+    def next_char() -> str:
+        """Skips whitespace and returns the next character, "" at end of input."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            read_more()
+
+    def next_value() -> Any:
+        nonlocal pos
+        while True:
+            if next_char() in ("", ",", "]"):
+                raise json.JSONDecodeError("Expecting value", buf, pos)
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+                # Only trust a value once the next character can't extend it: "12" may be the start of "12.5"
+                if eof or (end < len(buf) and buf[end] not in "0123456789.eE+-"):
+                    pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            read_more()
+
+    if next_char() != "[":
+        yield json.loads(buf[pos:] + f.read())
+        return
+
+    pos += 1
+    if next_char() == "]":
+        pos += 1
+    else:
+        while True:
+            yield next_value()
+            delimiter = next_char()
+            pos += 1
+            if delimiter == "]":
+                break
+            if delimiter != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos - 1)
+    if next_char():
+        raise json.JSONDecodeError("Extra data", buf, pos)
 
 
+def read_json_records(file_path: Path, stream_min_bytes: int) -> Iterator[Any]:
+    """Streams files of at least `stream_min_bytes` record by record; smaller files are parsed in one go."""
+    with file_path.open("r", encoding="utf-8") as f:
+        if file_path.stat().st_size >= stream_min_bytes:
+            yield from iter_json_records(f)
+            return
+        data = json.load(f)
+    if isinstance(data, list):
+        yield from data
+    else:
+        yield data
+
+
+def group_rows(
+    records: Iterable[Any], valid_columns: Set[str], batch_size: int
+) -> Iterator[Tuple[Tuple[str, ...], List[Tuple[Any, ...]]]]:
+    """
+    Turns records into (columns, rows) batches of at most `batch_size` rows
+    (0 = one batch per column set), keeping only valid columns.
+    """
+    batches: Dict[Tuple[str, ...], List[Tuple[Any, ...]]] = {}
+    # Records of one file nearly always share their key order, so resolve each order once
+    layouts: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], Any]] = {}
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        keys = tuple(record)
+        layout = layouts.get(keys)
+        if layout is None:
+            columns = tuple(sorted(k for k in keys if k in valid_columns))
+            getter = None
+            if len(columns) == 1:
+                getter = lambda r, k=columns[0]: (r[k],)
+            elif columns:
+                getter = itemgetter(*columns)
+            layout = layouts[keys] = (columns, getter)
+        columns, getter = layout
+        if getter is None:
+            continue
+        batch = batches.setdefault(columns, [])
+        batch.append(getter(record))
+        if batch_size and len(batch) >= batch_size:
+            yield columns, batches.pop(columns)
+    yield from batches.items()
+
+
+def parse_json_file(file_path: Path, valid_columns: Set[str], stream_min_bytes: int) -> Dict[str, Any]:
+    """
+    Process-pool worker: parses one file into ready-to-insert row tuples per
+    column set. Returns {"groups", "rows", "parse_seconds", "error"}.
+    """
+    start = time.perf_counter()
+    try:
+        groups = list(group_rows(read_json_records(file_path, stream_min_bytes), valid_columns, 0))
+    except json.JSONDecodeError as e:
+        return {"groups": [], "rows": 0, "parse_seconds": time.perf_counter() - start, "error": str(e)}
+    return {
+        "groups": groups,
+        "rows": sum(len(rows) for _, rows in groups),
+        "parse_seconds": time.perf_counter() - start,
+        "error": None,
+    }
+
 
 class TerminologyMasterDB:
     """
@@ -21,7 +157,14 @@ class TerminologyMasterDB:
     - Reads environment variables:
         WHO_TERMINOLOGIES_MASTER_DB (default: ./data/master.db)
         WHO_TERMINOLOGIES_JSON_FOLDER (default: ./data/who_terminologies/json)
+        NAMASTE_TERMS_CSV (default: ./data/namaste_codes/IAST_Sanskrit_Matching.csv)
     - Detects system by filename and imports JSON records into corresponding tables.
+    - Also loads the NAMASTE terms CSV into `namaste_terms` (src/database/load_csv.py),
+      so one build produces every table the API reads.
+    - Records are grouped by column set and inserted with `executemany` in
+      chunks of `batch_size` (0 falls back to one INSERT per record).
+    - Files of at least `stream_min_bytes` are parsed incrementally instead of
+      being loaded whole with `json.load`.
     """
 
     # Load schema from schema package
@@ -31,15 +174,23 @@ class TerminologyMasterDB:
         self,
         db_path: Optional[str | Path] = None,
         json_folder: Optional[str | Path] = None,
+        terms_csv: Optional[str | Path] = None,
         logger: Optional[logging.Logger] = None,
+        batch_size: int = 5000,
+        stream_min_bytes: int = 64 * 1024 * 1024,
     ) -> None:
+        from dotenv import load_dotenv
         load_dotenv()
         self.db_path = Path(
-            db_path or os.getenv("WHO_TERMINOLOGIES_MASTER_DB", "./data/master.db")
+            db_path or os.getenv("WHO_TERMINOLOGIES_MASTER_DB", config.WHO_TERMINOLOGIES_MASTER_DB)
         ).resolve()
         self.json_folder = Path(
-            json_folder or os.getenv("WHO_TERMINOLOGIES_JSON_FOLDER", "./data/who_terminologies/json")
+            json_folder or os.getenv("WHO_TERMINOLOGIES_JSON_FOLDER", config.WHO_TERMINOLOGIES_JSON_FOLDER)
         ).resolve()
+        self.terms_csv = Path(terms_csv or NAMASTE_TERMS_CSV).resolve()
+
+        self.batch_size = batch_size
+        self.stream_min_bytes = stream_min_bytes
 
         # Basic logger
         self.log = logger or logging.getLogger(self.__class__.__name__)
@@ -78,71 +229,358 @@ class TerminologyMasterDB:
         table_name: str,
         record: Dict[str, Any],
         valid_columns: Set[str],
-    ) -> None:
+    ) -> bool:
         """Insert one record into the table (only keeping valid columns)."""
         clean_data = {k: record.get(k) for k in valid_columns if k in record}
         if not clean_data:
-            return
+            return False
         placeholders = ", ".join([f":{k}" for k in clean_data.keys()])
         columns = ", ".join(clean_data.keys())
         query = f"INSERT OR REPLACE INTO {table_name} ({columns}) VALUES ({placeholders})"
         conn.execute(query, clean_data)
+        return True
+
+    @staticmethod
+    def _insert_sql(table_name: str, columns: Tuple[str, ...]) -> str:
+        placeholders = ", ".join("?" for _ in columns)
+        return f"INSERT OR REPLACE INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    def _write_groups(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        groups: Iterable[Tuple[Tuple[str, ...], List[Tuple[Any, ...]]]],
+        key_column: Optional[str] = None,
+        keys: Optional[List[Any]] = None,
+    ) -> int:
+        """
+        Insert (columns, rows) batches with one prepared statement per column set.
+        Runs inside a savepoint so a file that turns out to be malformed half-way
+        leaves no partial rows behind. Values of `key_column` are appended to
+        `keys` for the source manifest. Returns the number of rows written.
+        """
+        statements: Dict[Tuple[str, ...], str] = {}
+        written = 0
+        conn.execute("SAVEPOINT import_file")
+        try:
+            for columns, rows in groups:
+                sql = statements.get(columns)
+                if sql is None:
+                    sql = statements[columns] = self._insert_sql(table_name, columns)
+                conn.executemany(sql, rows)
+                written += len(rows)
+                if keys is not None and key_column in columns:
+                    i = columns.index(key_column)
+                    keys.extend(row[i] for row in rows)
+        except BaseException:
+            conn.execute("ROLLBACK TO import_file")
+            conn.execute("RELEASE import_file")
+            raise
+        conn.execute("RELEASE import_file")
+        return written
 
-    def _import_json_file(self, conn: sqlite3.Connection, file_path: Path) -> None:
+    def _import_json_batched(
+        self,
+        conn: sqlite3.Connection,
+        file_path: Path,
+        table_name: str,
+        valid_columns: Set[str],
+        key_column: Optional[str] = None,
+        keys: Optional[List[Any]] = None,
+    ) -> int:
+        records = read_json_records(file_path, self.stream_min_bytes)
+        groups = group_rows(records, valid_columns, self.batch_size)
+        return self._write_groups(conn, table_name, groups, key_column, keys)
+
+    def _import_json_file(
+        self, conn: sqlite3.Connection, file_path: Path
+    ) -> Optional[Tuple[Optional[str], Optional[str], List[Any]]]:
+        """
+        Imports one file. Returns (table, key column, keys written) for the
+        source manifest, or None if the file could not be parsed.
+        """
         system = self.detect_system(file_path.name)
         if not system:
             self.log.warning("Skipping %s: system not recognized", file_path.name)
-            return
+            return None, None, []
 
         schema = self.TABLE_SCHEMAS[system]
         table_name = schema["table"]
+        key_column = schema.get("key")
+        keys: List[Any] = []
+
+        if self.batch_size > 0:
+            start = time.perf_counter()
+            try:
+                rows = self._import_json_batched(
+                    conn, file_path, table_name, schema["columns"], key_column, keys
+                )
+            except json.JSONDecodeError:
+                self.log.error("Skipping %s: invalid JSON", file_path.name)
+                return None
+            seconds = time.perf_counter() - start
+            metrics.BUILD_SECONDS.labels("who_terminology", "import").observe(seconds)
+            metrics.BUILD_ROWS.labels("who_terminology", table_name).inc(rows)
+            self.log.info(
+                "Imported %s → %s (%d rows, %.3fs)", file_path.name, table_name, rows, seconds,
+                extra={"source": file_path.name, "table": table_name, "rows": rows, "seconds": seconds},
+            )
+            return table_name, key_column, keys
 
         try:
             with file_path.open("r", encoding="utf-8") as f:
                 data = json.load(f)
         except json.JSONDecodeError:
             self.log.error("Skipping %s: invalid JSON", file_path.name)
-            return
+            return None
 
         if isinstance(data, dict):
-            self._import_json_record(conn, table_name, data, schema["columns"])
-        elif isinstance(data, list):
-            for record in data:
-                if isinstance(record, dict):
-                    self._import_json_record(conn, table_name, record, schema["columns"])
-        else:
+            data = [data]
+        if not isinstance(data, list):
             self.log.warning("Skipping %s: JSON must be an object or array", file_path.name)
-            return
+            return None, None, []
+        for record in data:
+            if isinstance(record, dict):
+                if self._import_json_record(conn, table_name, record, schema["columns"]):
+                    keys.append(record.get(key_column))
 
         self.log.info("Imported %s → %s", file_path.name, table_name)
+        return table_name, key_column, keys
 
-    def build_from_folder(self, folder: Optional[str | Path] = None) -> Path:
+    def _build_parallel(
+        self,
+        conn: sqlite3.Connection,
+        manifest: SourceManifest,
+        json_files: List[Tuple[Path, Any, Optional[str]]],
+        workers: int,
+    ) -> None:
+        """
+        Parse files in a process pool while this thread, the only writer,
+        inserts each file's rows in sorted file order as soon as it is ready.
+        """
+        jobs = []
+        for file_path, stat, content_hash in json_files:
+            system = self.detect_system(file_path.name)
+            if not system:
+                self.log.warning("Skipping %s: system not recognized", file_path.name)
+                manifest.record(file_path, stat, content_hash, None, None, [])
+                continue
+            jobs.append((file_path, stat, content_hash, self.TABLE_SCHEMAS[system]))
+
+        def submit(job):
+            return pool.submit(parse_json_file, job[0], job[3]["columns"], self.stream_min_bytes)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Submit at most 2x workers files ahead so parsed rows don't pile up in memory
+            pending = []
+            queue = iter(jobs)
+            for job in queue:
+                pending.append((job, submit(job)))
+                if len(pending) >= 2 * workers:
+                    break
+            while pending:
+                (file_path, stat, content_hash, schema), future = pending.pop(0)
+                result = future.result()
+                nxt = next(queue, None)
+                if nxt is not None:
+                    pending.append((nxt, submit(nxt)))
+                if result["error"]:
+                    self.log.error("Skipping %s: invalid JSON", file_path.name)
+                    continue
+                start = time.perf_counter()
+                keys: List[Any] = []
+                rows = self._write_groups(conn, schema["table"], result["groups"], schema.get("key"), keys)
+                manifest.record(file_path, stat, content_hash, schema["table"], schema.get("key"), keys)
+                write_seconds = time.perf_counter() - start
+                metrics.BUILD_SECONDS.labels("who_terminology", "parse").observe(result["parse_seconds"])
+                metrics.BUILD_SECONDS.labels("who_terminology", "import").observe(write_seconds)
+                metrics.BUILD_ROWS.labels("who_terminology", schema["table"]).inc(rows)
+                self.log.info(
+                    "Imported %s → %s (%d rows, parse %.3fs, write %.3fs)",
+                    file_path.name, schema["table"], rows, result["parse_seconds"], write_seconds,
+                    extra={"source": file_path.name, "table": schema["table"], "rows": rows, "seconds": write_seconds},
+                )
+
+    def build_from_folder(
+        self, folder: Optional[str | Path] = None, workers: int = 1, force: bool = False
+    ) -> Path:
         """
         Create or update the master database by importing all JSON files from the folder.
+        With workers > 1, files are parsed in a process pool of that size.
+
+        Incremental: files whose size/mtime (or content hash) match the source
+        manifest are skipped, rows of changed or removed files are deleted
+        before re-import. `force=True` re-imports every file.
+        A missing folder means there are no WHO sources (the WHO JSON exports
+        are not shipped), so the DB is still built from the other sources.
+        The NAMASTE terms CSV is loaded and committed first, independently of
+        the folder scan (see build_namaste_terms).
         Returns the DB path.
         """
         src_folder = Path(folder).resolve() if folder else self.json_folder
-        if not src_folder.exists() or not src_folder.is_dir():
-            raise FileNotFoundError(f"JSON folder not found: {src_folder}")
+        if src_folder.exists() and not src_folder.is_dir():
+            raise NotADirectoryError(f"JSON folder is not a directory: {src_folder}")
 
+        start = time.perf_counter()
         conn = self._connect()
         try:
             self._ensure_tables(conn)
+            unindexed = not has_fts(conn) or not has_search_keys(conn)
+            self._build_namaste_terms(conn, force, reindex=unindexed)
+            conn.execute(f"PRAGMA user_version = {TableSchemas.SCHEMA_VERSION}")
+            conn.commit()
+
+            manifest = SourceManifest(conn, "who_terminology").ensure()
 
-            json_files = sorted([p for p in src_folder.iterdir() if p.suffix.lower() == ".json"])
-            if not json_files:
-                self.log.warning("No JSON files found in %s", src_folder)
+            if src_folder.is_dir():
+                json_files = sorted([p for p in src_folder.iterdir() if p.suffix.lower() == ".json"])
+                if not json_files:
+                    self.log.warning("No JSON files found in %s", src_folder)
+            else:
+                self.log.warning("JSON folder not found, no WHO sources to import: %s", src_folder)
+                json_files = []
 
+            removed = manifest.remove_missing(json_files)
+            for path in removed:
+                self.log.info("Removed rows of deleted source %s", path)
+
+            to_import = []
             for file_path in json_files:
-                self._import_json_file(conn, file_path)
+                status, stat, content_hash = manifest.status(file_path)
+                if status == UNCHANGED and not force:
+                    self.log.debug("Unchanged: %s", file_path.name)
+                    continue
+                if status != NEW:
+                    manifest.remove(file_path)
+                to_import.append((file_path, stat, content_hash))
+
+            if workers > 1 and to_import:
+                self._build_parallel(conn, manifest, to_import, workers)
+            else:
+                for file_path, stat, content_hash in to_import:
+                    imported = self._import_json_file(conn, file_path)
+                    if imported is not None:
+                        manifest.record(file_path, stat, content_hash, *imported)
 
+            if to_import or removed or unindexed:
+                self._rebuild_search_indexes(conn, [schema["table"] for schema in self.TABLE_SCHEMAS.values()])
             conn.commit()
         finally:
             conn.close()
 
-        self.log.info("Master database created at: %s", self.db_path)
+        seconds = time.perf_counter() - start
+        metrics.BUILD_SECONDS.labels("who_terminology", "total").observe(seconds)
+        self.log.info(
+            "Master database created at: %s (%d imported, %d unchanged, %d removed, %.3fs)",
+            self.db_path, len(to_import), len(json_files) - len(to_import), len(removed), seconds,
+        )
         return self.db_path
 
+    def build_namaste_terms(self, force: bool = False) -> bool:
+        """
+        Builds only `namaste_terms` (and its search indexes) from the NAMASTE
+        terms CSV, without touching the WHO JSON folder. build_from_folder()
+        runs the same step. Returns whether the CSV was (re)loaded.
+        """
+        conn = self._connect()
+        try:
+            self._ensure_tables(conn)
+            loaded = self._build_namaste_terms(conn, force, reindex=not has_fts(conn) or not has_search_keys(conn))
+            conn.execute(f"PRAGMA user_version = {TableSchemas.SCHEMA_VERSION}")
+            conn.commit()
+        finally:
+            conn.close()
+        return loaded
+
+    def _build_namaste_terms(self, conn: sqlite3.Connection, force: bool, reindex: bool) -> bool:
+        loaded = self.load_namaste_terms(conn, force=force)
+        if (loaded or reindex) and self._has_table(conn, "namaste_terms"):
+            self._rebuild_search_indexes(conn, ["namaste_terms"])
+        return loaded
+
+    def _rebuild_search_indexes(self, conn: sqlite3.Connection, tables: List[str]) -> None:
+        """Repopulates the FTS index and search keys of these tables (other sources keep theirs)."""
+        fts_sources = [t for t in tables if t in TableSchemas.FTS_SOURCES]
+        key_sources = [t for t in tables if t in TableSchemas.SEARCH_KEY_SOURCES]
+        with metrics.span(metrics.BUILD_SECONDS, builder="who_terminology", phase="search_index"):
+            indexed = rebuild_fts(conn, fts_sources)
+            stored = rebuild_search_keys(conn, key_sources)
+        for table, rows in indexed.items():
+            self.log.info("Indexed %d rows of %s for full-text search", rows, table)
+        for table, keys in stored.items():
+            self.log.info("Stored %d search keys for %s", keys, table)
+
+    @staticmethod
+    def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone() is not None
+
+    def load_namaste_terms(self, conn: sqlite3.Connection, force: bool = False) -> bool:
+        """
+        Reloads `namaste_terms` from the NAMASTE terms CSV when the file is new
+        or changed per the source manifest (or `force`). Returns whether it loaded.
+        """
+        if not self.terms_csv.exists():
+            self.log.warning("NAMASTE terms CSV not found: %s", self.terms_csv)
+            return False
+        manifest = SourceManifest(conn, "namaste_terms").ensure()
+        status, stat, content_hash = manifest.status(self.terms_csv)
+        if status == UNCHANGED and not force and self._has_table(conn, "namaste_terms"):
+            self.log.debug("Unchanged: %s", self.terms_csv.name)
+            return False
+        result = load_namaste_terms(conn, self.terms_csv, max(self.batch_size, 1))
+        manifest.record(self.terms_csv, stat, content_hash, "namaste_terms", "NAMC_CODE", result["codes"])
+        metrics.BUILD_SECONDS.labels("who_terminology", "namaste_terms").observe(
+            result["load_seconds"] + result["index_seconds"]
+        )
+        metrics.BUILD_ROWS.labels("who_terminology", "namaste_terms").inc(result["rows_inserted"])
+        self.log.info(
+            "Imported %s → namaste_terms (%d rows, %d duplicate codes skipped, %.3fs, %.0f rows/s)",
+            self.terms_csv.name, result["rows_inserted"], result["duplicates"],
+            result["load_seconds"] + result["index_seconds"], result["rows_per_second"],
+        )
+        return True
+
+    def load_into(self, backend: Any, folder: Optional[str | Path] = None) -> Dict[str, int]:
+        """
+        Full load of every JSON file into a storage backend (src/database/backends.py),
+        e.g. PostgresBackend: rows are streamed in `batch_size` groups through
+        `backend.load_rows()` and term columns get the backend's search indexes.
+        The SQLite-specific source manifest and FTS index are not used here.
+        Returns rows loaded per table.
+        """
+        src_folder = Path(folder).resolve() if folder else self.json_folder
+        if not src_folder.exists() or not src_folder.is_dir():
+            raise FileNotFoundError(f"JSON folder not found: {src_folder}")
+
+        start = time.perf_counter()
+        loaded: Dict[str, int] = {}
+        with backend.connection() as conn:
+            for schema in self.TABLE_SCHEMAS.values():
+                backend.create_table(conn, schema["schema"])
+            for file_path in sorted(p for p in src_folder.iterdir() if p.suffix.lower() == ".json"):
+                system = self.detect_system(file_path.name)
+                if not system:
+                    self.log.warning("Skipping %s: system not recognized", file_path.name)
+                    continue
+                schema = self.TABLE_SCHEMAS[system]
+                records = read_json_records(file_path, self.stream_min_bytes)
+                rows = 0
+                for columns, batch in group_rows(records, schema["columns"], self.batch_size):
+                    key = schema.get("key") if schema.get("key") in columns else None
+                    rows += backend.load_rows(conn, schema["table"], columns, batch, key=key)
+                loaded[schema["table"]] = loaded.get(schema["table"], 0) + rows
+                self.log.info("Loaded %s → %s (%d rows, %s)", file_path.name, schema["table"], rows, backend.name)
+            for schema in self.TABLE_SCHEMAS.values():
+                terms = TableSchemas.SEARCH_KEY_SOURCES.get(schema["table"], {}).get("terms", [])
+                backend.create_search_indexes(conn, schema["table"], [c for c in terms if c in schema["columns"]])
+
+        self.log.info(
+            "Loaded %d rows into %s in %.3fs", sum(loaded.values()), backend.name, time.perf_counter() - start
+        )
+        return loaded
+
     # Optional: allow adding a new system at runtime (extensible design)
     def register_system(
         self,
@@ -150,6 +588,7 @@ class TerminologyMasterDB:
         table_name: str,
         columns: Iterable[str],
         create_sql: str,
+        key: Optional[str] = "term_id",
     ) -> None:
         """
         Register an additional terminology system dynamically.
@@ -173,10 +612,30 @@ class TerminologyMasterDB:
             "schema": create_sql,
             "columns": set(columns),
             "table": table_name,
+            "key": key,
         }
         self.log.info("Registered new system: %s -> %s", system_key, table_name)
 
 
 if __name__ == "__main__":
-    builder = TerminologyMasterDB()
-    builder.build_from_folder()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the WHO terminology master database.")
+    parser.add_argument("--folder", help="folder of WHO terminology JSON files")
+    parser.add_argument("--db", help="master DB path")
+    parser.add_argument("--terms-csv", help="NAMASTE terms CSV (IAST_Sanskrit_Matching.csv)")
+    parser.add_argument("--workers", type=int, default=1, help="parse files in a pool of this many processes")
+    parser.add_argument("--force", action="store_true", help="re-import files even if unchanged")
+    parser.add_argument("--backend", choices=["sqlite", "postgres"], help="load into this backend instead (full load)")
+    parser.add_argument("--terms-only", action="store_true", help="only (re)build namaste_terms from --terms-csv")
+    args = parser.parse_args()
+
+    builder = TerminologyMasterDB(db_path=args.db, json_folder=args.folder, terms_csv=args.terms_csv)
+    if args.backend:
+        backend = get_backend(args.backend, **({"db_path": args.db} if args.backend == "sqlite" else {}))
+        try:
+            builder.load_into(backend)
+        finally:
+            backend.close()
+    elif args.terms_only:
+        builder.build_namaste_terms(force=args.force)
+    else:
+        builder.build_from_folder(workers=args.workers, force=args.force)
\ No newline at end of file
@@ -0,0 +1,380 @@
+"""
+Streaming export of the terminology master DBs and the NAMASTE → ICD-11 mappings.
+
+Rows are read with `fetchmany()` (a named server-side cursor on PostgreSQL)
+and written as they arrive, so memory stays flat however large the table:
+
+- ndjson: one JSON object per row
+- csv:    header plus one line per row
+- fhir:   a FHIR R4 CodeSystem (terminology tables) or ConceptMap
+          (namaste_icd_map) written element by element
+
+Output paths ending in `.gz` (or `--gzip`) are gzip-compressed on the fly.
+
+    python -m src.utils.export_terminology --db data/namaste_master.db --mappings --format fhir --out map.json.gz
+    python -m src.utils.export_terminology --db data/master.db --table namaste_terms --format csv --out -
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import chain, groupby
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.schema.table_schema import TableSchemas
+
+FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", 5000))
+FORMATS = ("ndjson", "csv", "fhir")
+FHIR_BASE = os.getenv("FHIR_BASE_URL", "http://ayushsetu.local/fhir")
+ICD_SYSTEM = "http://id.who.int/icd/release/11/{release}/mms"
+TERM_COLUMNS = ("code", "term", "english_term", "description")
+MAPPING_COLUMNS = (
+    "system", "namaste_code", "namaste_display", "icd_release", "rank", "icd_code", "icd_title",
+    "icd_uri", "score", "confidence", "equivalence", "method",
+)
+_ENCODER = json.JSONEncoder(ensure_ascii=False)  # reused; json.dumps() builds one per call with non-default options
+
+
+# --- reading ---
+
+def iter_rows(conn: Any, sql: str, params: Sequence[Any] = (), fetch_size: int = FETCH_SIZE) -> Iterator[Tuple]:
+    """Rows of `sql`, `fetch_size` at a time; PostgreSQL connections get a named (server-side) cursor."""
+    if isinstance(conn, sqlite3.Connection):
+        cur = conn.cursor()
+    else:
+        cur = conn.cursor(name=f"export_{id(sql):x}")
+        cur.itersize = fetch_size
+    try:
+        cur.execute(sql, params)
+        while True:
+            batch = cur.fetchmany(fetch_size)
+            if not batch:
+                break
+            yield from batch
+    finally:
+        cur.close()
+
+
+def _placeholder(conn: Any) -> str:
+    return "?" if isinstance(conn, sqlite3.Connection) else "%s"
+
+
+def table_records(conn: Any, table: str, fetch_size: int = FETCH_SIZE) -> Tuple[Tuple[str, ...], Iterator[Tuple]]:
+    """
+    (columns, rows) of a table. Terminology sources (TableSchemas.FTS_SOURCES)
+    come out as TERM_COLUMNS; any other table as all of its columns.
+    """
+    mapping = TableSchemas.FTS_SOURCES.get(table)
+    if mapping:
+        select = ", ".join(mapping[c] for c in TERM_COLUMNS)
+        sql = f"SELECT {select} FROM {table} WHERE {mapping['code']} IS NOT NULL ORDER BY {mapping['code']}"
+        return TERM_COLUMNS, iter_rows(conn, sql, (), fetch_size)
+    cur = conn.cursor()
+    cur.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+    columns = tuple(d[0] for d in cur.description)
+    cur.close()
+    return columns, iter_rows(conn, f"SELECT * FROM {table}", (), fetch_size)
+
+
+def preferred_method(rows: Iterable[Tuple]) -> Iterator[Tuple]:
+    """
+    MAPPING_COLUMNS rows ordered by code and release, keeping per code and
+    release only the rows of its most preferred method (TableSchemas.method_preference()).
+    """
+    for _, group in groupby(rows, key=lambda r: (r[1], r[3])):
+        group = list(group)
+        best = min({r[11] for r in group}, key=TableSchemas.method_preference)
+        yield from (r for r in group if r[11] == best)
+
+
+def mapping_records(
+    conn: Any,
+    release: Optional[str] = None,
+    systems: Optional[Iterable[str]] = None,
+    fetch_size: int = FETCH_SIZE,
+    all_methods: bool = False,
+) -> Iterator[Tuple]:
+    """
+    namaste_icd_map rows as MAPPING_COLUMNS, ordered by system, release, code,
+    method and rank. Unless `all_methods`, each code keeps only the matches of
+    its preferred method (see preferred_method()).
+    """
+    tables = {
+        name for (name,) in iter_rows(conn, "SELECT name FROM sqlite_master WHERE type = 'table'")
+    } if isinstance(conn, sqlite3.Connection) else None
+    mark = _placeholder(conn)
+    # Unary + keeps SQLite from using the release equality to reorder the
+    # primary-key scan, which would add a sort per code
+    release_column = "+m.icd_release" if tables is not None else "m.icd_release"
+    for system, icd_release in _mapped_releases(conn, systems, release):
+        display_table = f"namaste_{system}"
+        has_display = tables is None or display_table in tables
+        display = "t.english_term" if has_display else "NULL"
+        join = f"LEFT JOIN {display_table} t ON t.code = m.namaste_code" if has_display else ""
+        # One (system, release) at a time, read in primary-key order
+        sql = f"""
+            SELECT m.system, m.namaste_code, {display}, m.icd_release, m.rank, m.icd_code, m.icd_title,
+                   m.icd_uri, m.score, m.confidence, m.equivalence, m.method
+            FROM namaste_icd_map m {join}
+            WHERE m.system = {mark} AND {release_column} = {mark}
+            ORDER BY m.namaste_code, m.icd_release, m.method, m.rank
+        """
+        rows = iter_rows(conn, sql, (system, icd_release), fetch_size)
+        yield from rows if all_methods else preferred_method(rows)
+
+
+def _mapped_releases(
+    conn: Any, systems: Optional[Iterable[str]], release: Optional[str]
+) -> List[Tuple[str, str]]:
+    pairs = iter_rows(conn, "SELECT DISTINCT system, icd_release FROM namaste_icd_map ORDER BY system, icd_release")
+    wanted = set(systems) if systems else None
+    return [
+        (system, icd_release) for system, icd_release in pairs
+        if (wanted is None or system in wanted) and (release is None or icd_release == release)
+    ]
+
+
+# --- writing ---
+
+def ndjson_chunks(columns: Sequence[str], rows: Iterable[Tuple], batch: int = 1000) -> Iterator[str]:
+    encode = _ENCODER.encode
+    lines: List[str] = []
+    for row in rows:
+        lines.append(encode(dict(zip(columns, row))))
+        if len(lines) >= batch:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def csv_chunks(columns: Sequence[str], rows: Iterable[Tuple], batch: int = 1000) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % batch == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _array(items: Iterable[Iterable[str]], indent: str) -> Iterator[str]:
+    """A JSON array written item by item; each item is itself a sequence of chunks."""
+    yield "["
+    first = True
+    for item in items:
+        yield ("\n" if first else ",\n") + indent
+        yield from item
+        first = False
+    yield "]" if first else "\n" + indent[:-2] + "]"
+
+
+def _dumped(objects: Iterable[Any]) -> Iterator[Tuple[str]]:
+    encode = _ENCODER.encode
+    for obj in objects:
+        yield (encode(obj),)
+
+
+def _resource(header: Dict[str, Any], array_key: str, items: Iterable[Iterable[str]]) -> Iterator[str]:
+    """`header` as a JSON object whose last member, `array_key`, is streamed from `items`."""
+    yield json.dumps(header, ensure_ascii=False, indent=2)[:-2] + f',\n  "{array_key}": '
+    yield from _array(items, "    ")
+    yield "\n}\n"
+
+
+def codesystem_chunks(table: str, rows: Iterable[Tuple], version: Optional[str] = None) -> Iterator[str]:
+    """FHIR R4 CodeSystem for a terminology table; rows are TERM_COLUMNS."""
+    name = table.replace("_", "-")
+    now = datetime.now(timezone.utc)
+    header = {
+        "resourceType": "CodeSystem",
+        "id": name,
+        "url": f"{FHIR_BASE}/CodeSystem/{name}",
+        "version": version or now.date().isoformat(),
+        "name": name,
+        "status": "active",
+        "content": "complete",
+        "caseSensitive": True,
+        "date": now.isoformat(),
+    }
+
+    def concepts() -> Iterator[Dict[str, Any]]:
+        for code, term, english_term, description in rows:
+            concept: Dict[str, Any] = {"code": str(code), "display": english_term or term or str(code)}
+            if description:
+                concept["definition"] = description
+            if term and english_term and term != english_term:
+                concept["designation"] = [{"use": {"display": "original"}, "value": term}]
+            yield concept
+
+    return _resource(header, "concept", _dumped(concepts()))
+
+
+def conceptmap_chunks(rows: Iterable[Tuple], release: Optional[str] = None) -> Iterator[str]:
+    """FHIR R4 ConceptMap (NAMASTE → ICD-11) from mapping_records() rows, one group per system and release."""
+    header = {
+        "resourceType": "ConceptMap",
+        "id": "namaste-to-icd11",
+        "url": f"{FHIR_BASE}/ConceptMap/namaste-to-icd11",
+        "name": "NAMASTE_to_ICD11",
+        "status": "active",
+        "date": datetime.now(timezone.utc).isoformat(),
+        "targetUri": ICD_SYSTEM.format(release=release) if release else "http://id.who.int/icd/release/11/mms",
+    }
+
+    def groups() -> Iterator[Iterator[str]]:
+        for (system, icd_release), group_rows in groupby(rows, key=lambda r: (r[0], r[3])):
+            opening = {
+                "source": f"{FHIR_BASE}/CodeSystem/namaste-{system}",
+                "target": ICD_SYSTEM.format(release=icd_release),
+            }
+            yield chain(
+                [json.dumps(opening, ensure_ascii=False)[:-1] + ', "element": '],
+                _array(_dumped(_elements(group_rows)), "        "),
+                ["}"],
+            )
+
+    return _resource(header, "group", groups())
+
+
+def _elements(rows: Iterable[Tuple]) -> Iterator[Dict[str, Any]]:
+    """One ConceptMap element per NAMASTE code, its ICD matches as targets in rank order."""
+    for code, code_rows in groupby(rows, key=lambda r: r[1]):
+        element: Dict[str, Any] = {"code": code}
+        targets = []
+        for row in code_rows:
+            record = dict(zip(MAPPING_COLUMNS, row))
+            if record["namaste_display"]:
+                element["display"] = record["namaste_display"]
+            if not record["icd_code"]:
+                continue
+            comment = [f"rank {record['rank']}"]
+            comment += [f"{key} {record[key]}" for key in ("confidence", "score", "method") if record[key] is not None]
+            targets.append({
+                "code": record["icd_code"],
+                "display": record["icd_title"],
+                "equivalence": record["equivalence"] or "relatedto",
+                "comment": ", ".join(comment),
+            })
+        element["target"] = targets or [{"equivalence": "unmatched"}]
+        yield element
+
+
+@contextmanager
+def open_output(path: Optional[str], compress: Optional[bool] = None) -> Iterator[IO[str]]:
+    """Text stream for `path` ("-" or None = stdout), gzip-compressed if asked or if the path ends in .gz."""
+    if compress is None:
+        compress = bool(path) and path.endswith(".gz")
+    if not path or path == "-":
+        raw = sys.stdout.buffer
+        stream = gzip.GzipFile(fileobj=raw, mode="wb") if compress else raw
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="", write_through=False)
+        try:
+            yield text
+        finally:
+            text.flush()
+            text.detach()
+            if compress:
+                stream.close()
+            raw.flush()
+        return
+    tmp = path + ".tmp"
+    opener = gzip.open(tmp, "wt", encoding="utf-8", newline="", compresslevel=6) if compress else open(
+        tmp, "w", encoding="utf-8", newline=""
+    )
+    try:
+        with opener as out:
+            yield out
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def write_chunks(chunks: Iterable[str], out: IO[str]) -> int:
+    """Writes every chunk; returns the number of characters written."""
+    written = 0
+    for chunk in chunks:
+        out.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def export_table(
+    conn: Any, table: str, out: IO[str], fmt: str = "ndjson", fetch_size: int = FETCH_SIZE
+) -> int:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {FORMATS}")
+    columns, rows = table_records(conn, table, fetch_size)
+    if fmt == "fhir":
+        if columns != TERM_COLUMNS:
+            raise ValueError(f"{table} is not a terminology table; FHIR export covers {sorted(TableSchemas.FTS_SOURCES)}")
+        chunks = codesystem_chunks(table, rows)
+    elif fmt == "csv":
+        chunks = csv_chunks(columns, rows)
+    else:
+        chunks = ndjson_chunks(columns, rows)
+    return write_chunks(chunks, out)
+
+
+def export_mappings(
+    conn: Any,
+    out: IO[str],
+    fmt: str = "ndjson",
+    release: Optional[str] = None,
+    systems: Optional[Iterable[str]] = None,
+    fetch_size: int = FETCH_SIZE,
+    all_methods: bool = False,
+) -> int:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {FORMATS}")
+    rows = mapping_records(conn, release, systems, fetch_size, all_methods)
+    if fmt == "fhir":
+        chunks = conceptmap_chunks(rows, release)
+    elif fmt == "csv":
+        chunks = csv_chunks(MAPPING_COLUMNS, rows)
+    else:
+        chunks = ndjson_chunks(MAPPING_COLUMNS, rows)
+    return write_chunks(chunks, out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream a master DB table or the ICD-11 mappings to a file.")
+    parser.add_argument("--db", required=True, help="SQLite master DB path")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--table", help="table to export (terminology tables support --format fhir)")
+    target.add_argument("--mappings", action="store_true", help="export namaste_icd_map")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--release", help="only mappings for this ICD release")
+    parser.add_argument("--systems", nargs="+", help="only mappings for these NAMASTE systems")
+    parser.add_argument("--all-methods", action="store_true", help="every method's mappings, not only the preferred")
+    parser.add_argument("--out", default="-", help="output path; .gz is compressed (default: stdout)")
+    parser.add_argument("--gzip", action="store_true", default=None, help="compress even without .gz")
+    parser.add_argument("--fetch-size", type=int, default=FETCH_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        with open_output(args.out, args.gzip) as out:
+            if args.mappings:
+                export_mappings(
+                    conn, out, args.format, args.release, args.systems, args.fetch_size, args.all_methods
+                )
+            else:
+                export_table(conn, args.table, out, args.format, args.fetch_size)
+    finally:
+        conn.close()
+    print(f"Exported in {time.perf_counter() - start:.1f}s", file=sys.stderr)
@@ -0,0 +1,441 @@
+"""
+Process-wide metrics for the mapping pipeline: counters, histograms and
+timing spans, exported as Prometheus text and structured JSON logs.
+
+- `counter()` / `histogram()` return a named metric from the registry,
+  creating it on first use. `.labels(...)` picks one labelled series; on hot
+  paths resolve it once at module level and keep the series.
+- `span()` times a block (`with span(...)`) or every call of a function
+  (`@span(...)`). The elapsed seconds are observed into the histogram. An
+  exception is counted in `<name>_errors_total{..., error=<type>}` and
+  logged with its labels, duration and message.
+- `render()` is the Prometheus text exposition, `snapshot()` the same data
+  as a dict. With METRICS_TEXTFILE set, the text is written to that file at
+  exit (node_exporter textfile collector), so one-shot CLIs report too.
+- With METRICS_JSON_LOGS set, log records go to stderr as JSON lines
+  (`JsonFormatter`, including `extra` fields). With METRICS_LOG_SPANS set,
+  every span is logged as well, not only failures.
+
+Overhead is about a microsecond per span (benchmarks/bench_metrics.py).
+"""
+
+import atexit
+import json
+import logging
+import math
+import os
+import sys
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Seconds; spans range from sub-millisecond DB lookups to multi-second builds
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+TEXTFILE = os.getenv("METRICS_TEXTFILE")
+JSON_LOGS = os.getenv("METRICS_JSON_LOGS", "false").lower() in ("1", "true", "yes")
+LOG_SPANS = os.getenv("METRICS_LOG_SPANS", "false").lower() in ("1", "true", "yes")
+
+log = logging.getLogger("metrics")
+
+LabelValues = Tuple[str, ...]
+
+
+def _label_values(metric: "_Metric", args: Sequence[Any], kwargs: Dict[str, Any]) -> LabelValues:
+    if kwargs:
+        try:
+            args = tuple(args) + tuple(kwargs.pop(name) for name in metric.labelnames[len(args):])
+        except KeyError as e:
+            raise ValueError(f"{metric.name}: missing label {e}") from None
+        if kwargs:
+            raise ValueError(f"{metric.name}: unknown labels {sorted(kwargs)}")
+    if len(args) != len(metric.labelnames):
+        raise ValueError(f"{metric.name}: expected labels {metric.labelnames}, got {args}")
+    return tuple(str(value) for value in args)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_series(self, values: LabelValues) -> Any:
+        """A fresh series for these label values."""
+
+    def labels(self, *args: Any, **kwargs: Any) -> Any:
+        """The series for these label values (positional in `labelnames` order, or by name)."""
+        values = _label_values(self, args, kwargs)
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, self._new_series(values))
+        return series
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def _recorded(self) -> List[Tuple[LabelValues, Any]]:
+        """Series that saw at least one value (hot paths resolve series before using them)."""
+        return [(values, series) for values, series in list(self._series.items()) if series.count]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Prometheus text lines of the recorded series."""
+
+    @abstractmethod
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """The recorded series as dicts."""
+
+
+class _CounterSeries:
+    __slots__ = ("value", "count", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+            self.count += 1
+
+
+class Counter(_Metric):
+    """Monotonic total, e.g. requests or rows."""
+
+    kind = "counter"
+
+    def _new_series(self, values: LabelValues) -> _CounterSeries:
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        self.labels(**labels).inc(amount)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, series in self._recorded():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(series.value)}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {"labels": dict(zip(self.labelnames, values)), "value": series.value}
+            for values, series in self._recorded()
+        ]
+
+
+class _HistogramSeries:
+    __slots__ = ("metric", "values", "bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, metric: "Histogram", values: LabelValues) -> None:
+        self.metric = metric
+        self.values = values
+        self.bounds = metric.buckets
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot: above the largest bound (+Inf)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> "_Span":
+        return _Span(self)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (seconds, for spans) in cumulative `le` buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str = "", labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        base = name[: -len("_seconds")] if name.endswith("_seconds") else name
+        self.errors = Counter(f"{base}_errors_total", f"Failed {name} spans by exception type", (*self.labelnames, "error"))
+
+    def _new_series(self, values: LabelValues) -> _HistogramSeries:
+        return _HistogramSeries(self, values)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        self.labels(**labels).observe(value)
+
+    def time(self, *args: Any, **labels: Any) -> "_Span":
+        """Span into the series for these labels; see span()."""
+        return _Span(self.labels(*args, **labels))
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, series in self._recorded():
+            with series._lock:
+                counts, total, count = list(series.counts), series.sum, series.count
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                labels = _format_labels((*self.labelnames, "le"), (*values, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        out = []
+        for values, series in self._recorded():
+            with series._lock:
+                counts, total, count = list(series.counts), series.sum, series.count
+            out.append({
+                "labels": dict(zip(self.labelnames, values)),
+                "count": count,
+                "sum": total,
+                "buckets": dict(zip((*map(str, self.buckets), "+Inf"), counts)),
+            })
+        return out
+
+
+class _Span:
+    """Times one block or, as a decorator, every call; see span()."""
+
+    __slots__ = ("series", "start")
+
+    def __init__(self, series: _HistogramSeries) -> None:
+        self.series = series
+
+    def __enter__(self) -> "_Span":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = perf_counter() - self.start
+        self.series.observe(elapsed)
+        if exc_type is not None:
+            _span_failed(self.series, elapsed, exc_type, exc)
+        elif LOG_SPANS:
+            _span_done(self.series, elapsed)
+        return False
+
+    def __call__(self, fn: Callable) -> Callable:
+        series = self.series
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                elapsed = perf_counter() - start
+                series.observe(elapsed)
+                _span_failed(series, elapsed, type(e), e)
+                raise
+            elapsed = perf_counter() - start
+            series.observe(elapsed)
+            if LOG_SPANS:
+                _span_done(series, elapsed)
+            return result
+
+        return wrapper
+
+
+def _span_fields(series: _HistogramSeries, elapsed: float) -> Dict[str, Any]:
+    return {"span": series.metric.name, "labels": dict(zip(series.metric.labelnames, series.values)), "seconds": elapsed}
+
+
+def _span_done(series: _HistogramSeries, elapsed: float) -> None:
+    log.info("%s %.6fs", series.metric.name, elapsed, extra=_span_fields(series, elapsed))
+
+
+def _span_failed(series: _HistogramSeries, elapsed: float, exc_type: type, exc: Optional[BaseException]) -> None:
+    series.metric.errors.labels(*series.values, exc_type.__name__).inc()
+    log.warning(
+        "%s failed after %.6fs: %s: %s", series.metric.name, elapsed, exc_type.__name__, exc,
+        extra={**_span_fields(series, elapsed), "error": exc_type.__name__, "error_message": str(exc)},
+    )
+
+
+class Registry:
+    """Named metrics of this process."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: type, name: str, help: str, labelnames: Sequence[str], **options: Any) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, help, labelnames, **options)
+        if not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered as {metric.kind} with labels {metric.labelnames}")
+        return metric
+
+    def counter(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str = "", labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = self._get(Histogram, name, help, labelnames, buckets=buckets)
+        with self._lock:
+            self._metrics.setdefault(metric.errors.name, metric.errors)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            if metric._recorded():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            name: {"type": metric.kind, "series": metric.snapshot()}
+            for name, metric in list(self._metrics.items())
+            if metric._recorded()
+        }
+
+    def clear(self) -> None:
+        """Drops every recorded value. Series stay registered (callers may hold them) and restart at zero."""
+        for metric in list(self._metrics.values()):
+            for series in list(metric._series.values()):
+                with series._lock:
+                    if isinstance(series, _HistogramSeries):
+                        series.counts = [0] * len(series.counts)
+                        series.sum = 0.0
+                    else:
+                        series.value = 0.0
+                    series.count = 0
+
+
+REGISTRY = Registry()
+_named_series: Dict[Tuple[Any, ...], _HistogramSeries] = {}  # span(name, **labels) → series
+_named_series_lock = threading.Lock()
+
+
+def counter(name: str, help: str = "", labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.counter(name, help, labelnames)
+
+
+def histogram(
+    name: str, help: str = "", labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    return REGISTRY.histogram(name, help, labelnames, buckets)
+
+
+def span(metric: Union[str, Histogram, _HistogramSeries], **labels: Any) -> _Span:
+    """
+    Times a block or a function into a histogram (seconds):
+
+        with span("icd_search_stage_seconds", stage="http"): ...
+        @span(TOKEN_SECONDS)
+        def get_token(): ...
+
+    `metric` is a histogram name (registered on first use, labelled by the
+    given label names), a Histogram, or an already resolved series.
+    """
+    if isinstance(metric, _HistogramSeries):
+        return _Span(metric)
+    if isinstance(metric, str):
+        key = (metric, *labels.items())
+        with _named_series_lock:
+            series = _named_series.get(key)
+            if series is None:
+                series = _named_series[key] = histogram(metric, labelnames=tuple(labels)).labels(**labels)
+        return _Span(series)
+    return _Span(metric.labels(**labels))
+
+
+# Shared by several modules
+DB_QUERY_SECONDS = histogram("db_query_seconds", "Time of instrumented DB lookups", ("query",))
+BUILD_SECONDS = histogram("master_db_build_seconds", "Master DB build time per builder and phase", ("builder", "phase"))
+BUILD_ROWS = counter("master_db_rows_total", "Rows written by the master DB builders", ("builder", "table"))
+
+
+def render() -> str:
+    """Prometheus text exposition format (version 0.0.4) of every recorded metric."""
+    return REGISTRY.render()
+
+
+def snapshot() -> Dict[str, Any]:
+    return REGISTRY.snapshot()
+
+
+def write_textfile(path: str) -> None:
+    """Writes render() to `path` atomically (for the node_exporter textfile collector)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp, path)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, `extra` fields and exception text."""
+
+    _RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self._RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_json_logging(level: int = logging.INFO, stream: Any = None) -> logging.Handler:
+    """Sends root-logger records to `stream` (stderr) as JSON lines; idempotent."""
+    root = logging.getLogger()
+    for handler in root.handlers:
+        if isinstance(handler.formatter, JsonFormatter):
+            return handler
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter())
+    root.addHandler(handler)
+    root.setLevel(min(root.level or level, level))
+    return handler
+
+
+if JSON_LOGS:
+    configure_json_logging()
+if TEXTFILE:
+    atexit.register(write_textfile, TEXTFILE)
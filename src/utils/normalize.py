@@ -0,0 +1,106 @@
+"""
+Spelling-insensitive search keys for transliterated and Devanagari terms.
+
+Clinicians type `vikarah`, `vikāraḥ`, `vikAraH` or `विकारः` for the same term.
+`search_key()` maps all of them to one folded key (`vikarah`):
+
+1. Devanagari is transliterated to IAST.
+2. Unicode NFKD decomposition, then combining marks (diacritics) are dropped.
+3. Case folding, and ITRANS/Harvard-Kyoto habits (`~n` nasals, dropped or
+   added aspirates, `ru`/`ri` for ṛ, doubled vowels) are reduced to the
+   same letters.
+4. Everything except letters and digits is removed.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+_DEVANAGARI_RE = re.compile(r"[ऀ-ॿ]")
+
+_VOWELS = {
+    "अ": "a", "आ": "ā", "इ": "i", "ई": "ī", "उ": "u", "ऊ": "ū",
+    "ऋ": "ṛ", "ॠ": "ṝ", "ऌ": "ḷ", "ॡ": "ḹ", "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au",
+}
+_VOWEL_SIGNS = {
+    "ा": "ā", "ि": "i", "ी": "ī", "ु": "u", "ू": "ū", "ृ": "ṛ", "ॄ": "ṝ",
+    "ॢ": "ḷ", "ॣ": "ḹ", "े": "e", "ै": "ai", "ो": "o", "ौ": "au",
+}
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "ṅ",
+    "च": "c", "छ": "ch", "ज": "j", "झ": "jh", "ञ": "ñ",
+    "ट": "ṭ", "ठ": "ṭh", "ड": "ḍ", "ढ": "ḍh", "ण": "ṇ",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ल": "l", "ळ": "ḷ", "व": "v",
+    "श": "ś", "ष": "ṣ", "स": "s", "ह": "h",
+}
+_MARKS = {"ं": "ṃ", "ः": "ḥ", "ँ": "m̐", "ऽ": "'", "।": ".", "॥": "."}
+_VIRAMA = "्"
+_NUKTA = "़"
+_DIGITS = {chr(0x0966 + i): str(i) for i in range(10)}
+
+# Applied in order after case folding: ITRANS nasals (~n, ~g, ~j), aspirates
+# (kapha/kapa, śotha/shotha), vocalic r between consonants (vṛddhi/vruddhi/
+# vriddhi), then doubled vowels (vaata/vata)
+_ASCII_FOLDS = [
+    (re.compile(r"~[a-z]"), "n"),
+    (re.compile(r"([kgcjtdpbs])h"), r"\1"),
+    (re.compile(r"(?<=[b-df-hj-np-tv-z])r[iu](?=[b-df-hj-np-tv-z])"), "r"),
+    (re.compile(r"([aiueo])\1+"), r"\1"),
+]
+
+
+def devanagari_to_iast(text: str) -> str:
+    """Transliterates Devanagari to IAST; other characters pass through unchanged."""
+    out = []
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch in _CONSONANTS:
+            out.append(_CONSONANTS[ch])
+            j = i + 1
+            if j < n and text[j] == _NUKTA:
+                j += 1
+            nxt = text[j] if j < n else ""
+            if nxt == _VIRAMA:
+                j += 1
+            elif nxt in _VOWEL_SIGNS:
+                out.append(_VOWEL_SIGNS[nxt])
+                j += 1
+            else:
+                out.append("a")  # inherent vowel
+            i = j
+            continue
+        if ch in _VOWELS:
+            out.append(_VOWELS[ch])
+        elif ch in _MARKS:
+            out.append(_MARKS[ch])
+        elif ch in _DIGITS:
+            out.append(_DIGITS[ch])
+        elif ch in (_VIRAMA, _NUKTA):
+            pass
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def fold(text: str) -> str:
+    """Diacritic- and case-insensitive form of Latin-script text."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    for pattern, replacement in _ASCII_FOLDS:
+        stripped = pattern.sub(replacement, stripped)
+    return "".join(c for c in stripped if c.isalnum())
+
+
+@lru_cache(maxsize=65536)
+def search_key(text: str) -> str:
+    """Folded key shared by every spelling/script variant of a term ('' for empty input)."""
+    if not text:
+        return ""
+    if _DEVANAGARI_RE.search(text):
+        text = devanagari_to_iast(text)
+    return fold(text)
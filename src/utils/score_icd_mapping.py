@@ -0,0 +1,360 @@
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.api import icd_search
+from src.api.icd_local import load_snapshot
+from src.database import get_sqlite_pool
+from src.database.migrations import migrate_icd_mapping_tables
+from src.schema.table_schema import TableSchemas
+from src.utils.build_namaste_master_db import DB_PATH as NAMASTE_DB_PATH, NAMASTE_CODES
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# Platt scaling of cosine similarity: confidence = 1 / (1 + exp(-(a * cosine + b))).
+# The default puts cosine 0.5 at confidence 0.5; fit_platt() refits it from labelled pairs.
+DEFAULT_CALIBRATION = (12.0, -6.0)
+EQUIVALENT_CONFIDENCE = 0.85
+RELATED_CONFIDENCE = 0.3
+CONTAINMENT = 0.9  # share of one side's words found in the other to call it wider/narrower
+MIN_SCORE = 0.0  # cosines at or below this share no n-gram worth a match and are not written
+
+
+def _fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def words(text: str) -> set:
+    return set(_WORD_RE.findall(_fold(text)))
+
+
+def char_ngrams(text: str, n: int = 3) -> List[str]:
+    """Character n-grams of each word padded with spaces (like scikit-learn's char_wb)."""
+    grams = []
+    for word in _WORD_RE.findall(_fold(text)):
+        padded = f" {word} "
+        grams.extend(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+    return grams
+
+
+def tfidf_matrices(
+    sources: Sequence[str], targets: Sequence[str], n: int = 3, max_df: float = 0.5
+) -> Tuple[sp.csr_matrix, sp.csr_matrix]:
+    """
+    L2-normalised char n-gram TF-IDF rows for `sources` and `targets`, with a
+    vocabulary and IDF fitted on both. N-grams in more than `max_df` of all
+    documents carry little signal and are dropped, which also keeps the
+    similarity products sparse.
+    """
+    vocabulary: Dict[str, int] = {}
+    word_grams: Dict[str, List[int]] = {}  # words repeat a lot; n-gram them once
+    indptr, indices = [0], []
+    for text in (*sources, *targets):
+        for word in _WORD_RE.findall(_fold(text)):
+            grams = word_grams.get(word)
+            if grams is None:
+                grams = word_grams[word] = [
+                    vocabulary.setdefault(g, len(vocabulary)) for g in char_ngrams(word, n)
+                ]
+            indices.extend(grams)
+        indptr.append(len(indices))
+    counts = sp.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), np.array(indices, dtype=np.int64), np.array(indptr)),
+        shape=(len(indptr) - 1, len(vocabulary)),
+    )
+    counts.sum_duplicates()
+
+    docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = (np.log((1 + docs) / (1 + df)) + 1).astype(np.float32)
+    idf[df > max_df * docs] = 0.0
+    counts.data = (1 + np.log(counts.data)) * idf[counts.indices]  # sublinear tf
+    counts.eliminate_zeros()
+
+    norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    weighted = sp.diags(1 / norms).dot(counts).tocsr().astype(np.float32)
+    return weighted[: len(sources)], weighted[len(sources):]
+
+
+def fit_platt(scores: np.ndarray, labels: np.ndarray, iterations: int = 50) -> Tuple[float, float]:
+    """Fits (a, b) of confidence = sigmoid(a * score + b) by Newton's method on log-loss."""
+    a, b = DEFAULT_CALIBRATION
+    x = np.asarray(scores, dtype=np.float64)
+    y = np.asarray(labels, dtype=np.float64)
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-(a * x + b)))
+        w = p * (1 - p) + 1e-9
+        grad = np.array([np.sum((p - y) * x), np.sum(p - y)])
+        hess = np.array([[np.sum(w * x * x), np.sum(w * x)], [np.sum(w * x), np.sum(w)]])
+        step = np.linalg.solve(hess + 1e-6 * np.eye(2), grad)
+        a, b = a - step[0], b - step[1]
+        if np.abs(step).max() < 1e-6:
+            break
+    return float(a), float(b)
+
+
+def equivalence(confidence: float, source_text: str, target_title: str) -> str:
+    """
+    FHIR ConceptMap equivalence of a NAMASTE term → ICD pair:
+    `equivalent` for a confident match covering both texts, `wider`/`narrower`
+    when the ICD title's words are a subset/superset of the term's,
+    `relatedto` for weaker matches and `unmatched` below RELATED_CONFIDENCE.
+    """
+    if confidence < RELATED_CONFIDENCE:
+        return "unmatched"
+    src, tgt = words(source_text), words(target_title)
+    shared = len(src & tgt)
+    covers_target = bool(tgt) and shared / len(tgt) >= CONTAINMENT
+    covers_source = bool(src) and shared / len(src) >= CONTAINMENT
+    if covers_target and covers_source and confidence >= EQUIVALENT_CONFIDENCE:
+        return "equivalent"
+    if covers_target and not covers_source:
+        return "wider"
+    if covers_source and not covers_target:
+        return "narrower"
+    return "relatedto"
+
+
+class ICDSimilarityScorer:
+    """
+    Scores every NAMASTE term against every ICD-11 entity of a local MMS
+    snapshot (src/api/icd_local.py) and writes the best matches into
+    `namaste_icd_map` with a calibrated confidence and an equivalence class.
+
+    - One char n-gram TF-IDF space covers both sides, so transliteration
+      variants and inflections still overlap.
+    - The NAMASTE × ICD cosine matrix is computed `chunk_size` terms at a
+      time (sparse product, then an `argpartition` top-k per row), so memory
+      stays at chunk_size × entities however large the release is.
+    - Only matches scoring above `min_score` are written, so a term that
+      shares nothing with the release gets no rows rather than k arbitrary ones.
+    - Rows and progress are keyed by `method = 'tfidf'`: codes already
+      scored for the release are left alone unless `rescore=True`, and the
+      ICD search builder's rows (which calibrate() fits on) are never touched.
+    """
+
+    TABLE_SCHEMAS: Dict[str, str] = TableSchemas.ICD_MAPPING_SCHEMAS
+    METHOD = "tfidf"
+
+    def __init__(
+        self,
+        db_path: Optional[str | Path] = None,
+        snapshot: Optional[str | Path] = None,
+        release: str = icd_search.ICD_RELEASE,
+        top_k: int = 5,
+        chunk_size: int = 512,
+        ngram: int = 3,
+        calibration: Tuple[float, float] = DEFAULT_CALIBRATION,
+        min_score: float = MIN_SCORE,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.db_path = Path(db_path or NAMASTE_DB_PATH).resolve()
+        self.snapshot = snapshot or icd_search.LOCAL_SNAPSHOT
+        self.release = release
+        self.top_k = top_k
+        self.chunk_size = chunk_size
+        self.ngram = ngram
+        self.calibration = calibration
+        self.min_score = min_score
+
+        self.log = logger or logging.getLogger(self.__class__.__name__)
+        if not logger:
+            logging.basicConfig(
+                level=logging.INFO,
+                format="%(asctime)s %(levelname)s [%(name)s]: %(message)s",
+            )
+
+    def confidence(self, cosine: np.ndarray) -> np.ndarray:
+        a, b = self.calibration
+        return 1 / (1 + np.exp(-(a * cosine + b)))
+
+    def namaste_terms(
+        self, conn: sqlite3.Connection, systems: Iterable[str], rescore: bool = False
+    ) -> List[Tuple[str, str, str]]:
+        """(system, code, text) for every NAMASTE code to score (not yet scored, or all with `rescore`)."""
+        terms = []
+        for system in systems:
+            table = f"namaste_{system}"
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone():
+                self.log.warning("Skipping %s: table %s not found in %s", system, table, self.db_path)
+                continue
+            rows = conn.execute(
+                f"""
+                SELECT t.code, COALESCE(NULLIF(t.description, ''), t.english_term)
+                FROM {table} t
+                LEFT JOIN namaste_icd_map_progress p
+                    ON p.system = ? AND p.namaste_code = t.code AND p.icd_release = ? AND p.method = ?
+                WHERE ? OR p.namaste_code IS NULL
+                ORDER BY t.code
+                """,
+                (system, self.release, self.METHOD, rescore),
+            )
+            terms.extend((system, code, text) for code, text in rows if text)
+        return terms
+
+    def top_matches(
+        self, sources: sp.csr_matrix, targets: sp.csr_matrix
+    ) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """Yields (source row, target indices, cosines) best first, `chunk_size` rows at a time."""
+        targets_t = targets.T.tocsr()
+        k = min(self.top_k, targets.shape[0])
+        for start in range(0, sources.shape[0], self.chunk_size):
+            block = (sources[start:start + self.chunk_size] @ targets_t).toarray()
+            best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(block, best, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            for offset in range(block.shape[0]):
+                yield start + offset, best[offset], best_scores[offset]
+
+    def calibrate(self, conn: sqlite3.Connection, max_pairs: int = 5000) -> Tuple[float, float]:
+        """
+        Refits the Platt calibration using the ICD API's own top matches in
+        `namaste_icd_map` (method 'icd_api', rank 1) as positives and the
+        same terms paired with shuffled titles as negatives.
+        """
+        pairs = conn.execute(
+            f"""
+            SELECT COALESCE(NULLIF(t.description, ''), t.english_term), m.icd_title
+            FROM namaste_icd_map m
+            JOIN ({" UNION ALL ".join(
+                f"SELECT '{s}' AS system, code, description, english_term FROM namaste_{s}"
+                for s in NAMASTE_CODES
+            )}) t ON t.system = m.system AND t.code = m.namaste_code
+            WHERE m.icd_release = ? AND m.rank = 1 AND m.method = 'icd_api' AND m.icd_title <> ''
+            LIMIT ?
+            """,
+            (self.release, max_pairs),
+        ).fetchall()
+        if len(pairs) < 20:
+            self.log.warning("Only %d API mappings to calibrate from; keeping %s", len(pairs), self.calibration)
+            return self.calibration
+        texts, titles = zip(*pairs)
+        shuffled = list(titles[1:]) + [titles[0]]
+        a, b = tfidf_matrices(texts, list(titles) + shuffled, self.ngram)
+        positives = np.asarray(a.multiply(b[: len(titles)]).sum(axis=1)).ravel()
+        negatives = np.asarray(a.multiply(b[len(titles):]).sum(axis=1)).ravel()
+        labels = np.concatenate([np.ones(len(positives)), np.zeros(len(negatives))])
+        self.calibration = fit_platt(np.concatenate([positives, negatives]), labels)
+        self.log.info("Calibrated from %d API mappings: a=%.3f b=%.3f", len(pairs), *self.calibration)
+        return self.calibration
+
+    def build(
+        self,
+        systems: Optional[Iterable[str]] = None,
+        rescore: bool = False,
+        calibrate: bool = False,
+        entities: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Scores all pending NAMASTE codes and writes their top-k matches; returns timings."""
+        if entities is None:
+            if not self.snapshot:
+                raise ValueError("No ICD-11 snapshot given (pass snapshot= or set ICD_LOCAL_SNAPSHOT)")
+            entities = load_snapshot(self.snapshot)
+        if not entities:
+            # Nothing to score against: keep existing rows and leave the codes pending
+            self.log.warning("No ICD entities to score against; nothing written")
+            return {"terms": 0, "entities": 0, "rows": 0, "vectorize_seconds": 0.0, "score_seconds": 0.0,
+                    "write_seconds": 0.0}
+        systems = list(systems or NAMASTE_CODES)
+        start = time.perf_counter()
+        with get_sqlite_pool(str(self.db_path)).writer() as conn:
+            for change in migrate_icd_mapping_tables(conn):
+                self.log.info("Migrated %s", change)
+            if calibrate:
+                self.calibrate(conn)
+
+            terms = self.namaste_terms(conn, systems, rescore)
+            self.log.info("Scoring %d NAMASTE terms against %d ICD entities", len(terms), len(entities))
+            titles = [" ".join([e["title"], *e.get("synonyms", [])]) for e in entities]
+            sources, targets = tfidf_matrices([t[2] for t in terms], titles, self.ngram)
+            vectorized = time.perf_counter()
+
+            mapped_at = datetime.now(timezone.utc).isoformat()
+            rows, progress = [], []
+            for i, best, cosines in self.top_matches(sources, targets):
+                system, code, text = terms[i]
+                keep = cosines > self.min_score
+                best, cosines = best[keep], cosines[keep]
+                confidences = self.confidence(cosines)
+                for rank, (j, cosine, conf) in enumerate(zip(best, cosines, confidences), start=1):
+                    entity = entities[j]
+                    rows.append((
+                        system, code, self.release, rank, entity["code"], entity["title"], entity["uri"],
+                        float(cosine), float(conf), equivalence(conf, text, entity["title"]), self.METHOD,
+                    ))
+                progress.append((system, code, self.release, self.METHOD, len(best), mapped_at))
+            scored = time.perf_counter()
+
+            conn.executemany(
+                "DELETE FROM namaste_icd_map WHERE system = ? AND namaste_code = ? AND icd_release = ? AND method = ?",
+                [(system, code, self.release, self.METHOD) for system, code, _ in terms],
+            )
+            conn.executemany(
+                """
+                INSERT INTO namaste_icd_map
+                    (system, namaste_code, icd_release, rank, icd_code, icd_title, icd_uri,
+                     score, confidence, equivalence, method)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO namaste_icd_map_progress
+                    (system, namaste_code, icd_release, method, match_count, mapped_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                progress,
+            )
+            conn.commit()
+
+        end = time.perf_counter()
+        report = {
+            "terms": len(terms),
+            "entities": len(entities),
+            "rows": len(rows),
+            "vectorize_seconds": vectorized - start,
+            "score_seconds": scored - vectorized,
+            "write_seconds": end - scored,
+        }
+        self.log.info(
+            "Scored %d terms × %d entities: vectorize %.2fs, score %.2fs, write %.2fs",
+            report["terms"], report["entities"], report["vectorize_seconds"],
+            report["score_seconds"], report["write_seconds"],
+        )
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score NAMASTE terms against a local ICD-11 snapshot.")
+    parser.add_argument("--db", default=os.getenv("NAMASTE_MASTER_DB"), help="NAMASTE master DB path")
+    parser.add_argument("--snapshot", default=icd_search.LOCAL_SNAPSHOT, help="ICD-11 MMS snapshot file")
+    parser.add_argument("--systems", nargs="+", choices=list(NAMASTE_CODES), help="systems to score")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--min-score", type=float, default=MIN_SCORE, help="only write matches scoring above this")
+    parser.add_argument("--rescore", action="store_true", help="replace existing mappings too")
+    parser.add_argument("--calibrate", action="store_true", help="fit confidences to existing API mappings")
+    args = parser.parse_args()
+
+    scorer = ICDSimilarityScorer(
+        db_path=args.db, snapshot=args.snapshot, top_k=args.top_k, chunk_size=args.chunk_size,
+        min_score=args.min_score,
+    )
+    scorer.build(args.systems, rescore=args.rescore, calibrate=args.calibrate)
@@ -0,0 +1,102 @@
+import csv
+import json
+import math
+
+import pytest
+
+from src.api.icd_local import LocalICDIndex, load_snapshot, tokenize
+from src.api.icd_search import shape_results
+
+FIXTURE = "data/icd11/mms_fixture.jsonl"
+
+
+@pytest.fixture(scope="module")
+def entities():
+    return load_snapshot(FIXTURE)
+
+
+@pytest.fixture(scope="module")
+def index(entities):
+    return LocalICDIndex(entities)
+
+
+def reference_bm25(entities, query, k1=1.2, b=0.75):
+    """Plain-Python BM25 over title + synonyms, divided by the query's ceiling like LocalICDIndex."""
+    docs = [tokenize(" ".join([e["title"], *e["synonyms"]])) for e in entities]
+    avg_len = sum(map(len, docs)) / len(docs)
+    terms = {t for t in tokenize(query) if any(t in d for d in docs)}
+    idf = {t: math.log1p((len(docs) - sum(t in d for d in docs) + 0.5) / (sum(t in d for d in docs) + 0.5)) for t in terms}
+    ceiling = sum(idf.values()) * (k1 + 1)
+    scores = {}
+    for e, doc in zip(entities, docs):
+        norm = k1 * (1 - b + b * len(doc) / avg_len)
+        score = sum(idf[t] * doc.count(t) * (k1 + 1) / (doc.count(t) + norm) for t in terms if t in doc)
+        if score:
+            scores[e["code"]] = score / ceiling
+    return scores
+
+
+def test_fixture_loads_from_jsonl(entities):
+    assert len(entities) == 40
+    assert all(set(e) >= {"code", "title", "uri", "synonyms"} for e in entities)
+    assert entities[0]["code"] == "1A00"
+
+
+def test_json_array_snapshot_matches_jsonl(entities, tmp_path):
+    path = tmp_path / "mms.json"
+    path.write_text(json.dumps([{k: v for k, v in e.items() if k != "synonyms"} for e in entities]))
+
+    loaded = load_snapshot(path)
+    assert [(e["code"], e["title"], e["uri"]) for e in loaded] == [(e["code"], e["title"], e["uri"]) for e in entities]
+    assert all(e["synonyms"] == [] for e in loaded)
+
+
+def test_simple_tabulation_snapshot(entities, tmp_path):
+    path = tmp_path / "mms.tsv"
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter="\t")
+        writer.writerow(["Foundation URI", "Linearization (release) URI", "Code", "Title"])
+        writer.writerow(["", "", "", "Certain infectious or parasitic diseases"])  # chapter row, no code
+        for e in entities:
+            writer.writerow(["", e["uri"], e["code"], f"- - {e['title']}"])
+
+    loaded = load_snapshot(path)
+    assert [(e["code"], e["title"], e["uri"]) for e in loaded] == [(e["code"], e["title"], e["uri"]) for e in entities]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("type 2 diabetes", ["5A11", "5A10"]),
+        ("pulmonary tuberculosis", ["1B10", "CA22"]),
+        ("osteoarthritis of the knee", ["FA01", "FA00"]),
+        ("Iron deficiency anaémia", ["3A00"]),
+    ],
+)
+def test_bm25_ranking(index, query, expected):
+    codes = [e["theCode"] for e in index.search(query)["destinationEntities"]]
+    assert codes[: len(expected)] == expected
+
+
+def test_unknown_words_find_nothing(index):
+    assert index.search("zzyzx qwerty") == {"destinationEntities": []}
+    assert shape_results(index.search("")) == []
+
+
+@pytest.mark.parametrize("query", ["type 2 diabetes mellitus", "pulmonary tuberculosis", "disorder disease chronic"])
+def test_shape_results_output(index, entities, query):
+    results = shape_results(index.search(query, limit=10))
+    by_code = {e["code"]: e for e in entities}
+    expected = reference_bm25(entities, query)
+
+    # Only entities sharing a term are returned, best first, each with a 0..1 BM25 score
+    assert [r["icd_code"] for r in results] == sorted(expected, key=lambda c: -expected[c])
+    for r in results:
+        assert set(r) == {"icd_code", "title", "uri", "score"}
+        assert (r["title"], r["uri"]) == (by_code[r["icd_code"]]["title"], by_code[r["icd_code"]]["uri"])
+        assert r["score"] == pytest.approx(expected[r["icd_code"]], abs=1e-4)
+        assert 0 < r["score"] <= 1
+
+
+def test_limit_caps_results(index):
+    assert len(index.search("disorder disease chronic", limit=2)["destinationEntities"]) == 2
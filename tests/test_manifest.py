@@ -0,0 +1,71 @@
+import os
+import sqlite3
+
+import pytest
+
+from src.database.manifest import CHANGED, NEW, UNCHANGED, SourceManifest, stale_sources
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "terms.csv"
+    path.write_text("code,term\nA-1,jvara\n")
+    return path
+
+
+@pytest.fixture
+def master_db(tmp_path, source):
+    db_path = tmp_path / "master.db"
+    conn = sqlite3.connect(db_path)
+    manifest = SourceManifest(conn, "namaste_terms").ensure()
+    assert manifest.status(source)[0] == NEW
+    manifest.record(source, source.stat(), None, None, None, [])
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _touch(path, seconds=10):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+def test_freshly_imported_source_is_current(master_db, source):
+    assert stale_sources(master_db, [source]) == {}
+
+
+def test_touched_but_identical_source_is_current(master_db, source):
+    _touch(source)
+    assert stale_sources(master_db, [source]) == {}
+
+    conn = sqlite3.connect(master_db)
+    assert SourceManifest(conn, "namaste_terms").status(source)[0] == UNCHANGED
+    conn.close()
+
+
+def test_same_size_edit_is_stale(master_db, source):
+    source.write_text(source.read_text().replace("jvara", "kasa!"))
+    _touch(source)
+    assert stale_sources(master_db, [source]) == {str(source): "changed since last import"}
+
+    conn = sqlite3.connect(master_db)
+    assert SourceManifest(conn, "namaste_terms").status(source)[0] == CHANGED
+    conn.close()
+
+
+def test_missing_and_unimported_sources(master_db, source, tmp_path):
+    other = tmp_path / "other.csv"
+    other.write_text("x")
+    assert stale_sources(master_db, [source, other, tmp_path / "gone.csv"]) == {
+        str(other): "not imported",
+        str(tmp_path / "gone.csv"): "missing",
+    }
+    assert stale_sources(tmp_path / "unbuilt.db", [source]) == {str(source): "master DB not built"}
+
+
+def test_folders_contribute_their_json_files(master_db, tmp_path):
+    folder = tmp_path / "who"
+    folder.mkdir()
+    (folder / "a.json").write_text("{}")
+    (folder / "notes.txt").write_text("")
+    assert stale_sources(master_db, [], [folder, tmp_path / "absent"]) == {str(folder / "a.json"): "not imported"}
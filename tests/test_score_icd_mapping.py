@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+from src.api.icd_local import load_snapshot
+from src.utils.build_namaste_master_db import TABLE_SCHEMAS
+from src.utils.score_icd_mapping import ICDSimilarityScorer
+
+FIXTURE = "data/icd11/mms_fixture.jsonl"
+
+TERMS = [
+    ("AYU-1", "Pulmonary tuberculosis", "Tuberculosis of the lungs"),
+    ("AYU-2", "Falciparum malaria", ""),
+    ("AYU-3", "qxz", "qxz"),  # shares no n-gram with any ICD title
+]
+
+
+@pytest.fixture
+def namaste_db(tmp_path):
+    path = tmp_path / "namaste.db"
+    conn = sqlite3.connect(path)
+    conn.execute(TABLE_SCHEMAS["ayurveda"])
+    conn.executemany("INSERT INTO namaste_ayurveda (code, english_term, description) VALUES (?, ?, ?)", TERMS)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _score(db_path, **options):
+    scorer = ICDSimilarityScorer(db_path=db_path, release="test", top_k=5, **options)
+    report = scorer.build(["ayurveda"], entities=load_snapshot(FIXTURE))
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT namaste_code, rank, icd_code, score FROM namaste_icd_map ORDER BY namaste_code, rank"
+        ).fetchall()
+        progress = dict(conn.execute("SELECT namaste_code, match_count FROM namaste_icd_map_progress"))
+    finally:
+        conn.close()
+    return report, rows, progress
+
+
+def test_zero_score_matches_are_not_written(namaste_db):
+    report, rows, progress = _score(namaste_db)
+
+    assert report["terms"] == 3
+    assert all(score > 0 for _, _, _, score in rows)
+    assert "AYU-3" not in {code for code, _, _, _ in rows}
+    assert progress["AYU-3"] == 0  # scored, nothing to map
+    assert progress["AYU-1"] == sum(1 for code, *_ in rows if code == "AYU-1")
+
+
+def test_best_match_ranks_first(namaste_db):
+    _, rows, _ = _score(namaste_db)
+    best = {code: icd_code for code, rank, icd_code, _ in rows if rank == 1}
+
+    assert best == {"AYU-1": "1B10", "AYU-2": "1F40"}
+    for code in best:
+        scores = [score for c, _, _, score in rows if c == code]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_min_score_threshold(namaste_db):
+    _, rows, progress = _score(namaste_db, min_score=0.3)
+
+    assert rows and all(score > 0.3 for _, _, _, score in rows)
+    assert progress["AYU-1"] == sum(1 for code, *_ in rows if code == "AYU-1")
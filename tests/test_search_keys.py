@@ -0,0 +1,46 @@
+import sqlite3
+from collections import Counter
+
+import pytest
+
+from benchmarks.bench_search_keys import variant_set
+from src.database.load_csv import CSV_PATH, iter_csv_rows, load_namaste_terms
+from src.database.search_keys import rebuild_search_keys
+from src.services.term_search import find_by_search_key
+from src.utils.normalize import search_key
+
+
+@pytest.fixture(scope="module")
+def terms_db(tmp_path_factory):
+    conn = sqlite3.connect(tmp_path_factory.mktemp("search_keys") / "terms.db")
+    load_namaste_terms(conn, CSV_PATH)
+    rebuild_search_keys(conn, ["namaste_terms"])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def labelled_set():
+    """(variant kind, spelling, NAMC_CODE) for every term of IAST_Sanskrit_Matching.csv."""
+    return variant_set(list(iter_csv_rows(CSV_PATH)))
+
+
+@pytest.mark.parametrize("variant", ["vikarah", "vikāraḥ", "विकारः", "VIKARAH", "vikaaraH"])
+def test_spelling_variants_share_a_key(variant):
+    assert search_key(variant) == search_key("vikāraḥ")
+
+
+def test_labelled_set_covers_every_spelling(labelled_set):
+    kinds = Counter(kind for kind, _, _ in labelled_set)
+    assert set(kinds) == {"itrans", "iast", "devanagari", "plain"}
+    assert min(kinds.values()) > 400
+
+
+def test_every_csv_variant_resolves_to_its_code(terms_db, labelled_set):
+    missed = [
+        (kind, text, code)
+        for kind, text, code in labelled_set
+        if code not in {m["code"] for m in find_by_search_key(terms_db, text, sources=["namaste_terms"])}
+    ]
+    assert missed == []
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from src.database.manifest import SourceManifest
+from src.schema.table_schema import TableSchemas
+from src.services import term_store
+from src.services.term_store import TerminologyStore
+from src.utils.build_namaste_master_db import TABLE_SCHEMAS
+
+
+def _build(db_path, source_file, rows):
+    """A NAMASTE master DB whose ayurveda rows came from `source_file`, as the builder records them."""
+    conn = sqlite3.connect(db_path)
+    conn.execute(TABLE_SCHEMAS["ayurveda"])
+    conn.execute("DELETE FROM namaste_ayurveda")
+    conn.executemany("INSERT INTO namaste_ayurveda (code, english_term, description) VALUES (?, ?, ?)", rows)
+    manifest = SourceManifest(conn, "namaste").ensure()
+    manifest.record(source_file, source_file.stat(), None, "namaste_ayurveda", "code", [r[0] for r in rows])
+    conn.execute(f"PRAGMA user_version = {TableSchemas.SCHEMA_VERSION}")
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def master_db(tmp_path):
+    db_path, source = tmp_path / "namaste.db", tmp_path / "ayurveda.xls"
+    source.write_bytes(b"v1")
+    _build(db_path, source, [("AAA-1", "Fever", "Jvara"), ("AAA-2", "Cough", "Kasa")])
+    return db_path, source
+
+
+def test_snapshot_round_trip(master_db, tmp_path):
+    db_path, _ = master_db
+    snapshot = TerminologyStore.from_db([db_path]).save(tmp_path / "store.bin")
+
+    store = TerminologyStore.open(snapshot)
+    assert store.description("AAA-2", "namaste_ayurveda") == "Kasa"
+    assert store.lookup("missing") is None
+    assert store.is_current([db_path])
+
+
+def test_rebuilt_db_makes_the_snapshot_stale(master_db, tmp_path):
+    db_path, source = master_db
+    snapshot = TerminologyStore.from_db([db_path]).save(tmp_path / "store.bin")
+
+    source.write_bytes(b"v2")
+    _build(db_path, source, [("AAA-1", "Fever", "Jvara, revised")])
+
+    assert not TerminologyStore.open(snapshot).is_current([db_path])
+    assert TerminologyStore.from_rows([]).is_current([db_path]) is False
+
+
+def test_get_term_store_rejects_stale_snapshot(master_db, tmp_path, monkeypatch):
+    db_path, source = master_db
+    snapshot = TerminologyStore.from_db([db_path]).save(tmp_path / "store.bin")
+    source.write_bytes(b"v2")
+    _build(db_path, source, [("AAA-1", "Fever", "Jvara, revised")])
+
+    monkeypatch.setenv("TERM_STORE_SNAPSHOT", str(snapshot))
+    monkeypatch.setattr("src.services.fuzzy_index.default_db_paths", lambda: [str(db_path)])
+    monkeypatch.setattr(term_store, "_term_store", None)
+
+    store = term_store.get_term_store()
+    assert store.description("AAA-1") == "Jvara, revised"
+    assert store.lookup("AAA-2") is None
+
+
+def test_old_snapshot_format_is_rejected(tmp_path):
+    path = tmp_path / "old.bin"
+    path.write_bytes(b"AYTS" + (1).to_bytes(4, "little") + bytes(24))
+    with pytest.raises(ValueError):
+        TerminologyStore.open(path)
@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.mock_icd_server import MockICDServer
+from src.api import token_manager
+from src.api.token_manager import ICDTokenManager
+
+
+class FakeClock:
+    """Stands in for the `time` module inside token_manager."""
+
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakeEndpoint:
+    """Token endpoint as a `fetch` callable: counts calls, can block and fail."""
+
+    def __init__(self, expires_in=3600) -> None:
+        self.expires_in = expires_in
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.error = None
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        body = {"access_token": f"token-{self.calls}"}
+        if self.expires_in is not None:
+            body["expires_in"] = self.expires_in
+        return body
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(token_manager, "time", clock)
+    return clock
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_burst_against_token_endpoint_fetches_once():
+    with MockICDServer(latency=0.05) as server:
+        token_url = server.env()["ICD_TOKEN_URL"]
+
+        def fetch():
+            with urllib.request.urlopen(urllib.request.Request(token_url, data=b"", method="POST")) as response:
+                return json.load(response)
+
+        manager = ICDTokenManager(fetch, background=False)
+        with ThreadPoolExecutor(max_workers=64) as pool:
+            tokens = set(pool.map(lambda _: manager.get(), range(1000)))
+
+    assert server.token_calls == 1
+    assert tokens == {"mock-token-1"}
+
+
+def test_concurrent_callers_share_one_refresh(clock):
+    endpoint = FakeEndpoint()
+    endpoint.release.clear()
+    manager = ICDTokenManager(endpoint, background=False)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        futures = [pool.submit(manager.get) for _ in range(16)]
+        _wait_for(lambda: endpoint.calls == 1)
+        endpoint.release.set()
+        tokens = {f.result(timeout=5) for f in futures}
+
+    assert endpoint.calls == 1
+    assert tokens == {"token-1"}
+
+
+def test_refreshes_early_inside_the_margin(clock):
+    endpoint = FakeEndpoint(expires_in=3600)
+    manager = ICDTokenManager(endpoint, refresh_margin=60, background=False)
+    assert manager.get() == "token-1"
+
+    clock.now += 3600 - 61
+    assert manager.get() == "token-1"
+    assert endpoint.calls == 1
+
+    # Inside the margin: the still valid token is served while one refresh runs
+    clock.now += 2
+    assert manager.get() == "token-1"
+    _wait_for(lambda: manager._token == "token-2")
+    assert manager.get() == "token-2"
+    assert endpoint.calls == 2
+
+
+@pytest.mark.parametrize("expires_in", [None, 0, -5, "soon"])
+def test_missing_or_invalid_expires_in_uses_default(clock, expires_in):
+    endpoint = FakeEndpoint(expires_in=expires_in)
+    manager = ICDTokenManager(endpoint, refresh_margin=60, background=False)
+    manager.get()
+
+    assert manager._expires_at - clock.now == ICDTokenManager.DEFAULT_EXPIRES_IN
+    assert manager._refresh_at - clock.now == ICDTokenManager.DEFAULT_EXPIRES_IN - 60
+    for _ in range(100):
+        manager.get()
+    assert endpoint.calls == 1
+
+
+@pytest.mark.parametrize("expires_in", [1, 10, 30, 120])
+def test_margin_is_clamped_to_half_the_lifetime(clock, expires_in):
+    endpoint = FakeEndpoint(expires_in=expires_in)
+    manager = ICDTokenManager(endpoint, refresh_margin=60, background=False)
+    manager.get()
+
+    assert manager._refresh_at - clock.now == expires_in - min(60, expires_in / 2)
+    for _ in range(100):
+        manager.get()
+    assert endpoint.calls == 1
+
+
+def test_refresh_failure_reaches_every_waiter(clock):
+    endpoint = FakeEndpoint()
+    endpoint.release.clear()
+    endpoint.error = RuntimeError("token endpoint down")
+    manager = ICDTokenManager(endpoint, background=False)
+    entered = []
+
+    def get():
+        entered.append(1)
+        return manager.get()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(get) for _ in range(8)]
+        _wait_for(lambda: endpoint.calls == 1 and len(entered) == 8)
+        time.sleep(0.05)  # let the last callers reach the flight before it fails
+        endpoint.release.set()
+        errors = [f.exception(timeout=5) for f in futures]
+
+    assert endpoint.calls == 1
+    assert all(isinstance(e, RuntimeError) and str(e) == "token endpoint down" for e in errors)
+
+    # The failed flight is cleared, so the next caller retries
+    endpoint.error = None
+    assert manager.get() == "token-2"